@@ -0,0 +1,304 @@
+"""
+Admission control for the AI endpoints.
+
+AI requests can hold a worker for the whole length of an LLM call, so without
+a bound a burst of them ties up every worker and the plain CRUD endpoints
+stall behind them. Each AI view is wrapped with ``admission_controlled``,
+which lets at most ``AI_ADMISSION_MAX_CONCURRENT`` requests run at once and
+queues up to ``AI_ADMISSION_MAX_QUEUE`` more for ``AI_ADMISSION_QUEUE_TIMEOUT``
+seconds. Past that the request is overloaded: depending on
+``AI_ADMISSION_OVERLOAD`` it gets a 503 with Retry-After (``reject``) or is
+served immediately by the rule-based engine (``degrade``).
+
+The gate for the sync views counts across processes through slot lock files
+(so it also holds with one-request-per-process servers such as gunicorn sync
+workers); where ``fcntl`` is unavailable it counts per process. The async
+views don't hold a worker while waiting on a provider, so they have their
+own, much larger, per-process gate.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from functools import wraps
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+POLL_INTERVAL = 0.05
+# Smoothing for the average time a request holds a slot
+SERVICE_TIME_WEIGHT = 0.2
+MAX_RETRY_AFTER = 60
+
+
+class AdmissionGate:
+    """Bounded concurrency with a bounded, timed wait queue."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float, lock_dir: Optional[str] = None):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.lock_dir = lock_dir if fcntl is not None else None
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._queued = 0
+        self._service_time = None
+        self._counters = {'admitted': 0, 'queued': 0, 'rejected': 0, 'degraded': 0}
+
+    def enter(self) -> Optional['Slot']:
+        """Wait for a slot; returns None if the queue is full or the wait timed out."""
+        deadline = time.monotonic() + self.queue_timeout
+        with self._cond:
+            slot = self._take()
+            if slot is not None:
+                return slot
+            if not self._join_queue():
+                return None
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    # Slots freed by other processes are not notified; poll for them
+                    self._cond.wait(min(remaining, POLL_INTERVAL) if self.lock_dir else remaining)
+                    slot = self._take()
+                    if slot is not None:
+                        return slot
+            finally:
+                self._queued -= 1
+
+    async def enter_async(self) -> Optional['Slot']:
+        """Async counterpart of ``enter``; polls instead of blocking the event loop."""
+        deadline = time.monotonic() + self.queue_timeout
+        with self._cond:
+            slot = self._take()
+            if slot is not None:
+                return slot
+            if not self._join_queue():
+                return None
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(POLL_INTERVAL)
+                with self._cond:
+                    slot = self._take()
+                if slot is not None:
+                    return slot
+            return None
+        finally:
+            with self._cond:
+                self._queued -= 1
+
+    def leave(self, slot: 'Slot'):
+        with self._cond:
+            self._in_flight -= 1
+            held = time.monotonic() - slot.entered
+            if self._service_time is None:
+                self._service_time = held
+            else:
+                self._service_time += SERVICE_TIME_WEIGHT * (held - self._service_time)
+            self._cond.notify()
+        if slot.lock_file is not None:
+            slot.lock_file.close()  # releases the lock
+
+    def record_overload(self, degraded: bool):
+        with self._cond:
+            self._counters['degraded' if degraded else 'rejected'] += 1
+
+    def retry_after(self) -> int:
+        """Seconds until a rejected client is likely to find a free slot."""
+        with self._cond:
+            service_time = self._service_time or 1.0
+            backlog = self._queued + 1
+        seconds = math.ceil(service_time * backlog / max(self.max_concurrent, 1))
+        return min(max(seconds, 1), MAX_RETRY_AFTER)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            total = self._counters['admitted'] + self._counters['rejected'] + self._counters['degraded']
+            overloaded = self._counters['rejected'] + self._counters['degraded']
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'cross_process': self.lock_dir is not None,
+                'in_flight': self._in_flight,
+                'queue_depth': self._queued,
+                'avg_service_seconds': round(self._service_time, 3) if self._service_time is not None else None,
+                'rejection_rate': round(overloaded / total, 4) if total else 0.0,
+                **self._counters,
+            }
+
+    def _join_queue(self) -> bool:
+        if self._queued >= self.max_queue:
+            return False
+        self._queued += 1
+        self._counters['queued'] += 1
+        return True
+
+    def _take(self) -> Optional['Slot']:
+        if self._in_flight >= self.max_concurrent:
+            return None
+        lock_file = None
+        if self.lock_dir:
+            lock_file = self._lock_free_slot()
+            if lock_file is None:
+                return None
+        self._in_flight += 1
+        self._counters['admitted'] += 1
+        return Slot(lock_file)
+
+    def _lock_free_slot(self):
+        """Lock one of the host-wide slot files, or return None if all are taken."""
+        try:
+            os.makedirs(self.lock_dir, exist_ok=True)
+        except OSError as e:
+            print(f"AI admission slots unavailable, counting per process: {e}")
+            self.lock_dir = None
+            return None
+        for index in range(self.max_concurrent):
+            lock_file = open(os.path.join(self.lock_dir, f"{self.name}-slot-{index}.lock"), 'a')
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return lock_file
+            except BlockingIOError:
+                lock_file.close()
+        return None
+
+
+class Slot:
+    """A held admission slot."""
+
+    def __init__(self, lock_file=None):
+        self.lock_file = lock_file
+        self.entered = time.monotonic()
+
+
+class AdmissionGateRegistry:
+    """Process-wide admission gates for the sync and async AI views."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gates = {}
+
+    def gate(self, kind: str) -> AdmissionGate:
+        gate = self._gates.get(kind)
+        if gate is None:
+            with self._lock:
+                gate = self._gates.get(kind)
+                if gate is None:
+                    gate = self._gates[kind] = self._create(kind)
+        return gate
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {kind: self.gate(kind).snapshot() for kind in ('sync', 'async')}
+
+    def reset(self):
+        with self._lock:
+            self._gates.clear()
+
+    def _create(self, kind: str) -> AdmissionGate:
+        if kind == 'async':
+            return AdmissionGate(
+                'async', settings.AI_ADMISSION_ASYNC_MAX_CONCURRENT,
+                settings.AI_ADMISSION_MAX_QUEUE, settings.AI_ADMISSION_QUEUE_TIMEOUT
+            )
+        return AdmissionGate(
+            'sync', settings.AI_ADMISSION_MAX_CONCURRENT,
+            settings.AI_ADMISSION_MAX_QUEUE, settings.AI_ADMISSION_QUEUE_TIMEOUT,
+            lock_dir=settings.AI_ADMISSION_DIR if settings.AI_ADMISSION_CROSS_PROCESS else None
+        )
+
+
+def admission_controlled(handler):
+    """
+    Decorate an AI view handler (sync or async) with admission control.
+
+    On overload in ``degrade`` mode the handler still runs, with
+    ``request.ai_degraded`` set so the view uses the rule-based engine.
+    """
+    if asyncio.iscoroutinefunction(handler):
+        @wraps(handler)
+        async def async_wrapper(view, request, *args, **kwargs):
+            gate = admission_gates.gate('async')
+            slot = await gate.enter_async()
+            if slot is None:
+                response = _overloaded(gate, request)
+                return response if response is not None else await handler(view, request, *args, **kwargs)
+            try:
+                return await handler(view, request, *args, **kwargs)
+            finally:
+                gate.leave(slot)
+        return async_wrapper
+
+    @wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        gate = admission_gates.gate('sync')
+        slot = gate.enter()
+        if slot is None:
+            response = _overloaded(gate, request)
+            return response if response is not None else handler(view, request, *args, **kwargs)
+        try:
+            response = handler(view, request, *args, **kwargs)
+        except BaseException:
+            gate.leave(slot)
+            raise
+        if isinstance(response, StreamingHttpResponse):
+            # Hold the slot until the stream is finished or abandoned
+            response.streaming_content = _ReleasingIterator(response.streaming_content, gate, slot)
+        else:
+            gate.leave(slot)
+        return response
+    return wrapper
+
+
+def _overloaded(gate: AdmissionGate, request) -> Optional[JsonResponse]:
+    """Handle an overloaded request: a 503 response, or None to serve it degraded."""
+    degraded = settings.AI_ADMISSION_OVERLOAD == 'degrade'
+    gate.record_overload(degraded)
+    if degraded:
+        request.ai_degraded = True
+        return None
+    retry_after = gate.retry_after()
+    response = JsonResponse(
+        {'error': 'AI service is overloaded, please retry later', 'retry_after': retry_after},
+        status=503
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+class _ReleasingIterator:
+    """Iterate a streaming body and release the admission slot exactly once."""
+
+    def __init__(self, iterator, gate: AdmissionGate, slot: Slot):
+        self._iterator = iter(iterator)
+        self._gate = gate
+        self._slot = slot
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._iterator)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        if self._slot is not None:
+            slot, self._slot = self._slot, None
+            self._gate.leave(slot)
+        close = getattr(self._iterator, 'close', None)
+        if close is not None:
+            close()
+
+
+admission_gates = AdmissionGateRegistry()
@@ -0,0 +1,284 @@
+"""
+Async AI service for the ASGI endpoints.
+
+AsyncAIService mirrors AIService's public operations as coroutines. Provider
+calls go through async clients (httpx.AsyncClient for LM Studio, AsyncAnthropic
+and AsyncOpenAI) pooled per event loop, so one process can hold hundreds of
+in-flight LLM requests without a thread per request. Prompts, parsing, the
+result cache, rate limiters, circuit breakers, hedging, chunking, schema
+validation and the rule-based fallback are shared with AIService.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+import httpx
+from django.conf import settings
+from .cache import ai_cache
+from .chunking import merge_analyses, split_text
+from .clients import provider_clients
+from .coalescing import async_single_flight
+from .health import OPEN, ProviderUnavailable, provider_health
+from .hedging import run_hedged_async
+from .prioritization import merge_chunk_scores, plan_chunks, rule_score
+from .ratelimit import RateLimited, max_wait, rate_limiters, retry_after_header
+from .structured import StructuredOutputError, repair_prompt
+from .services import AIService
+
+
+class AsyncAIService(AIService):
+    """
+    AIService with coroutine versions of the public operations.
+
+    ``analyze_context``, ``enhance_task`` and ``prioritize_tasks`` must be
+    awaited. Concurrent identical calls in the same event loop share one
+    in-flight call.
+    """
+
+    async def analyze_context(self, content: str, source_type: str) -> Dict[str, Any]:
+        """
+        Analyze context content and extract insights, tasks, and metadata.
+
+        Args:
+            content: The text content to analyze
+            source_type: Type of source (whatsapp, email, notes, etc.)
+
+        Returns:
+            Dictionary containing analysis results
+        """
+        async def analyze():
+            if self._needs_chunking(content):
+                chunks = split_text(content, settings.AI_CHUNK_TOKEN_BUDGET)
+                analyses = await self._gather_bounded(
+                    [self._analyze_content_async(chunk, source_type) for chunk in chunks]
+                )
+                return merge_analyses(chunks, analyses)
+            return await self._analyze_content_async(content, source_type)
+
+        return await self._coalesce_async('analyze_context', (content, source_type), analyze)
+
+    async def enhance_task(self, title: str, description: str, category: str = None) -> Dict[str, Any]:
+        """
+        Enhance a task with AI-powered suggestions.
+
+        Args:
+            title: Task title
+            description: Task description
+            category: Optional category
+
+        Returns:
+            Dictionary with enhanced task data
+        """
+        prompt = self._build_task_enhancement_prompt(title, description, category)
+        return await self._coalesce_async('enhance_task', (title, description, category), lambda: self._dispatch_async(
+            'enhance_task', prompt, self._parse_enhancement_response,
+            lambda: self._enhance_task_rules(title, description, category)
+        ))
+
+    async def prioritize_tasks(self, tasks: List[Dict]) -> List[Dict]:
+        """
+        Prioritize tasks based on AI analysis.
+
+        Args:
+            tasks: List of task dictionaries
+
+        Returns:
+            List of tasks with updated priority scores
+        """
+        async def prioritize():
+            if not self.configured_providers():
+                return self._prioritize_with_rules(self._copy_tasks(tasks))
+
+            task_copies = self._copy_tasks(tasks)
+            if len(tasks) > settings.AI_PRIORITIZE_CHUNK_SIZE:
+                chunks, anchors = plan_chunks(task_copies, settings.AI_PRIORITIZE_CHUNK_SIZE, settings.AI_PRIORITIZE_ANCHORS)
+                raw_scores = await self._gather_bounded(
+                    [self._score_tasks_async([task_copies[i] for i in chunk]) for chunk in chunks]
+                )
+                return merge_chunk_scores(task_copies, chunks, anchors, raw_scores)
+
+            scores = await self._score_tasks_async(task_copies)
+            return self._apply_priority_scores(task_copies, scores)
+
+        return await self._coalesce_async('prioritize_tasks', (tasks,), prioritize)
+
+    async def _analyze_content_async(self, content: str, source_type: str) -> Dict[str, Any]:
+        """Analyze content with a single prompt through the provider chain."""
+        prompt = self._build_context_analysis_prompt(content, source_type)
+        return await self._dispatch_async(
+            'analyze_context', prompt, self._parse_analysis_response,
+            lambda: self._analyze_with_rules(content, source_type)
+        )
+
+    async def _score_tasks_async(self, tasks: List[Dict]) -> List:
+        """Positional priority scores for tasks, from the provider chain or the rules."""
+        prompt = self._build_prioritization_prompt(tasks)
+        return await self._dispatch_async(
+            'prioritize_tasks', prompt, self._parse_priority_scores,
+            lambda: [rule_score(task) for task in tasks]
+        )
+
+    async def _coalesce_async(self, operation: str, inputs: tuple, call) -> Any:
+        if self.rules_only:
+            return await call()
+        key = async_single_flight.make_key(operation, *inputs, options=self._coalesce_options())
+        return await async_single_flight.do(key, call)
+
+    async def _gather_bounded(self, coroutines: List) -> List:
+        """Await coroutines concurrently, at most AI_CHUNK_MAX_WORKERS at a time."""
+        semaphore = asyncio.Semaphore(settings.AI_CHUNK_MAX_WORKERS)
+
+        async def bounded(coroutine):
+            async with semaphore:
+                return await coroutine
+
+        return await asyncio.gather(*[bounded(coroutine) for coroutine in coroutines])
+
+    async def _dispatch_async(self, operation: str, prompt: str, parse, fallback) -> Any:
+        """
+        Try each configured provider in order, then the rule-based fallback.
+
+        Interactive calls with a latency budget are hedged instead.
+        """
+        budget = settings.AI_LATENCY_BUDGETS.get(operation) if self.interactive else None
+        if budget:
+            candidates = [
+                (provider, lambda provider=provider: self._run_completion_async(operation, provider, prompt, parse))
+                for provider in self.configured_providers()
+                if provider_health.breaker(provider).state != OPEN
+            ]
+            return await run_hedged_async(operation, candidates, fallback, budget, self._hedge_delay)
+
+        for provider in self.configured_providers():
+            try:
+                return await self._run_completion_async(operation, provider, prompt, parse)
+            except ProviderUnavailable:
+                continue
+            except Exception as e:
+                print(f"AI {operation} with {provider} failed: {e}")
+
+        return fallback()
+
+    async def _validated_response_async(self, operation: str, provider: str, ai_response: str, completion,
+                                        chosen, params: Dict[str, Any], timeout: float) -> str:
+        """Async counterpart of ``_validated_response``, with the repair call awaited."""
+        errors = self._schema_errors(operation, provider, ai_response)
+        if not errors:
+            return ai_response
+
+        try:
+            async with rate_limiters.limiter(provider).permit_async(
+                chosen.total_tokens, self.priority, max_wait(self.priority)
+            ):
+                repaired = await completion(
+                    repair_prompt(operation, ai_response, errors),
+                    model=chosen.model, timeout=timeout, **self._repair_params(params)
+                )
+        except Exception as e:
+            print(f"AI {operation} repair with {provider} failed: {e}")
+            repaired = ''
+        return self._accept_repair(operation, provider, errors, repaired)
+
+    async def _run_completion_async(self, operation: str, provider: str, prompt: str, parse) -> Any:
+        """Async counterpart of ``_run_completion`` (cache, rate limit, circuit breaker, validation, parse)."""
+        chosen, params, timeout = self._completion_params(operation, provider, prompt)
+        model = chosen.model
+        key = None
+        if self.use_cache:
+            key = ai_cache.make_key(operation, provider, model, prompt, params)
+            cached = ai_cache.get(key)
+            if cached is not None:
+                return cached
+
+        completion = {
+            'lm_studio': self._lm_studio_completion_async,
+            'anthropic': self._claude_completion_async,
+            'openai': self._openai_completion_async,
+        }[provider]
+
+        limiter = rate_limiters.limiter(provider)
+        async with limiter.permit_async(chosen.total_tokens, self.priority, max_wait(self.priority)):
+            breaker = provider_health.breaker(provider)
+            if not breaker.allow_request():
+                raise ProviderUnavailable(f"{provider} circuit is open")
+
+            start = time.monotonic()
+            try:
+                ai_response = await completion(prompt, model=model, timeout=timeout, **params)
+            except asyncio.CancelledError:
+                # Lost a hedge race; not the provider's fault
+                breaker.release_probe()
+                raise
+            except Exception as e:
+                self._record_provider_error(provider, breaker, e)
+                raise
+            latency = time.monotonic() - start
+
+        # Output that stays invalid after its repair counts as a failed call
+        try:
+            ai_response = await self._validated_response_async(
+                operation, provider, ai_response, completion, chosen, params, timeout
+            )
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        except StructuredOutputError as e:
+            breaker.record_failure(e)
+            raise
+        breaker.record_success(latency)
+        result = parse(ai_response)
+
+        if key:
+            ai_cache.set(key, result)
+        return result
+
+    async def _lm_studio_completion_async(self, prompt: str, system: str, model: str, temperature: float, max_tokens: int, timeout: float,
+                                          schema: Optional[Dict[str, Any]] = None) -> str:
+        """Run a chat completion against LM Studio over the pooled async client."""
+        response = await provider_clients.async_lm_studio_client().post(
+            f"{self.lm_studio_url}/v1/chat/completions",
+            json={
+                "model": model,
+                "messages": self._chat_messages(system, prompt),
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                **self._response_format('lm_studio', schema)
+            },
+            timeout=httpx.Timeout(timeout, connect=settings.AI_HTTP_CONNECT_TIMEOUT)
+        )
+
+        if response.status_code == 200:
+            result = response.json()
+            return result['choices'][0]['message']['content']
+        elif response.status_code == 429:
+            raise RateLimited("LM Studio API error: 429", retry_after_header(response))
+        else:
+            raise Exception(f"LM Studio API error: {response.status_code}")
+
+    async def _openai_completion_async(self, prompt: str, system: str, model: str, temperature: float, max_tokens: int, timeout: float,
+                                       schema: Optional[Dict[str, Any]] = None) -> str:
+        """Run a chat completion with the async OpenAI client."""
+        client = provider_clients.async_openai_client(self.openai_key)
+        response = await client.chat.completions.create(
+            model=model,
+            messages=self._chat_messages(system, prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+            **self._response_format('openai', schema)
+        )
+        return response.choices[0].message.content
+
+    async def _claude_completion_async(self, prompt: str, system: str, model: str, max_tokens: int, timeout: float,
+                                       schema: Optional[Dict[str, Any]] = None) -> str:
+        """Create a message with the async Anthropic client."""
+        client = provider_clients.async_anthropic_client(self.anthropic_key)
+        prefill = self._claude_prefill(schema)
+        response = await client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            system=self._claude_system(system),
+            messages=self._claude_messages(prompt, prefill),
+            timeout=timeout
+        )
+        return prefill + response.content[0].text
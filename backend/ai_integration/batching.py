@@ -0,0 +1,73 @@
+"""
+Multi-document prompt packing for bulk context analysis and task enhancement.
+
+Pending context entries (or newly created tasks) are packed into batches that
+fit a prompt token budget, so one provider round trip handles several of
+them. Each item is wrapped in delimiters carrying its id; the model answers
+with one JSON section per id, which AIService demultiplexes back to the items.
+"""
+
+from typing import Any, Callable, Dict, List
+
+# Rough prompt-size estimate; good enough for packing decisions
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of tokens in text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def pack_entries(entries: List[Dict[str, Any]], token_budget: int, max_entries: int,
+                 text: Callable[[Dict[str, Any]], str] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Split entries into batches that fit the token budget.
+
+    Entries keep their order. An entry that is larger than the budget on its
+    own gets a batch to itself.
+
+    Args:
+        entries: Dicts with ``id``, ``content`` and ``source_type``
+        token_budget: Maximum estimated content tokens per batch
+        max_entries: Maximum number of entries per batch
+        text: Text of an entry counted against the budget; defaults to ``content``
+
+    Returns:
+        List of batches (lists of entries)
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+
+    for entry in entries:
+        tokens = estimate_tokens(text(entry) if text else entry['content'])
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_entries):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(entry)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def format_entry(entry: Dict[str, Any]) -> str:
+    """Wrap one entry in id-carrying delimiters for a batch prompt."""
+    return (
+        f"=== ENTRY {entry['id']} (source: {entry['source_type']}) ===\n"
+        f"{entry['content']}\n"
+        f"=== END ENTRY {entry['id']} ==="
+    )
+
+
+def format_task(task: Dict[str, Any]) -> str:
+    """Wrap one task in id-carrying delimiters for a batch enhancement prompt."""
+    return (
+        f"=== TASK {task['id']} ===\n"
+        f"Title: {task['title']}\n"
+        f"Description: {task.get('description') or ''}\n"
+        f"Category: {task.get('category') or 'Unknown'}\n"
+        f"=== END TASK {task['id']} ==="
+    )
@@ -0,0 +1,136 @@
+"""
+Content-addressed cache for parsed AI results.
+
+Results are keyed by a hash of the normalized prompt, provider, model and
+generation parameters. Lookups go through two tiers:
+
+1. an in-process LRU, so a warm hit costs microseconds, and
+2. a persistent Django cache (``CACHES['ai_results']``, file-based by default)
+   that survives restarts and is shared by web and worker processes. TTL and
+   size-based eviction are handled by the cache backend (``TIMEOUT`` and
+   ``MAX_ENTRIES``).
+"""
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.core.cache import caches
+
+KEY_VERSION = 1
+
+
+class AIResultCache:
+    """Two-tier (LRU + persistent) cache with hit/miss counters."""
+
+    def __init__(self, max_entries: int, ttl: int, persistent_alias: Optional[str] = 'ai_results'):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persistent_alias = persistent_alias
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'memory_hits': 0, 'persistent_hits': 0, 'misses': 0, 'stores': 0}
+
+    @staticmethod
+    def make_key(operation: str, provider: str, model: str, prompt: str, params: Dict[str, Any]) -> str:
+        """Build the cache key for a provider call."""
+        normalized_prompt = ' '.join(prompt.split())
+        material = json.dumps(
+            [KEY_VERSION, operation, provider, model, normalized_prompt, params],
+            sort_keys=True,
+            default=str
+        )
+        return f"ai:{operation}:{hashlib.sha256(material.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a copy of the cached value, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._lru.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return copy.deepcopy(value)
+                del self._lru[key]
+
+        value = self._persistent_get(key)
+        if value is not None:
+            self._remember(key, value)
+            self._count('persistent_hits')
+            return copy.deepcopy(value)
+
+        self._count('misses')
+        return None
+
+    def set(self, key: str, value: Any):
+        """Store a value in both tiers."""
+        value = copy.deepcopy(value)
+        self._remember(key, value)
+        self._persistent_set(key, value)
+        self._count('stores')
+
+    def clear(self):
+        """Empty both tiers and reset the counters."""
+        with self._lock:
+            self._lru.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+        backend = self._backend()
+        if backend is not None:
+            backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and the current in-memory size."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._lru)
+        lookups = stats['memory_hits'] + stats['persistent_hits'] + stats['misses']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _remember(self, key: str, value: Any):
+        with self._lock:
+            self._lru[key] = (time.monotonic() + self.ttl, value)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _backend(self):
+        if not self.persistent_alias or self.persistent_alias not in settings.CACHES:
+            return None
+        return caches[self.persistent_alias]
+
+    def _persistent_get(self, key: str) -> Optional[Any]:
+        backend = self._backend()
+        if backend is None:
+            return None
+        try:
+            return backend.get(key)
+        except Exception as e:
+            print(f"AI cache read failed: {e}")
+            return None
+
+    def _persistent_set(self, key: str, value: Any):
+        backend = self._backend()
+        if backend is None:
+            return
+        try:
+            backend.set(key, value, timeout=self.ttl)
+        except Exception as e:
+            print(f"AI cache write failed: {e}")
+
+
+ai_cache = AIResultCache(
+    max_entries=settings.AI_CACHE_LRU_SIZE,
+    ttl=settings.AI_CACHE_TTL
+)
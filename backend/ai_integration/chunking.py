@@ -0,0 +1,149 @@
+"""
+Map-reduce chunking for long context entries.
+
+Content that does not fit the analysis prompt is split at paragraph and then
+sentence boundaries into chunks of at most ``AI_CHUNK_TOKEN_BUDGET`` tokens.
+AIService analyzes the chunks concurrently on a bounded pool and merges the
+per-chunk results, so latency follows the slowest chunk rather than the total
+length of the content.
+"""
+
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+from django.conf import settings
+from .batching import CHARS_PER_TOKEN, estimate_tokens
+
+PARAGRAPH_RE = re.compile(r'\n\s*\n')
+SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+TITLE_NOISE_RE = re.compile(r'[^\w\s]')
+
+URGENCY_LEVELS = ['low', 'medium', 'high', 'critical']
+MAX_KEYWORDS = 10
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Process-wide pool that bounds concurrent chunk analyses."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.AI_CHUNK_MAX_WORKERS,
+                    thread_name_prefix='ai-chunk'
+                )
+    return _executor
+
+
+def split_text(content: str, token_budget: int) -> List[str]:
+    """
+    Split content into chunks of at most ``token_budget`` estimated tokens.
+
+    Paragraphs are kept together where possible; oversized paragraphs are
+    split into sentences, and oversized sentences are cut by length.
+    """
+    pieces = []
+    for paragraph in PARAGRAPH_RE.split(content):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= token_budget:
+            pieces.append((paragraph, '\n\n'))
+            continue
+        for sentence in SENTENCE_RE.split(paragraph):
+            for part in _cut(sentence, token_budget):
+                pieces.append((part, ' '))
+
+    chunks = []
+    current = ''
+    for piece, separator in pieces:
+        candidate = f"{current}{separator}{piece}" if current else piece
+        if current and estimate_tokens(candidate) > token_budget:
+            chunks.append(current)
+            current = piece
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def merge_analyses(chunks: List[str], analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge per-chunk context analyses into one result.
+
+    Extracted tasks are deduplicated by normalized title (keeping the highest
+    priority), keywords are ranked by how many chunks mention them and the
+    sentiment score is weighted by chunk length.
+    """
+    tasks = {}
+    keyword_counts = Counter()
+    summaries = []
+    urgency = None
+    weighted_sentiment = 0.0
+    total_length = 0
+
+    for chunk, analysis in zip(chunks, analyses):
+        for task in analysis.get('extracted_tasks') or []:
+            if not isinstance(task, dict):
+                continue
+            key = _task_key(task)
+            if key not in tasks or _priority(task) > _priority(tasks[key]):
+                tasks[key] = task
+
+        keyword_counts.update(
+            str(keyword).lower() for keyword in analysis.get('keywords') or []
+        )
+
+        try:
+            sentiment = float(analysis.get('sentiment_score') or 0.0)
+        except (TypeError, ValueError):
+            sentiment = 0.0
+        weighted_sentiment += sentiment * len(chunk)
+        total_length += len(chunk)
+
+        insights = analysis.get('insights') or {}
+        if isinstance(insights, dict):
+            if insights.get('summary'):
+                summaries.append(str(insights['summary']))
+            level = str(insights.get('urgency_level', '')).lower()
+            if level in URGENCY_LEVELS and (urgency is None or URGENCY_LEVELS.index(level) > URGENCY_LEVELS.index(urgency)):
+                urgency = level
+
+    sentiment_score = weighted_sentiment / total_length if total_length else 0.0
+    insights = {
+        'summary': ' '.join(summaries),
+        'task_count': len(tasks),
+        'chunks': len(chunks),
+    }
+    if urgency:
+        insights['urgency_level'] = urgency
+
+    return {
+        'insights': insights,
+        'extracted_tasks': list(tasks.values()),
+        'sentiment_score': round(sentiment_score, 4),
+        'keywords': [keyword for keyword, count in keyword_counts.most_common(MAX_KEYWORDS)],
+    }
+
+
+def _cut(text: str, token_budget: int) -> List[str]:
+    limit = max(token_budget - 1, 1) * CHARS_PER_TOKEN
+    return [text[i:i + limit] for i in range(0, len(text), limit)]
+
+
+def _task_key(task: Dict[str, Any]) -> str:
+    title = TITLE_NOISE_RE.sub('', str(task.get('title', '')).lower())
+    return ' '.join(title.split())
+
+
+def _priority(task: Dict[str, Any]) -> float:
+    try:
+        return float(task.get('priority') or 0)
+    except (TypeError, ValueError):
+        return 0.0
@@ -0,0 +1,158 @@
+"""
+Shared AI provider clients.
+
+AIService is instantiated per request, so provider clients live in a
+process-wide registry instead. Each client keeps a keep-alive connection pool,
+which saves the TCP (and TLS) handshake on every call after the first.
+
+Async clients (used by AsyncAIService) are bound to the event loop they were
+created in, so they are kept per running loop.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+
+class ProviderClientRegistry:
+    """Process-wide registry of pooled, persistent clients for each AI provider."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    def lm_studio_session(self) -> requests.Session:
+        """Get the pooled HTTP session used for LM Studio's OpenAI-compatible API."""
+        return self._get_or_create(('lm_studio', settings.LM_STUDIO_BASE_URL), self._build_session)
+
+    def anthropic_client(self, api_key: str):
+        """Get the shared Anthropic client for the given API key."""
+        return self._get_or_create(('anthropic', api_key), lambda: self._build_anthropic(api_key))
+
+    def openai_client(self, api_key: str):
+        """Get the shared OpenAI client for the given API key."""
+        return self._get_or_create(('openai', api_key), lambda: self._build_openai(api_key))
+
+    def async_lm_studio_client(self):
+        """Get the pooled async HTTP client for LM Studio in the running event loop."""
+        return self._get_or_create_async(('lm_studio', settings.LM_STUDIO_BASE_URL), self._build_async_httpx_client)
+
+    def async_anthropic_client(self, api_key: str):
+        """Get the async Anthropic client for the given API key in the running event loop."""
+        return self._get_or_create_async(('anthropic', api_key), lambda: self._build_async_anthropic(api_key))
+
+    def async_openai_client(self, api_key: str):
+        """Get the async OpenAI client for the given API key in the running event loop."""
+        return self._get_or_create_async(('openai', api_key), lambda: self._build_async_openai(api_key))
+
+    def reset(self, close: bool = True):
+        """Drop all clients so the next call builds fresh connection pools."""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+            # Async clients can only be closed from their own loop; drop them
+            self._async_clients = weakref.WeakKeyDictionary()
+        if not close:
+            return
+        for client in clients.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    def _get_or_create(self, key, factory):
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = factory()
+                    self._clients[key] = client
+        return client
+
+    def _get_or_create_async(self, key, factory):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = clients[key] = factory()
+        return client
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=settings.AI_HTTP_POOL_CONNECTIONS,
+            pool_maxsize=settings.AI_HTTP_POOL_MAXSIZE,
+            pool_block=False
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _build_httpx_client(self):
+        import httpx
+        return httpx.Client(
+            limits=httpx.Limits(
+                max_connections=settings.AI_HTTP_POOL_MAXSIZE,
+                max_keepalive_connections=settings.AI_HTTP_POOL_MAXSIZE,
+                keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(settings.AI_HTTP_READ_TIMEOUT, connect=settings.AI_HTTP_CONNECT_TIMEOUT)
+        )
+
+    def _build_async_httpx_client(self):
+        import httpx
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.AI_ASYNC_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_ASYNC_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(settings.AI_HTTP_READ_TIMEOUT, connect=settings.AI_HTTP_CONNECT_TIMEOUT)
+        )
+
+    def _build_anthropic(self, api_key: str):
+        import anthropic
+        return anthropic.Anthropic(
+            api_key=api_key,
+            http_client=self._build_httpx_client(),
+            max_retries=settings.AI_PROVIDER_MAX_RETRIES
+        )
+
+    def _build_openai(self, api_key: str):
+        import openai
+        return openai.OpenAI(
+            api_key=api_key,
+            http_client=self._build_httpx_client(),
+            max_retries=settings.AI_PROVIDER_MAX_RETRIES
+        )
+
+
+    def _build_async_anthropic(self, api_key: str):
+        import anthropic
+        return anthropic.AsyncAnthropic(
+            api_key=api_key,
+            http_client=self._build_async_httpx_client(),
+            max_retries=settings.AI_PROVIDER_MAX_RETRIES
+        )
+
+    def _build_async_openai(self, api_key: str):
+        import openai
+        return openai.AsyncOpenAI(
+            api_key=api_key,
+            http_client=self._build_async_httpx_client(),
+            max_retries=settings.AI_PROVIDER_MAX_RETRIES
+        )
+
+
+provider_clients = ProviderClientRegistry()
+
+if hasattr(os, 'register_at_fork'):
+    # Forked workers must not share the parent's sockets; drop the references
+    # without closing them so the parent's connections stay intact.
+    os.register_at_fork(after_in_child=lambda: provider_clients.reset(close=False))
@@ -0,0 +1,257 @@
+"""
+Single-flight coalescing of concurrent identical AI requests.
+
+Callers asking for the same operation on the same normalized input while a
+call is already in flight wait for that call and share its result instead of
+making their own provider call.
+
+Within a process the first caller (the leader) runs the call and the others
+wait on an event. Across processes on one host the leaders coordinate through
+an exclusive file lock per key: a process that finds the lock taken waits for
+it, then reuses the result file the holder wrote while it was waiting. Where
+``fcntl`` is unavailable only in-process coalescing is done.
+
+``AsyncSingleFlight`` coalesces coroutine calls within each event loop; it
+does not take file locks, which would block the loop.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+KEY_VERSION = 2
+LOCK_POLL_INTERVAL = 0.05
+# Result and lock files older than this are pruned
+STALE_FILE_SECONDS = 3600
+PRUNE_EVERY = 200
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._writes = 0
+        self._counters = {'leaders': 0, 'coalesced': 0, 'cross_process': 0}
+
+    @staticmethod
+    def make_key(operation: str, *args: Any, options: Dict[str, Any] = None) -> str:
+        """
+        Key for an operation and its inputs, with whitespace normalized.
+
+        ``options`` are the caller settings that change the result (e.g.
+        whether the cache or a latency budget applies); only callers with
+        equal options share a call.
+        """
+        material = json.dumps([KEY_VERSION, operation, _normalize(args), options or {}], sort_keys=True, default=str)
+        return f"{operation}-{hashlib.sha256(material.encode('utf-8')).hexdigest()}"
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run ``fn`` unless an identical call is in flight, and return its result.
+
+        Callers that joined an in-flight call get their own copy of the
+        result; if the shared call raised, they see the same exception.
+        """
+        if not settings.AI_COALESCE_ENABLED:
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._counters['leaders'] += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self._counters['coalesced'] += 1
+                leader = False
+
+        if not leader:
+            if call.done.wait(settings.AI_COALESCE_WAIT_SECONDS):
+                if call.error is not None:
+                    raise call.error
+                return copy.deepcopy(call.result)
+            # The leader is taking too long; don't wait on it forever
+            return fn()
+
+        try:
+            result = self._run_across_processes(key, fn)
+            with self._lock:
+                self._calls.pop(key, None)
+            if call.waiters:
+                # Waiters copy from a snapshot the leader's caller cannot mutate
+                call.result = copy.deepcopy(result)
+            return result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters, in_flight=len(self._calls))
+
+    def _run_across_processes(self, key: str, fn: Callable[[], Any]) -> Any:
+        if fcntl is None or not settings.AI_COALESCE_CROSS_PROCESS:
+            return fn()
+
+        try:
+            os.makedirs(settings.AI_COALESCE_DIR, exist_ok=True)
+            lock_file = open(os.path.join(settings.AI_COALESCE_DIR, f"{key}.lock"), 'a')
+        except OSError as e:
+            print(f"AI request coalescing lock unavailable: {e}")
+            return fn()
+
+        result_path = os.path.join(settings.AI_COALESCE_DIR, f"{key}.json")
+        try:
+            if self._try_lock(lock_file):
+                return self._run_and_publish(fn, result_path)
+
+            # Another process is running the same call; wait for it to finish
+            waiting_since = time.time()
+            deadline = time.monotonic() + settings.AI_COALESCE_WAIT_SECONDS
+            while not self._try_lock(lock_file):
+                if time.monotonic() >= deadline:
+                    return fn()
+                time.sleep(LOCK_POLL_INTERVAL)
+
+            shared = self._read_result(result_path, waiting_since)
+            if shared is not None:
+                with self._lock:
+                    self._counters['cross_process'] += 1
+                return shared['result']
+            # The other process failed or published nothing; run it ourselves
+            return self._run_and_publish(fn, result_path)
+        finally:
+            lock_file.close()  # also releases the lock
+
+    def _run_and_publish(self, fn: Callable[[], Any], result_path: str) -> Any:
+        result = fn()
+        try:
+            temp_path = f"{result_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump({'result': result}, f, default=str)
+            os.replace(temp_path, result_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"AI request coalescing could not publish result: {e}")
+        self._maybe_prune()
+        return result
+
+    def _read_result(self, result_path: str, written_after: float):
+        """Read a result file written by another process after ``written_after``."""
+        try:
+            if os.path.getmtime(result_path) < written_after:
+                return None
+            with open(result_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _try_lock(self, lock_file) -> bool:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _maybe_prune(self):
+        with self._lock:
+            self._writes += 1
+            if self._writes % PRUNE_EVERY:
+                return
+        cutoff = time.time() - STALE_FILE_SECONDS
+        try:
+            with os.scandir(settings.AI_COALESCE_DIR) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+        except OSError:
+            pass
+
+
+class AsyncSingleFlight:
+    """Share one in-flight coroutine call between concurrent callers in an event loop."""
+
+    def __init__(self):
+        self._calls = {}
+        self._counters = {'leaders': 0, 'coalesced': 0}
+
+    make_key = staticmethod(SingleFlight.make_key)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``fn`` unless an identical call is in flight, and return its result."""
+        if not settings.AI_COALESCE_ENABLED:
+            return await fn()
+
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        future = self._calls.get(call_key)
+        if future is not None:
+            self._counters['coalesced'] += 1
+            try:
+                result = await asyncio.wait_for(asyncio.shield(future), settings.AI_COALESCE_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                return await fn()
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    # The leader was cancelled, not us; make the call ourselves
+                    return await fn()
+                raise
+            return copy.deepcopy(result)
+
+        future = self._calls[call_key] = loop.create_future()
+        self._counters['leaders'] += 1
+        try:
+            result = await fn()
+            future.set_result(copy.deepcopy(result))
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody was waiting
+            raise
+        finally:
+            self._calls.pop(call_key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._counters, in_flight=len(self._calls))
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return value
+
+
+single_flight = SingleFlight()
+async_single_flight = AsyncSingleFlight()
@@ -0,0 +1,74 @@
+"""
+Bounded parallel fan-out for the batch AI endpoints.
+
+A batch request runs one call per item on a process-wide pool
+(``AI_FANOUT_MAX_WORKERS`` threads). Each request keeps at most
+``AI_FANOUT_PER_REQUEST`` of its items in flight and submits the next item
+as one finishes, so one large import cannot take over the pool, and results
+can be streamed back in completion order. Items that raise are reported
+with their error instead of failing the whole batch.
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List
+from django.conf import settings
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Process-wide pool shared by all batch requests."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.AI_FANOUT_MAX_WORKERS,
+                    thread_name_prefix='ai-fanout'
+                )
+    return _executor
+
+
+def fan_out(items: List[Any], call: Callable[[Any], Any], max_in_flight: int = None) -> Iterator[Dict[str, Any]]:
+    """
+    Run ``call`` on every item with bounded parallelism.
+
+    Yields one outcome per item as it completes: ``{'index', 'status': 'ok',
+    'result'}`` or ``{'index', 'status': 'error', 'error'}``. Closing the
+    iterator early cancels the items not yet started.
+    """
+    max_in_flight = max(max_in_flight or settings.AI_FANOUT_PER_REQUEST, 1)
+    executor = get_executor()
+    remaining = iter(enumerate(items))
+    in_flight = {}
+
+    def submit_next():
+        for index, item in remaining:
+            in_flight[executor.submit(call, item)] = index
+            return
+
+    try:
+        for _ in range(max_in_flight):
+            submit_next()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = in_flight.pop(future)
+                try:
+                    yield {'index': index, 'status': 'ok', 'result': future.result()}
+                except Exception as e:
+                    yield {'index': index, 'status': 'error', 'error': str(e)}
+                submit_next()
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def in_input_order(outcomes: Iterator[Dict[str, Any]], count: int) -> List[Dict[str, Any]]:
+    """Collect fan-out outcomes into a list ordered by item index."""
+    ordered = [None] * count
+    for outcome in outcomes:
+        ordered[outcome['index']] = outcome
+    return ordered
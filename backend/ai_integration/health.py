@@ -0,0 +1,208 @@
+"""
+Provider health tracking and circuit breakers.
+
+Each AI provider gets a CircuitBreaker that records call outcomes in a sliding
+time window. When a provider keeps failing the breaker opens and AIService
+skips straight to the next provider instead of waiting out another timeout.
+After a cool-down a single half-open probe is let through; its outcome closes
+the breaker again or re-opens it.
+
+State is per process, which is enough to stop each web or worker process from
+repeatedly hitting a provider that is down.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+from django.conf import settings
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class ProviderUnavailable(Exception):
+    """Raised when a provider's circuit breaker rejects a call."""
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker with a half-open probe."""
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float,
+        minimum_calls: int,
+        failure_rate_threshold: float,
+        consecutive_failures: int,
+        open_seconds: float,
+        latency_samples: int = 200
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.consecutive_failures_threshold = consecutive_failures
+        self.open_seconds = open_seconds
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._outcomes = deque()  # (timestamp, succeeded)
+        self._latencies = deque(maxlen=latency_samples)
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._last_error = ''
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be made now (claims the probe when half-open)."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self, latency: float):
+        """Record a successful call and its latency in seconds."""
+        now = time.monotonic()
+        with self._lock:
+            self._add_outcome(now, True)
+            self._latencies.append(latency)
+            self._consecutive_failures = 0
+            if self._state != CLOSED:
+                self._close()
+
+    def record_failure(self, error: Any = None):
+        """Record a failed call, opening the breaker if thresholds are crossed."""
+        now = time.monotonic()
+        with self._lock:
+            self._add_outcome(now, False)
+            self._consecutive_failures += 1
+            self._last_error = str(error or '')
+
+            if self._current_state(now) == HALF_OPEN:
+                self._open(now)
+                return
+
+            calls, failures = self._window_counts()
+            rate_tripped = calls >= self.minimum_calls and failures / calls >= self.failure_rate_threshold
+            streak_tripped = self._consecutive_failures >= self.consecutive_failures_threshold
+            if rate_tripped or streak_tripped:
+                self._open(now)
+
+    def release_probe(self):
+        """Give back an unused half-open probe (e.g. the call was never made)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """Latency (seconds) at the given percentile of recent successful calls."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        index = min(int(len(samples) * percentile), len(samples) - 1)
+        return samples[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and window statistics for reporting."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            self._prune(now)
+            calls, failures = self._window_counts()
+            retry_in = None
+            if state == OPEN:
+                retry_in = round(max(self._opened_at + self.open_seconds - now, 0), 2)
+            return {
+                'state': state,
+                'calls_in_window': calls,
+                'failures_in_window': failures,
+                'failure_rate': round(failures / calls, 4) if calls else 0.0,
+                'consecutive_failures': self._consecutive_failures,
+                'retry_in_seconds': retry_in,
+                'last_error': self._last_error,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._close()
+            self._latencies.clear()
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def _open(self, now: float):
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+
+    def _close(self):
+        self._state = CLOSED
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._consecutive_failures = 0
+        self._outcomes.clear()
+
+    def _add_outcome(self, now: float, succeeded: bool):
+        self._outcomes.append((now, succeeded))
+        self._prune(now)
+
+    def _prune(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def _window_counts(self):
+        calls = len(self._outcomes)
+        failures = sum(1 for _, succeeded in self._outcomes if not succeeded)
+        return calls, failures
+
+
+class ProviderHealthRegistry:
+    """Process-wide circuit breakers, one per provider."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(provider)
+                if breaker is None:
+                    breaker = CircuitBreaker(
+                        provider,
+                        window_seconds=settings.AI_BREAKER_WINDOW_SECONDS,
+                        minimum_calls=settings.AI_BREAKER_MINIMUM_CALLS,
+                        failure_rate_threshold=settings.AI_BREAKER_FAILURE_RATE,
+                        consecutive_failures=settings.AI_BREAKER_CONSECUTIVE_FAILURES,
+                        open_seconds=settings.AI_BREAKER_OPEN_SECONDS
+                    )
+                    self._breakers[provider] = breaker
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in breakers.items()}
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+
+
+provider_health = ProviderHealthRegistry()
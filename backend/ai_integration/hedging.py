@@ -0,0 +1,158 @@
+"""
+Hedged provider requests for latency-sensitive AI operations.
+
+The primary provider is called first. If it has not answered within its
+hedge delay (a percentile of its recent latency), the next candidate is
+started in parallel and the first valid answer wins. The rule-based engine is
+always the last candidate, so once the latency budget is spent the caller
+gets a rule-based answer instead of waiting out a provider timeout.
+
+Losing calls are cancelled if they have not started yet; calls already in
+flight are left to finish in the background and their results are ignored
+(they still feed the provider's health stats and the result cache).
+``run_hedged_async`` does the same with asyncio tasks, where losing calls are
+cancelled outright.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, List, Tuple
+from django.conf import settings
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.AI_HEDGE_MAX_WORKERS,
+                    thread_name_prefix='ai-hedge'
+                )
+    return _executor
+
+
+def run_hedged(
+    operation: str,
+    candidates: List[Tuple[str, Callable[[], Any]]],
+    fallback: Callable[[], Any],
+    budget: float,
+    hedge_delay: Callable[[str], float]
+) -> Any:
+    """
+    Race provider candidates within a latency budget.
+
+    Args:
+        operation: Operation name, used for logging
+        candidates: (provider, callable) pairs in order of preference
+        fallback: Rule-based callable, raced last and used once the budget is spent
+        budget: Total seconds the caller is willing to wait
+        hedge_delay: Returns how long to wait on a provider before hedging
+
+    Returns:
+        The first successful result
+    """
+    executor = _get_executor()
+    deadline = time.monotonic() + budget
+    queue = list(candidates) + [('rules', fallback)]
+    pending = {}
+
+    def launch_next():
+        if queue:
+            name, call = queue.pop(0)
+            pending[executor.submit(call)] = name
+            return name
+        return None
+
+    last_launched = launch_next()
+
+    try:
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            timeout = min(hedge_delay(last_launched), remaining) if queue else remaining
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    print(f"AI {operation} with {name} failed: {e}")
+
+            if not done or not pending:
+                # Primary is slow (hedge) or every in-flight call failed
+                launched = launch_next()
+                if launched is None and not pending:
+                    break
+                last_launched = launched or last_launched
+    finally:
+        for future in pending:
+            future.cancel()
+
+    return fallback()
+
+
+async def run_hedged_async(
+    operation: str,
+    candidates: List[Tuple[str, Callable[[], Awaitable[Any]]]],
+    fallback: Callable[[], Any],
+    budget: float,
+    hedge_delay: Callable[[str], float]
+) -> Any:
+    """
+    Race async provider candidates within a latency budget.
+
+    Same policy as ``run_hedged``; candidates are coroutine functions and the
+    rule-based fallback is a plain callable.
+    """
+    async def rules():
+        return fallback()
+
+    deadline = time.monotonic() + budget
+    queue = list(candidates) + [('rules', rules)]
+    pending = {}
+
+    def launch_next():
+        if queue:
+            name, call = queue.pop(0)
+            pending[asyncio.ensure_future(call())] = name
+            return name
+        return None
+
+    last_launched = launch_next()
+
+    try:
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            timeout = min(hedge_delay(last_launched), remaining) if queue else remaining
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    print(f"AI {operation} with {name} failed: {e}")
+
+            if not done or not pending:
+                # Primary is slow (hedge) or every in-flight call failed
+                launched = launch_next()
+                if launched is None and not pending:
+                    break
+                last_launched = launched or last_launched
+    finally:
+        for future in pending:
+            future.cancel()
+
+    return fallback()
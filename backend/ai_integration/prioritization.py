@@ -0,0 +1,180 @@
+"""
+Chunked prioritization for large task lists.
+
+A single prompt cannot score more than a few dozen tasks before the answer is
+truncated, so long lists are scored in fixed-size chunks in parallel. Every
+chunk also contains the same few calibration anchors (tasks spread across the
+rule-based priority range). Because models score each chunk relative to its
+own contents, each chunk's scores are mapped onto a shared scale with a
+linear fit from that chunk's anchor scores to the anchors' mean scores, and
+the calibrated chunks are merged into one ranking.
+
+Tasks whose score is missing from a chunk's answer (truncated or malformed
+output) get their rule-based priority instead of keeping a stale score.
+
+Wall-clock time is one chunk call while the list fits in one round of the
+chunk pool (``AI_CHUNK_MAX_WORKERS`` chunks of ``AI_PRIORITIZE_CHUNK_SIZE``
+tasks, 200 by default) and grows linearly with the number of rounds beyond
+that: every task has to be scored once, so with a bounded pool no merge
+strategy makes it logarithmic. The anchored merge itself is a single pass
+in Python, with no further model calls.
+"""
+
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from . import rules
+
+MIN_SCORE = 1
+MAX_SCORE = 10
+# Bounds on the per-chunk calibration slope, so one odd anchor score cannot
+# stretch or flatten a whole chunk
+MIN_SLOPE = 0.5
+MAX_SLOPE = 2.0
+
+
+def rule_score(task: Dict) -> int:
+    """Rule-based priority for a task dict."""
+    return rules.analyze_text(f"{task.get('title', '')} {task.get('description', '')}")['priority']
+
+
+def valid_score(value) -> Optional[float]:
+    """Return value as a score in range, or None if it is not a usable score."""
+    if isinstance(value, bool):
+        return None
+    try:
+        score = float(value)
+    except (TypeError, ValueError):
+        return None
+    if MIN_SCORE <= score <= MAX_SCORE:
+        return score
+    return None
+
+
+def choose_anchors(tasks: List[Dict], count: int) -> List[int]:
+    """Indices of ``count`` tasks spread evenly across the rule-based priority range."""
+    if count <= 0 or not tasks:
+        return []
+    ranked = sorted(range(len(tasks)), key=lambda i: rule_score(tasks[i]))
+    if count >= len(ranked):
+        return ranked
+    step = (len(ranked) - 1) / max(count - 1, 1)
+    picks = []
+    for n in range(count):
+        index = ranked[round(n * step)]
+        if index not in picks:
+            picks.append(index)
+    return picks
+
+
+def rank_in_chunks(
+    tasks: List[Dict],
+    score_chunk: Callable[[List[Dict]], Sequence],
+    chunk_size: int,
+    anchor_count: int,
+    executor
+) -> List[Dict]:
+    """
+    Score tasks in parallel chunks that share calibration anchors and merge them.
+
+    Args:
+        tasks: Task dicts (updated in place with ``priority_score``)
+        score_chunk: Returns positional scores for a list of tasks
+        chunk_size: Number of non-anchor tasks per chunk
+        anchor_count: Number of anchor tasks added to every chunk
+        executor: Pool the chunks are scored on
+
+    Returns:
+        Tasks sorted by calibrated priority score, highest first, with
+        scores rounded to integers
+    """
+    chunks, anchors = plan_chunks(tasks, chunk_size, anchor_count)
+    raw_scores = list(executor.map(
+        lambda chunk: score_chunk([tasks[i] for i in chunk]),
+        chunks
+    ))
+    return merge_chunk_scores(tasks, chunks, anchors, raw_scores)
+
+
+def plan_chunks(tasks: List[Dict], chunk_size: int, anchor_count: int) -> Tuple[List[List[int]], List[int]]:
+    """
+    Split task indices into chunks that each start with the shared anchors.
+
+    Returns:
+        (chunks, anchors), both as lists of task indices
+    """
+    anchors = choose_anchors(tasks, anchor_count)
+    anchor_set = set(anchors)
+    others = [i for i in range(len(tasks)) if i not in anchor_set]
+    chunks = [anchors + others[start:start + chunk_size] for start in range(0, len(others), chunk_size)] or [anchors]
+    return chunks, anchors
+
+
+def merge_chunk_scores(
+    tasks: List[Dict],
+    chunks: List[List[int]],
+    anchors: List[int],
+    raw_scores: List[Sequence]
+) -> List[Dict]:
+    """Calibrate each chunk's positional scores against the anchors and rank all tasks."""
+    anchor_set = set(anchors)
+
+    # Each chunk's scores by task index, keeping only valid ones
+    chunk_scores = []
+    for chunk, scores in zip(chunks, raw_scores):
+        scores = list(scores or [])
+        valid = {}
+        for position, index in enumerate(chunk):
+            if position < len(scores):
+                score = valid_score(scores[position])
+                if score is not None:
+                    valid[index] = score
+        chunk_scores.append(valid)
+
+    # Reference scale: each anchor's mean score across the chunks that scored it
+    reference = {}
+    for index in anchors:
+        seen = [scores[index] for scores in chunk_scores if index in scores]
+        if seen:
+            reference[index] = sum(seen) / len(seen)
+
+    for chunk, scores in zip(chunks, chunk_scores):
+        calibrate = _calibration(
+            [scores[index] for index in anchors if index in scores and index in reference],
+            [reference[index] for index in anchors if index in scores and index in reference]
+        )
+        for index in chunk:
+            if index in anchor_set:
+                continue
+            if index in scores:
+                tasks[index]['priority_score'] = _clamp(calibrate(scores[index]))
+            else:
+                tasks[index]['priority_score'] = rule_score(tasks[index])
+
+    for index in anchors:
+        tasks[index]['priority_score'] = _clamp(reference[index]) if index in reference else rule_score(tasks[index])
+
+    ranked = sorted(tasks, key=lambda task: task['priority_score'], reverse=True)
+    # Task priority scores are stored as integers; rank on the calibrated value first
+    for task in ranked:
+        task['priority_score'] = int(round(task['priority_score']))
+    return ranked
+
+
+def _calibration(observed: List[float], reference: List[float]) -> Callable[[float], float]:
+    """Least-squares linear map from a chunk's anchor scores to the reference scale."""
+    if not observed:
+        return lambda score: score
+
+    mean_observed = sum(observed) / len(observed)
+    mean_reference = sum(reference) / len(reference)
+    variance = sum((x - mean_observed) ** 2 for x in observed)
+    if variance == 0:
+        offset = mean_reference - mean_observed
+        return lambda score: score + offset
+
+    covariance = sum((x - mean_observed) * (y - mean_reference) for x, y in zip(observed, reference))
+    slope = min(max(covariance / variance, MIN_SLOPE), MAX_SLOPE)
+    return lambda score: mean_reference + slope * (score - mean_observed)
+
+
+def _clamp(score: float) -> float:
+    return round(min(max(score, MIN_SCORE), MAX_SCORE), 1)
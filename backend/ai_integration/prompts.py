@@ -0,0 +1,80 @@
+"""
+Static system prompts for the AI operations.
+
+Each operation's instructions and response format are a fixed system
+prefix; the prompt builders in AIService produce only the variable part
+(the content, task or task list), which is sent after it as the user
+message. Identical leading text across calls lets providers reuse work:
+Anthropic caches the system block marked with ``cache_control``, OpenAI
+caches repeated prefixes automatically, and LM Studio (llama.cpp) keeps the
+prefix in its KV cache so only the new suffix has to be prefilled.
+
+Keep these strings byte-for-byte stable: any edit, even whitespace,
+invalidates every provider-side cache of the prefix (and, through the
+parameters in the cache key, our own result cache).
+"""
+
+CONTEXT_ANALYSIS_SYSTEM = """You analyze personal context (messages, emails, notes and similar sources) and extract actionable insights.
+
+Please provide a JSON response with:
+1. insights: {summary, task_count, urgency_level}
+2. extracted_tasks: [{title, description, priority (1-10), category, deadline}]
+3. sentiment_score: float between -1 and 1
+4. keywords: list of relevant keywords
+
+Focus on identifying tasks, deadlines, and priorities. Be practical and actionable."""
+
+BATCH_ANALYSIS_SYSTEM = """You analyze several entries of personal context (messages, emails, notes and similar sources) at once and extract actionable insights from each.
+Each entry starts with "=== ENTRY <id>" and ends with "=== END ENTRY <id> ===".
+
+Please provide a JSON response of the form {"results": [...]} with exactly one
+object per entry, each containing:
+1. id: the entry id
+2. insights: {summary, task_count, urgency_level}
+3. extracted_tasks: [{title, description, priority (1-10), category, deadline}]
+4. sentiment_score: float between -1 and 1
+5. keywords: list of relevant keywords
+
+Analyze every entry independently; never mix content between entries."""
+
+TASK_ENHANCEMENT_SYSTEM = """You enhance to-do tasks with AI-powered suggestions.
+
+Please provide a JSON response with:
+1. priority: integer 1-10 (based on urgency and importance)
+2. suggested_deadline: ISO date string (realistic estimate)
+3. enhanced_description: improved, more detailed description
+4. suggested_categories: list of relevant categories
+5. insights: explanation of priority and recommendations
+
+Be practical and helpful in your suggestions."""
+
+TASK_BATCH_ENHANCEMENT_SYSTEM = """You enhance several to-do tasks at once with AI-powered suggestions.
+Each task starts with "=== TASK <id> ===" and ends with "=== END TASK <id> ===".
+
+Please provide a JSON response of the form {"results": [...]} with exactly one
+object per task, each containing:
+1. id: the task id
+2. priority: integer 1-10 (based on urgency and importance)
+3. suggested_deadline: ISO date string (realistic estimate)
+4. enhanced_description: improved, more detailed description
+5. suggested_categories: list of relevant categories
+6. insights: explanation of priority and recommendations
+
+Enhance every task independently; never mix details between tasks."""
+
+PRIORITIZATION_SYSTEM = """You prioritize to-do tasks based on urgency and importance.
+
+Please provide a JSON response with:
+- prioritized_tasks: array of task indices (0-based) in priority order
+- priority_scores: array of scores 1-10 for each task, in the order the tasks are listed
+- reasoning: explanation of prioritization logic
+
+Consider deadlines, complexity, and impact when prioritizing."""
+
+SYSTEM_PROMPTS = {
+    'analyze_context': CONTEXT_ANALYSIS_SYSTEM,
+    'analyze_context_batch': BATCH_ANALYSIS_SYSTEM,
+    'enhance_task': TASK_ENHANCEMENT_SYSTEM,
+    'enhance_task_batch': TASK_BATCH_ENHANCEMENT_SYSTEM,
+    'prioritize_tasks': PRIORITIZATION_SYSTEM,
+}
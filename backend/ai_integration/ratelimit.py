@@ -0,0 +1,276 @@
+"""
+Per-provider rate limiting and request scheduling.
+
+Each provider gets a limiter with two token buckets (requests per minute and
+estimated tokens per minute) and a cap on concurrent calls, configured in
+``settings.AI_RATE_LIMITS``. Callers wait in a priority queue: interactive
+requests are served before background processing, and only the caller at the
+head of the queue may take capacity, so a stream of background jobs cannot
+starve user-facing calls.
+
+When a provider answers 429 anyway, the limiter pauses that provider for the
+Retry-After period instead of letting every waiting caller hit it again.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+from django.conf import settings
+from .health import ProviderUnavailable
+
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BACKGROUND: 'background'}
+
+ASYNC_POLL_INTERVAL = 0.05
+
+
+class RateLimited(Exception):
+    """Raised when a provider rejects a call with HTTP 429."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket refilled continuously; a capacity of 0 means unlimited."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` tokens are available."""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float, now: float):
+        if not self.capacity:
+            return
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class ProviderRateLimiter:
+    """Request/token buckets plus a concurrency cap, with a priority wait queue."""
+
+    def __init__(self, name: str, requests_per_minute: float = 0, tokens_per_minute: float = 0, max_concurrency: int = 0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._cond = threading.Condition()
+        self._waiters = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._counters = {'granted': 0, 'timeouts': 0, 'rate_limited': 0}
+
+    @contextmanager
+    def permit(self, tokens: int, priority: int = BACKGROUND, timeout: Optional[float] = None):
+        """
+        Hold a call slot for the duration of the block.
+
+        Raises:
+            ProviderUnavailable: If no capacity became available within ``timeout``
+        """
+        if not self.acquire(tokens, priority, timeout):
+            raise ProviderUnavailable(f"{self.name} rate limit: no capacity within {timeout}s")
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def permit_async(self, tokens: int, priority: int = BACKGROUND, timeout: Optional[float] = None):
+        """Async counterpart of ``permit``."""
+        if not await self.acquire_async(tokens, priority, timeout):
+            raise ProviderUnavailable(f"{self.name} rate limit: no capacity within {timeout}s")
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self, tokens: int, priority: int = BACKGROUND, timeout: Optional[float] = None) -> bool:
+        """Block until the call may proceed; returns False on timeout."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            entry = self._enqueue(priority)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._try_take(entry, tokens, now)
+                    if wait == 0:
+                        return True
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0 or (wait is not None and wait > remaining):
+                            # Capacity won't free up in time; fail fast
+                            self._counters['timeouts'] += 1
+                            return False
+                        wait = remaining if wait is None else wait
+                    self._cond.wait(wait)
+            finally:
+                self._dequeue(entry)
+
+    async def acquire_async(self, tokens: int, priority: int = BACKGROUND, timeout: Optional[float] = None) -> bool:
+        """Await until the call may proceed without blocking the event loop."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            entry = self._enqueue(priority)
+        try:
+            while True:
+                now = time.monotonic()
+                with self._cond:
+                    wait = self._try_take(entry, tokens, now)
+                if wait == 0:
+                    return True
+                if deadline is not None and (deadline - now <= 0 or (wait is not None and wait > deadline - now)):
+                    with self._cond:
+                        self._counters['timeouts'] += 1
+                    return False
+                await asyncio.sleep(min(wait or ASYNC_POLL_INTERVAL, ASYNC_POLL_INTERVAL))
+        finally:
+            with self._cond:
+                self._dequeue(entry)
+
+    def release(self):
+        """Give back a concurrency slot."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def penalize(self, retry_after: float):
+        """Pause the provider after a 429 so waiting callers don't pile onto it."""
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            self._counters['rate_limited'] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._cond:
+            waiting = {}
+            for priority, _ in self._waiters:
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                waiting[name] = waiting.get(name, 0) + 1
+            return {
+                'in_flight': self._in_flight,
+                'max_concurrency': self.max_concurrency or None,
+                'waiting': waiting,
+                'paused_for_seconds': round(max(self._blocked_until - now, 0), 2),
+                **self._counters,
+            }
+
+    def _enqueue(self, priority: int):
+        entry = (priority, next(self._sequence))
+        heapq.heappush(self._waiters, entry)
+        return entry
+
+    def _dequeue(self, entry):
+        try:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+        except ValueError:
+            pass
+        # The head may have changed
+        self._cond.notify_all()
+
+    def _try_take(self, entry, tokens: int, now: float) -> Optional[float]:
+        """
+        Take capacity if ``entry`` is at the head of the queue and it is free.
+
+        Returns 0 when taken, otherwise seconds to wait (None: until notified).
+        """
+        if self._waiters[0] != entry:
+            return None
+        if self.max_concurrency and self._in_flight >= self.max_concurrency:
+            return None
+        wait = max(
+            self._blocked_until - now,
+            self._requests.time_until(1, now),
+            self._tokens.time_until(tokens, now),
+            0.0
+        )
+        if wait > 0:
+            return wait
+        self._requests.consume(1, now)
+        self._tokens.consume(tokens, now)
+        self._in_flight += 1
+        self._counters['granted'] += 1
+        return 0
+
+
+class ProviderRateLimiterRegistry:
+    """Process-wide rate limiters, one per provider."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limiters = {}
+
+    def limiter(self, provider: str) -> ProviderRateLimiter:
+        limiter = self._limiters.get(provider)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(provider)
+                if limiter is None:
+                    limiter = ProviderRateLimiter(provider, **settings.AI_RATE_LIMITS.get(provider, {}))
+                    self._limiters[provider] = limiter
+        return limiter
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {name: limiter.snapshot() for name, limiter in limiters.items()}
+
+    def reset(self):
+        with self._lock:
+            self._limiters.clear()
+
+
+def max_wait(priority: int) -> float:
+    """How long a caller of the given priority may wait for capacity."""
+    return settings.AI_RATE_LIMIT_MAX_WAIT[PRIORITY_NAMES[priority]]
+
+
+def rate_limit_retry_after(error: Exception) -> Optional[float]:
+    """
+    Seconds to pause a provider if ``error`` is a 429, otherwise None.
+
+    Understands RateLimited and the status errors of the OpenAI and
+    Anthropic SDKs (honouring their Retry-After header).
+    """
+    if isinstance(error, RateLimited):
+        retry_after = error.retry_after
+    elif getattr(error, 'status_code', None) == 429:
+        response = getattr(error, 'response', None)
+        retry_after = retry_after_header(response) if response is not None else None
+    else:
+        return None
+    return retry_after if retry_after is not None else settings.AI_RATE_LIMIT_DEFAULT_BACKOFF
+
+
+def retry_after_header(response) -> Optional[float]:
+    """Seconds from an HTTP response's Retry-After header, if it has one."""
+    try:
+        return float(response.headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+rate_limiters = ProviderRateLimiterRegistry()
@@ -0,0 +1,263 @@
+"""
+Stale-while-revalidate task enhancement.
+
+The enhance endpoint can answer at once with the rule-based enhancement,
+marked provisional, and hand the LLM enhancement to a background pool. Each
+request bumps the task's ``ai_revision``; the background result is stored on
+the task (``ai_insights``, ``ai_enhanced_description``, ``priority_score``)
+only if the revision is still current, so a result for an older request never
+overwrites a newer one. Clients pick up the upgraded result by polling the
+task's enhancement state or by reading the change feed of recently enhanced
+tasks.
+
+Newly created tasks can be enhanced the same way (``enqueue_new_task``).
+Tasks created close together are collected by a micro-batcher for up to
+``AI_ENHANCE_BATCH_WINDOW`` seconds and enhanced with shared prompts
+(``AIService.enhance_tasks``); results are written with one conditional
+``bulk_update`` per batch.
+
+Background enhancements run in this process: one that is still running when
+the process exits is lost and the task stays provisional until the next
+enhancement request.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from tasks.models import Task
+from tasks.stats import bulk_update_tasks
+from .services import AIService
+
+# Task fields written by a background enhancement
+ENHANCEMENT_FIELDS = [
+    'priority_score', 'ai_insights', 'ai_enhanced_description', 'ai_status', 'ai_enhanced_at', 'updated_at'
+]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Process-wide pool for background enhancements."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.AI_REVALIDATE_MAX_WORKERS,
+                    thread_name_prefix='ai-revalidate'
+                )
+    return _executor
+
+
+def start_enhancement(task_id: int) -> Optional[int]:
+    """
+    Mark a task's enhancement provisional and return its new revision.
+
+    Returns:
+        The revision token, or None if the task does not exist
+    """
+    with transaction.atomic():
+        updated = Task.objects.filter(id=task_id).update(
+            ai_revision=F('ai_revision') + 1,
+            ai_status='provisional',
+            updated_at=timezone.now()
+        )
+        if not updated:
+            return None
+        return Task.objects.filter(id=task_id).values_list('ai_revision', flat=True).get()
+
+
+def schedule_enhancement(task_id: int, revision: int, title: str, description: str, category: str):
+    """Run the LLM enhancement for a task revision in the background, after the current transaction commits."""
+    transaction.on_commit(
+        lambda: get_executor().submit(_revalidate, task_id, revision, title, description, category)
+    )
+
+
+def enqueue_new_task(task: Task):
+    """
+    Enhance a newly created task in the background, batched with other new tasks.
+
+    The task must already be marked provisional (``ai_status``/``ai_revision``
+    set when it was created); it is handed to the batcher once the current
+    transaction commits.
+    """
+    item = {
+        'id': task.id,
+        'revision': task.ai_revision,
+        'title': task.title,
+        'description': task.description,
+        'category': task.category.name if task.category else None,
+    }
+    transaction.on_commit(lambda: enhancement_batcher.submit(item))
+
+
+def store_enhancement(task_id: int, revision: int, enhancement: Dict[str, Any]) -> bool:
+    """
+    Store an enhancement on a task if ``revision`` is still its current revision.
+
+    Returns:
+        True if stored, False if the task is gone or a newer request superseded it
+    """
+    return bool(store_enhancements([(task_id, revision, enhancement)]))
+
+
+def store_enhancements(results: List[Tuple[int, int, Dict[str, Any]]]) -> int:
+    """
+    Store (task id, revision, enhancement) results with one ``bulk_update``.
+
+    The update only matches tasks still at the given revision, so results
+    superseded by a newer request are dropped in the same statement.
+
+    Returns:
+        Number of tasks updated
+    """
+    if not results:
+        return 0
+    now = timezone.now()
+    current = Q()
+    tasks = []
+    for task_id, revision, enhancement in results:
+        current |= Q(id=task_id, ai_revision=revision)
+        tasks.append(Task(
+            id=task_id,
+            priority_score=min(max(int(round(enhancement['priority'])), 1), 10),
+            ai_insights=enhancement.get('insights') or '',
+            ai_enhanced_description=enhancement.get('enhanced_description') or '',
+            ai_status='enhanced',
+            ai_enhanced_at=now,
+            updated_at=now
+        ))
+    return bulk_update_tasks(Task.objects.filter(current), tasks, ENHANCEMENT_FIELDS)
+
+
+def enhancement_state(task: Task) -> Dict[str, Any]:
+    """Current enhancement state of a task, as returned to polling clients."""
+    state = {
+        'task_id': task.id,
+        'revision': task.ai_revision,
+        'status': task.ai_status,
+        'provisional': task.ai_status == 'provisional',
+        'enhanced_at': task.ai_enhanced_at.isoformat() if task.ai_enhanced_at else None,
+    }
+    if task.ai_status == 'enhanced':
+        state['result'] = {
+            'priority': task.priority_score,
+            'enhanced_description': task.ai_enhanced_description,
+            'insights': task.ai_insights,
+        }
+    return state
+
+
+def enhancement_changes(cursor: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Tasks enhanced after ``cursor``, oldest first.
+
+    The cursor is ``<ai_enhanced_at ISO timestamp>|<task id>`` of the last
+    change a client has seen; pass the returned cursor to get the next page.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    tasks = Task.objects.filter(ai_enhanced_at__isnull=False)
+    if cursor:
+        enhanced_at, task_id = _parse_cursor(cursor)
+        tasks = tasks.filter(
+            Q(ai_enhanced_at__gt=enhanced_at) | Q(ai_enhanced_at=enhanced_at, id__gt=task_id)
+        )
+    changes = list(tasks.order_by('ai_enhanced_at', 'id')[:limit])
+    if changes:
+        cursor = f"{changes[-1].ai_enhanced_at.isoformat()}|{changes[-1].id}"
+    return [enhancement_state(task) for task in changes], cursor
+
+
+def _parse_cursor(cursor: str) -> Tuple[datetime, int]:
+    enhanced_at, _, task_id = cursor.rpartition('|')
+    parsed = datetime.fromisoformat(enhanced_at)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed, int(task_id)
+
+
+class EnhancementBatcher:
+    """
+    Collects tasks submitted close together and enhances them as one batch.
+
+    The first task starts a window of ``AI_ENHANCE_BATCH_WINDOW`` seconds;
+    the batch is handed to the background pool when the window ends or it
+    reaches ``AI_ENHANCE_BATCH_MAX_TASKS`` tasks, whichever comes first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+
+    def submit(self, item: Dict[str, Any]):
+        with self._lock:
+            self._pending.append(item)
+            if len(self._pending) >= settings.AI_ENHANCE_BATCH_MAX_TASKS:
+                batch = self._take()
+            else:
+                batch = None
+                if self._timer is None:
+                    self._timer = threading.Timer(settings.AI_ENHANCE_BATCH_WINDOW, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if batch:
+            get_executor().submit(_revalidate_batch, batch)
+
+    def flush(self):
+        """Hand the pending tasks to the background pool now."""
+        with self._lock:
+            batch = self._take()
+        if batch:
+            get_executor().submit(_revalidate_batch, batch)
+
+    def _take(self) -> List[Dict[str, Any]]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        return batch
+
+
+def _revalidate(task_id: int, revision: int, title: str, description: str, category: str):
+    close_old_connections()
+    try:
+        enhancement = AIService().enhance_task(title, description, category)
+        if not store_enhancement(task_id, revision, enhancement):
+            print(f"Enhancement of task {task_id} revision {revision} superseded")
+    except Exception as e:
+        print(f"Background enhancement of task {task_id} failed: {e}")
+        Task.objects.filter(id=task_id, ai_revision=revision).update(ai_status='failed')
+    finally:
+        close_old_connections()
+
+
+def _revalidate_batch(batch: List[Dict[str, Any]]):
+    close_old_connections()
+    try:
+        enhancements = AIService().enhance_tasks(batch)
+        stored = store_enhancements([
+            (item['id'], item['revision'], enhancements[item['id']]) for item in batch
+        ])
+        if stored < len(batch):
+            print(f"{len(batch) - stored} of {len(batch)} background enhancements superseded")
+    except Exception as e:
+        print(f"Background enhancement of tasks {[item['id'] for item in batch]} failed: {e}")
+        current = Q()
+        for item in batch:
+            current |= Q(id=item['id'], ai_revision=item['revision'])
+        Task.objects.filter(current).update(ai_status='failed')
+    finally:
+        close_old_connections()
+
+
+enhancement_batcher = EnhancementBatcher()
@@ -0,0 +1,204 @@
+"""
+Compiled rule engine for the rule-based AI fallback.
+
+All keyword tables (priority, category, deadline and sentiment) are compiled
+at import time into one phrase table. The text is lowercased and tokenized
+once; keyword hits are found by intersecting the token counts with the table,
+so a single pass yields every signal the rule-based paths need: priority,
+category, deadline hint, sentiment and keywords.
+
+Matches respect word boundaries, so "like" does not match "likely" and "due"
+does not match "schedule". Multi-word phrases ("next week") are matched as a
+whole and take precedence over their individual words.
+"""
+
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+DEFAULT_PRIORITY = 5
+LOW_PRIORITY = 3
+
+PRIORITY_KEYWORDS = {
+    8: ['urgent', 'asap', 'immediately', 'critical', 'important', 'deadline', 'due'],
+    6: ['soon', 'today', 'tomorrow', 'this week', 'meeting', 'call'],
+    LOW_PRIORITY: ['later', 'eventually', 'when possible', 'someday'],
+}
+
+# Checked in order; the first rule with a hit wins
+DEADLINE_KEYWORDS = [
+    (1, ['today', 'asap', 'immediately']),
+    (2, ['tomorrow', 'next day']),
+    (7, ['this week', 'week']),
+    (14, ['next week']),
+    (30, ['month', 'monthly']),
+]
+
+# Checked in order; the first category with a hit wins
+CATEGORY_KEYWORDS = [
+    ('Work', ['work', 'office', 'meeting', 'project', 'client']),
+    ('Health', ['doctor', 'health', 'gym', 'exercise', 'medical']),
+    ('Shopping', ['buy', 'shop', 'grocery', 'store', 'purchase']),
+    ('Personal', ['family', 'home', 'house', 'personal']),
+    ('Education', ['learn', 'study', 'course', 'education']),
+]
+DEFAULT_CATEGORY = 'General'
+
+POSITIVE_WORDS = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'love', 'like', 'happy', 'excited']
+NEGATIVE_WORDS = ['bad', 'terrible', 'awful', 'hate', 'dislike', 'sad', 'angry', 'frustrated', 'annoyed', 'upset']
+
+STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
+    'before', 'after', 'above', 'below', 'between', 'among', 'is', 'are',
+    'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does',
+    'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'
+}
+
+TASK_TRIGGERS = ['need to', 'should', 'must', 'have to', 'remember to', "don't forget to"]
+
+MAX_KEYWORDS = 10
+MIN_KEYWORD_LENGTH = 3
+
+
+def _build_phrase_table() -> Dict[str, List[tuple]]:
+    """Map each keyword phrase to the (table, value) signals it triggers."""
+    table = {}
+
+    def add(phrase, signal):
+        table.setdefault(phrase, []).append(signal)
+
+    for priority, phrases in PRIORITY_KEYWORDS.items():
+        for phrase in phrases:
+            add(phrase, ('priority', priority))
+    for rank, (days, phrases) in enumerate(DEADLINE_KEYWORDS):
+        for phrase in phrases:
+            add(phrase, ('deadline', (rank, days)))
+    for rank, (category, phrases) in enumerate(CATEGORY_KEYWORDS):
+        for phrase in phrases:
+            add(phrase, ('category', (rank, category)))
+    for phrase in POSITIVE_WORDS:
+        add(phrase, ('positive', phrase))
+    for phrase in NEGATIVE_WORDS:
+        add(phrase, ('negative', phrase))
+    return table
+
+
+def _phrase_pattern(phrase: str) -> str:
+    return r'\s+'.join(re.escape(word) for word in phrase.split())
+
+
+PHRASES = _build_phrase_table()
+WORD_PHRASES = frozenset(phrase for phrase in PHRASES if ' ' not in phrase)
+
+# Multi-word phrases are only searched for when all of their words occur, and
+# an occurrence is not also counted for its individual words ("next week"
+# does not additionally count as "week").
+# Patterns start with a literal so the regex engine can use a fast prefix
+# search; the leading word boundary is checked in _count_phrase.
+MULTIWORD_PHRASES = {
+    phrase: (phrase.split(), re.compile(_phrase_pattern(phrase) + r'\b'))
+    for phrase in PHRASES if ' ' in phrase
+}
+
+TOKEN_RE = re.compile(r'\w+')
+
+# One pattern per trigger, each searched on its own, so overlapping phrases
+# are all kept in trigger order ("need to remember to call mom" yields
+# "remember to call mom" and "call mom")
+TASK_RES = [re.compile(re.escape(trigger) + r" (.+?)(?:\.|$)", re.IGNORECASE) for trigger in TASK_TRIGGERS]
+
+
+def analyze_text(text: str) -> Dict[str, Any]:
+    """
+    Extract every rule-based signal from text in a single pass.
+
+    Returns:
+        Dictionary with priority, category, deadline_days (or None),
+        sentiment_score and keywords
+    """
+    lowered = text.lower()
+    word_counts = Counter(TOKEN_RE.findall(lowered))
+
+    hits = {phrase: word_counts[phrase] for phrase in WORD_PHRASES.intersection(word_counts)}
+    for phrase, (words, pattern) in MULTIWORD_PHRASES.items():
+        if all(word in word_counts for word in words):
+            occurrences = _count_phrase(pattern, lowered)
+            if occurrences:
+                hits[phrase] = occurrences
+                for word in words:
+                    if word in hits:
+                        hits[word] -= occurrences
+                        if hits[word] <= 0:
+                            del hits[word]
+
+    priorities = set()
+    deadline = None
+    category = None
+    positive = 0
+    negative = 0
+    for phrase in hits:
+        for kind, value in PHRASES[phrase]:
+            if kind == 'priority':
+                priorities.add(value)
+            elif kind == 'deadline':
+                if deadline is None or value < deadline:
+                    deadline = value
+            elif kind == 'category':
+                if category is None or value < category:
+                    category = value
+            elif kind == 'positive':
+                positive += 1
+            else:
+                negative += 1
+
+    keywords = [
+        word for word, count in word_counts.most_common()
+        if len(word) >= MIN_KEYWORD_LENGTH and word.isascii() and word.isalpha()
+        and word not in STOP_WORDS
+    ]
+
+    return {
+        'priority': _priority(priorities),
+        'category': category[1] if category else DEFAULT_CATEGORY,
+        'deadline_days': deadline[1] if deadline else None,
+        'sentiment_score': _sentiment(positive, negative),
+        'keywords': keywords[:MAX_KEYWORDS],
+    }
+
+
+def extract_task_phrases(content: str) -> List[str]:
+    """Find task-like phrases ("need to ...", "don't forget to ...") in content."""
+    return [match.group(1).strip() for pattern in TASK_RES for match in pattern.finditer(content)]
+
+
+def extract_keywords(text: str) -> List[str]:
+    """Most frequent non-stop-words in text."""
+    return analyze_text(text)['keywords']
+
+
+def _count_phrase(pattern, lowered: str) -> int:
+    """Count phrase matches that start on a word boundary."""
+    count = 0
+    for match in pattern.finditer(lowered):
+        start = match.start()
+        if start == 0 or not (lowered[start - 1].isalnum() or lowered[start - 1] == '_'):
+            count += 1
+    return count
+
+
+def _priority(priorities: set) -> int:
+    # Low-priority wording caps the score even when urgent words are present
+    if LOW_PRIORITY in priorities:
+        return LOW_PRIORITY
+    if priorities:
+        return max(priorities)
+    return DEFAULT_PRIORITY
+
+
+def _sentiment(positive_count: int, negative_count: int) -> float:
+    if positive_count + negative_count == 0:
+        return 0.0
+    return (positive_count - negative_count) / (positive_count + negative_count)
+
@@ -4,25 +4,79 @@ Supports OpenAI, Anthropic Claude, and LM Studio.
 """
 
 import json
-import re
-import requests
+import time
+from concurrent.futures import as_completed
 from datetime import datetime, timedelta
 from django.conf import settings
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
+from .batching import estimate_tokens, format_entry, format_task, pack_entries
+from .cache import ai_cache
+from .coalescing import single_flight
+from .chunking import get_executor as get_chunk_executor, merge_analyses, split_text
+from .clients import provider_clients
+from .health import OPEN, ProviderUnavailable, provider_health
+from .hedging import run_hedged
+from .prioritization import rank_in_chunks, rule_score, valid_score
+from .prompts import SYSTEM_PROMPTS
+from .ratelimit import (
+    BACKGROUND, INTERACTIVE, RateLimited, max_wait, rate_limit_retry_after, rate_limiters, retry_after_header
+)
+from .routing import route
+from .structured import (
+    REPAIR_SYSTEM, SCHEMAS, StructuredOutputError, check_response, extract_json, repair_prompt, structured_stats
+)
+from . import rules
 
 
 class AIService:
-    """Main AI service class that handles different AI providers."""
+    """
+    Main AI service class that handles different AI providers.
     
-    def __init__(self):
+    Instances are cheap to create per request: provider connections are
+    pooled in the process-wide ``provider_clients`` registry.
+    
+    Parsed provider results are cached by prompt, provider, model and
+    parameters; pass ``use_cache=False`` to bypass the cache for a request.
+    
+    Pass ``interactive=True`` for user-facing requests: operations with a
+    latency budget in ``settings.AI_LATENCY_BUDGETS`` are then hedged across
+    providers and the rule engine. ``rules_only=True`` skips the providers
+    entirely (used to serve requests when the AI endpoints are overloaded).
+    
+    Concurrent identical ``analyze_context``, ``enhance_task`` and
+    ``prioritize_tasks`` calls (in this process or, via a file lock, in other
+    processes on the host) from services with the same ``interactive`` and
+    ``use_cache`` settings share one in-flight call; ``rules_only`` calls
+    are never coalesced.
+    """
+    
+    PROVIDER_ORDER = ['lm_studio', 'anthropic', 'openai']
+    
+    # Model and max_tokens are chosen per call by routing.route()
+    OPERATION_PARAMS = {
+        'analyze_context': {'temperature': 0.7, 'timeout': 30},
+        'enhance_task': {'temperature': 0.7, 'timeout': 20},
+        'prioritize_tasks': {'temperature': 0.5, 'timeout': 25},
+        'analyze_context_batch': {'temperature': 0.7, 'timeout': 90},
+        'enhance_task_batch': {'temperature': 0.7, 'timeout': 60},
+    }
+    
+    def __init__(self, use_cache: bool = None, interactive: bool = False, rules_only: bool = False):
         self.openai_key = settings.OPENAI_API_KEY
         self.anthropic_key = settings.ANTHROPIC_API_KEY
         self.lm_studio_url = settings.LM_STUDIO_BASE_URL
+        self.use_cache = settings.AI_CACHE_ENABLED if use_cache is None else use_cache
+        self.interactive = interactive
+        self.priority = INTERACTIVE if interactive else BACKGROUND
+        self.rules_only = rules_only
         
     def analyze_context(self, content: str, source_type: str) -> Dict[str, Any]:
         """
         Analyze context content and extract insights, tasks, and metadata.
         
+        Content longer than ``settings.AI_CHUNK_TOKEN_BUDGET`` is split into
+        chunks that are analyzed concurrently and merged.
+        
         Args:
             content: The text content to analyze
             source_type: Type of source (whatsapp, email, notes, etc.)
@@ -30,21 +84,25 @@ class AIService:
         Returns:
             Dictionary containing analysis results
         """
-        try:
-            # Try different AI providers in order of preference
-            if self.lm_studio_url:
-                return self._analyze_with_lm_studio(content, source_type)
-            elif self.anthropic_key:
-                return self._analyze_with_claude(content, source_type)
-            elif self.openai_key:
-                return self._analyze_with_openai(content, source_type)
-            else:
-                # Fallback to rule-based analysis
-                return self._analyze_with_rules(content, source_type)
-                
-        except Exception as e:
-            print(f"AI analysis failed: {e}")
-            return self._analyze_with_rules(content, source_type)
+        def analyze():
+            if self._needs_chunking(content):
+                return self._analyze_chunked(content, source_type)
+            return self._analyze_content(content, source_type)
+        
+        return self._coalesce('analyze_context', (content, source_type), analyze)
+    
+    def _analyze_content(self, content: str, source_type: str) -> Dict[str, Any]:
+        """Analyze content with a single prompt through the provider chain."""
+        return self._dispatch(
+            'analyze_context',
+            {
+                'lm_studio': lambda: self._analyze_with_lm_studio(content, source_type),
+                'anthropic': lambda: self._analyze_with_claude(content, source_type),
+                'openai': lambda: self._analyze_with_openai(content, source_type),
+            },
+            # Fallback to rule-based analysis
+            lambda: self._analyze_with_rules(content, source_type)
+        )
     
     def enhance_task(self, title: str, description: str, category: str = None) -> Dict[str, Any]:
         """
@@ -58,244 +116,746 @@ class AIService:
         Returns:
             Dictionary with enhanced task data
         """
-        try:
-            if self.lm_studio_url:
-                return self._enhance_task_lm_studio(title, description, category)
-            elif self.anthropic_key:
-                return self._enhance_task_claude(title, description, category)
-            elif self.openai_key:
-                return self._enhance_task_openai(title, description, category)
-            else:
-                return self._enhance_task_rules(title, description, category)
-                
-        except Exception as e:
-            print(f"Task enhancement failed: {e}")
-            return self._enhance_task_rules(title, description, category)
+        return self._coalesce('enhance_task', (title, description, category), lambda: self._dispatch(
+            'enhance_task',
+            {
+                'lm_studio': lambda: self._enhance_task_lm_studio(title, description, category),
+                'anthropic': lambda: self._enhance_task_claude(title, description, category),
+                'openai': lambda: self._enhance_task_openai(title, description, category),
+            },
+            lambda: self._enhance_task_rules(title, description, category)
+        ))
     
     def prioritize_tasks(self, tasks: List[Dict]) -> List[Dict]:
         """
         Prioritize tasks based on AI analysis.
         
+        Lists longer than ``settings.AI_PRIORITIZE_CHUNK_SIZE`` are scored in
+        parallel chunks that share calibration anchors and then merged.
+        
         Args:
             tasks: List of task dictionaries
             
         Returns:
             List of tasks with updated priority scores
         """
-        try:
-            if self.lm_studio_url:
-                return self._prioritize_with_lm_studio(tasks)
-            elif self.anthropic_key:
-                return self._prioritize_with_claude(tasks)
-            elif self.openai_key:
-                return self._prioritize_with_openai(tasks)
-            else:
-                return self._prioritize_with_rules(tasks)
-                
-        except Exception as e:
-            print(f"Task prioritization failed: {e}")
-            return self._prioritize_with_rules(tasks)
+        def prioritize():
+            if len(tasks) > settings.AI_PRIORITIZE_CHUNK_SIZE and self.configured_providers():
+                return self._prioritize_chunked(self._copy_tasks(tasks))
+            
+            return self._dispatch(
+                'prioritize_tasks',
+                {
+                    'lm_studio': lambda: self._prioritize_with_lm_studio(self._copy_tasks(tasks)),
+                    'anthropic': lambda: self._prioritize_with_claude(self._copy_tasks(tasks)),
+                    'openai': lambda: self._prioritize_with_openai(self._copy_tasks(tasks)),
+                },
+                lambda: self._prioritize_with_rules(self._copy_tasks(tasks))
+            )
+        
+        return self._coalesce('prioritize_tasks', (tasks,), prioritize)
     
-    # LM Studio Implementation
-    def _analyze_with_lm_studio(self, content: str, source_type: str) -> Dict[str, Any]:
-        """Analyze content using LM Studio local model."""
+    def analyze_contexts(self, entries: List[Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Analyze several context entries, packing them into shared prompts.
+        
+        Entries are packed into batches up to ``settings.AI_BATCH_TOKEN_BUDGET``
+        and analyzed with one provider call per batch. Any entry whose section
+        of the batch answer is missing or malformed is analyzed on its own
+        with ``analyze_context``.
+        
+        Args:
+            entries: Dicts with ``id``, ``content`` and ``source_type``
+            
+        Returns:
+            Dictionary mapping each entry id to its analysis results
+        """
+        results = {}
+        for batch in pack_entries(entries, settings.AI_BATCH_TOKEN_BUDGET, settings.AI_BATCH_MAX_ENTRIES):
+            sections = {}
+            if len(batch) > 1:
+                sections = self._dispatch(
+                    'analyze_context_batch',
+                    {
+                        'lm_studio': lambda: self._analyze_batch_lm_studio(batch),
+                        'anthropic': lambda: self._analyze_batch_claude(batch),
+                        'openai': lambda: self._analyze_batch_openai(batch),
+                    },
+                    # Every entry falls back to its own call
+                    lambda: {}
+                )
+            
+            for entry in batch:
+                section = sections.get(str(entry['id']))
+                if self._is_analysis(section):
+                    results[entry['id']] = section
+                else:
+                    results[entry['id']] = self.analyze_context(entry['content'], entry['source_type'])
+        
+        return results
+    
+    def enhance_tasks(self, tasks: List[Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Enhance several tasks, packing them into shared prompts.
+        
+        Tasks are packed into batches up to ``settings.AI_BATCH_TOKEN_BUDGET``
+        and enhanced with one provider call per batch. Any task whose section
+        of the batch answer is missing or malformed is enhanced on its own
+        with ``enhance_task``.
+        
+        Args:
+            tasks: Dicts with ``id``, ``title``, ``description`` and ``category``
+            
+        Returns:
+            Dictionary mapping each task id to its enhancement
+        """
+        results = {}
+        batches = pack_entries(
+            tasks, settings.AI_BATCH_TOKEN_BUDGET, settings.AI_ENHANCE_BATCH_MAX_TASKS, text=format_task
+        )
+        for batch in batches:
+            sections = {}
+            if len(batch) > 1:
+                sections = self._dispatch(
+                    'enhance_task_batch',
+                    {
+                        'lm_studio': lambda: self._enhance_batch_lm_studio(batch),
+                        'anthropic': lambda: self._enhance_batch_claude(batch),
+                        'openai': lambda: self._enhance_batch_openai(batch),
+                    },
+                    # Every task falls back to its own call
+                    lambda: {}
+                )
+            
+            for task in batch:
+                section = sections.get(str(task['id']))
+                if self._is_enhancement(section):
+                    results[task['id']] = section
+                else:
+                    results[task['id']] = self.enhance_task(task['title'], task.get('description', ''), task.get('category'))
+        
+        return results
+    
+    def stream_analyze_context(self, content: str, source_type: str) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a context analysis.
+        
+        Yields ``delta`` events with partial model output as it arrives and
+        finishes with a ``result`` event carrying the parsed analysis. Long
+        content is analyzed in chunks instead, with a ``progress`` event as
+        each chunk completes.
+        """
+        if self._needs_chunking(content):
+            yield from self._stream_chunked(content, source_type)
+            return
+        
         prompt = self._build_context_analysis_prompt(content, source_type)
+        yield from self._stream_operation(
+            'analyze_context', prompt, self._parse_analysis_response,
+            lambda: self._analyze_with_rules(content, source_type)
+        )
+    
+    def stream_enhance_task(self, title: str, description: str, category: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a task enhancement.
         
-        response = requests.post(
-            f"{self.lm_studio_url}/v1/chat/completions",
-            json={
-                "model": "local-model",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.7,
-                "max_tokens": 1000
+        Yields ``delta`` events with partial model output as it arrives and
+        finishes with a ``result`` event carrying the parsed enhancement.
+        """
+        prompt = self._build_task_enhancement_prompt(title, description, category)
+        return self._stream_operation(
+            'enhance_task', prompt, self._parse_enhancement_response,
+            lambda: self._enhance_task_rules(title, description, category)
+        )
+    
+    def _coalesce(self, operation: str, inputs: tuple, call) -> Any:
+        """Share one in-flight call between concurrent callers with the same inputs and options."""
+        if self.rules_only:
+            # The rule engine answers at once; never wait on (or hand out) an LLM call
+            return call()
+        return single_flight.do(single_flight.make_key(operation, *inputs, options=self._coalesce_options()), call)
+    
+    def _coalesce_options(self) -> Dict[str, Any]:
+        """Settings that change an operation's result, so callers only share calls made with the same ones."""
+        return {'interactive': self.interactive, 'use_cache': self.use_cache}
+    
+    def _needs_chunking(self, content: str) -> bool:
+        """Long content is analyzed in chunks when a provider is configured."""
+        return (
+            estimate_tokens(content) > settings.AI_CHUNK_TOKEN_BUDGET
+            and bool(self.configured_providers())
+        )
+    
+    def _analyze_chunked(self, content: str, source_type: str) -> Dict[str, Any]:
+        """Analyze long content chunk by chunk on the shared pool and merge the results."""
+        chunks = split_text(content, settings.AI_CHUNK_TOKEN_BUDGET)
+        analyses = list(get_chunk_executor().map(
+            lambda chunk: self._analyze_content(chunk, source_type),
+            chunks
+        ))
+        return merge_analyses(chunks, analyses)
+    
+    def _stream_chunked(self, content: str, source_type: str) -> Iterator[Dict[str, Any]]:
+        """``_analyze_chunked`` as events: one ``progress`` per finished chunk, then the merged ``result``."""
+        chunks = split_text(content, settings.AI_CHUNK_TOKEN_BUDGET)
+        futures = {
+            get_chunk_executor().submit(self._analyze_content, chunk, source_type): index
+            for index, chunk in enumerate(chunks)
+        }
+        analyses = [None] * len(chunks)
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                analyses[futures[future]] = future.result()
+                yield {'event': 'progress', 'data': {'chunks_done': done, 'chunks_total': len(chunks)}, 'provider': 'chunked'}
+        finally:
+            # Client went away (or a chunk failed): don't start the chunks still queued
+            for future in futures:
+                future.cancel()
+        yield {'event': 'result', 'data': merge_analyses(chunks, analyses), 'provider': 'chunked', 'cached': False}
+    
+    def _prioritize_chunked(self, tasks: List[Dict]) -> List[Dict]:
+        """Rank a long task list in anchored chunks on the shared chunk pool."""
+        return rank_in_chunks(
+            tasks,
+            self._score_tasks,
+            chunk_size=settings.AI_PRIORITIZE_CHUNK_SIZE,
+            anchor_count=settings.AI_PRIORITIZE_ANCHORS,
+            executor=get_chunk_executor()
+        )
+    
+    def _score_tasks(self, tasks: List[Dict]) -> List:
+        """Positional priority scores for one chunk of tasks, from the provider chain or the rules."""
+        prompt = self._build_prioritization_prompt(tasks)
+        return self._dispatch(
+            'prioritize_tasks',
+            {
+                provider: lambda provider=provider: self._run_completion(
+                    'prioritize_tasks', provider, prompt, self._parse_priority_scores
+                )
+                for provider in self.PROVIDER_ORDER
             },
-            timeout=30
+            lambda: [rule_score(task) for task in tasks]
         )
+    
+    def _copy_tasks(self, tasks: List[Dict]) -> List[Dict]:
+        """Per-attempt task copies, so racing attempts never share dicts."""
+        return [dict(task) for task in tasks]
+    
+    def configured_providers(self) -> List[str]:
+        """Providers with settings present, in order of preference."""
+        if self.rules_only:
+            return []
+        configured = {
+            'lm_studio': self.lm_studio_url,
+            'anthropic': self.anthropic_key,
+            'openai': self.openai_key,
+        }
+        return [provider for provider in self.PROVIDER_ORDER if configured[provider]]
+    
+    def _dispatch(self, operation: str, handlers: Dict[str, Any], fallback) -> Any:
+        """
+        Try each configured provider in order, then the rule-based fallback.
         
-        if response.status_code == 200:
-            result = response.json()
-            ai_response = result['choices'][0]['message']['content']
-            return self._parse_analysis_response(ai_response)
-        else:
-            raise Exception(f"LM Studio API error: {response.status_code}")
+        Providers whose circuit breaker is open raise ProviderUnavailable
+        immediately, so a provider that is down costs nothing once tripped.
+        Interactive calls with a latency budget are hedged instead.
+        """
+        budget = settings.AI_LATENCY_BUDGETS.get(operation) if self.interactive else None
+        if budget:
+            candidates = [
+                (provider, handlers[provider]) for provider in self.configured_providers()
+                if provider_health.breaker(provider).state != OPEN
+            ]
+            return run_hedged(operation, candidates, fallback, budget, self._hedge_delay)
+        
+        for provider in self.configured_providers():
+            try:
+                return handlers[provider]()
+            except ProviderUnavailable:
+                continue
+            except Exception as e:
+                print(f"AI {operation} with {provider} failed: {e}")
+        
+        return fallback()
+    
+    def _hedge_delay(self, provider: str) -> float:
+        """How long to wait on a provider before racing the next candidate."""
+        delay = provider_health.breaker(provider).latency_percentile(settings.AI_HEDGE_PERCENTILE)
+        if delay is None:
+            delay = settings.AI_HEDGE_DEFAULT_DELAY
+        return max(delay, settings.AI_HEDGE_MIN_DELAY)
+    
+    # LM Studio Implementation
+    def _analyze_with_lm_studio(self, content: str, source_type: str) -> Dict[str, Any]:
+        """Analyze content using LM Studio local model."""
+        prompt = self._build_context_analysis_prompt(content, source_type)
+        return self._run_completion('analyze_context', 'lm_studio', prompt, self._parse_analysis_response)
     
     def _enhance_task_lm_studio(self, title: str, description: str, category: str) -> Dict[str, Any]:
         """Enhance task using LM Studio."""
         prompt = self._build_task_enhancement_prompt(title, description, category)
-        
-        response = requests.post(
-            f"{self.lm_studio_url}/v1/chat/completions",
-            json={
-                "model": "local-model",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.7,
-                "max_tokens": 500
-            },
-            timeout=20
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            ai_response = result['choices'][0]['message']['content']
-            return self._parse_enhancement_response(ai_response)
-        else:
-            raise Exception(f"LM Studio API error: {response.status_code}")
+        return self._run_completion('enhance_task', 'lm_studio', prompt, self._parse_enhancement_response)
     
     def _prioritize_with_lm_studio(self, tasks: List[Dict]) -> List[Dict]:
         """Prioritize tasks using LM Studio."""
         prompt = self._build_prioritization_prompt(tasks)
-        
-        response = requests.post(
+        scores = self._run_completion('prioritize_tasks', 'lm_studio', prompt, self._parse_priority_scores)
+        return self._apply_priority_scores(tasks, scores)
+    
+    def _analyze_batch_lm_studio(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Analyze a batch of entries using LM Studio."""
+        prompt = self._build_batch_analysis_prompt(batch)
+        return self._run_completion('analyze_context_batch', 'lm_studio', prompt, self._parse_batch_response)
+    
+    def _enhance_batch_lm_studio(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Enhance a batch of tasks using LM Studio."""
+        prompt = self._build_task_batch_enhancement_prompt(batch)
+        return self._run_completion('enhance_task_batch', 'lm_studio', prompt, self._parse_batch_response)
+    
+    def _lm_studio_completion(self, prompt: str, system: str, model: str, temperature: float, max_tokens: int, timeout: float,
+                              schema: Optional[Dict[str, Any]] = None) -> str:
+        """Run a chat completion against LM Studio over the pooled HTTP session."""
+        response = provider_clients.lm_studio_session().post(
             f"{self.lm_studio_url}/v1/chat/completions",
             json={
-                "model": "local-model",
-                "messages": [{"role": "user", "content": prompt}],
-                "temperature": 0.5,
-                "max_tokens": 800
+                "model": model,
+                "messages": self._chat_messages(system, prompt),
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                **self._response_format('lm_studio', schema)
             },
-            timeout=25
+            timeout=(settings.AI_HTTP_CONNECT_TIMEOUT, timeout)
         )
         
         if response.status_code == 200:
             result = response.json()
-            ai_response = result['choices'][0]['message']['content']
-            return self._parse_prioritization_response(ai_response, tasks)
+            return result['choices'][0]['message']['content']
+        elif response.status_code == 429:
+            raise RateLimited("LM Studio API error: 429", retry_after_header(response))
         else:
             raise Exception(f"LM Studio API error: {response.status_code}")
     
     # OpenAI Implementation
     def _analyze_with_openai(self, content: str, source_type: str) -> Dict[str, Any]:
         """Analyze content using OpenAI API."""
-        import openai
-        
-        openai.api_key = self.openai_key
         prompt = self._build_context_analysis_prompt(content, source_type)
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        
-        ai_response = response.choices[0].message.content
-        return self._parse_analysis_response(ai_response)
+        return self._run_completion('analyze_context', 'openai', prompt, self._parse_analysis_response)
     
     def _enhance_task_openai(self, title: str, description: str, category: str) -> Dict[str, Any]:
         """Enhance task using OpenAI."""
-        import openai
-        
-        openai.api_key = self.openai_key
         prompt = self._build_task_enhancement_prompt(title, description, category)
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=500
-        )
-        
-        ai_response = response.choices[0].message.content
-        return self._parse_enhancement_response(ai_response)
+        return self._run_completion('enhance_task', 'openai', prompt, self._parse_enhancement_response)
     
     def _prioritize_with_openai(self, tasks: List[Dict]) -> List[Dict]:
         """Prioritize tasks using OpenAI."""
-        import openai
-        
-        openai.api_key = self.openai_key
         prompt = self._build_prioritization_prompt(tasks)
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.5,
-            max_tokens=800
+        scores = self._run_completion('prioritize_tasks', 'openai', prompt, self._parse_priority_scores)
+        return self._apply_priority_scores(tasks, scores)
+    
+    def _analyze_batch_openai(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Analyze a batch of entries using OpenAI."""
+        prompt = self._build_batch_analysis_prompt(batch)
+        return self._run_completion('analyze_context_batch', 'openai', prompt, self._parse_batch_response)
+    
+    def _enhance_batch_openai(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Enhance a batch of tasks using OpenAI."""
+        prompt = self._build_task_batch_enhancement_prompt(batch)
+        return self._run_completion('enhance_task_batch', 'openai', prompt, self._parse_batch_response)
+    
+    def _openai_completion(self, prompt: str, system: str, model: str, temperature: float, max_tokens: int, timeout: float,
+                           schema: Optional[Dict[str, Any]] = None) -> str:
+        """Run a chat completion with the shared OpenAI client."""
+        client = provider_clients.openai_client(self.openai_key)
+        response = client.chat.completions.create(
+            model=model,
+            messages=self._chat_messages(system, prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+            **self._response_format('openai', schema)
         )
-        
-        ai_response = response.choices[0].message.content
-        return self._parse_prioritization_response(ai_response, tasks)
+        return response.choices[0].message.content
     
     # Claude Implementation
     def _analyze_with_claude(self, content: str, source_type: str) -> Dict[str, Any]:
         """Analyze content using Anthropic Claude."""
-        import anthropic
-        
-        client = anthropic.Anthropic(api_key=self.anthropic_key)
         prompt = self._build_context_analysis_prompt(content, source_type)
-        
-        response = client.messages.create(
-            model="claude-3-sonnet-20240229",
-            max_tokens=1000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        
-        ai_response = response.content[0].text
-        return self._parse_analysis_response(ai_response)
+        return self._run_completion('analyze_context', 'anthropic', prompt, self._parse_analysis_response)
     
     def _enhance_task_claude(self, title: str, description: str, category: str) -> Dict[str, Any]:
         """Enhance task using Claude."""
-        import anthropic
-        
-        client = anthropic.Anthropic(api_key=self.anthropic_key)
         prompt = self._build_task_enhancement_prompt(title, description, category)
-        
+        return self._run_completion('enhance_task', 'anthropic', prompt, self._parse_enhancement_response)
+    
+    def _prioritize_with_claude(self, tasks: List[Dict]) -> List[Dict]:
+        """Prioritize tasks using Claude."""
+        prompt = self._build_prioritization_prompt(tasks)
+        scores = self._run_completion('prioritize_tasks', 'anthropic', prompt, self._parse_priority_scores)
+        return self._apply_priority_scores(tasks, scores)
+    
+    def _analyze_batch_claude(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Analyze a batch of entries using Claude."""
+        prompt = self._build_batch_analysis_prompt(batch)
+        return self._run_completion('analyze_context_batch', 'anthropic', prompt, self._parse_batch_response)
+    
+    def _enhance_batch_claude(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Enhance a batch of tasks using Claude."""
+        prompt = self._build_task_batch_enhancement_prompt(batch)
+        return self._run_completion('enhance_task_batch', 'anthropic', prompt, self._parse_batch_response)
+    
+    def _claude_completion(self, prompt: str, system: str, model: str, max_tokens: int, timeout: float,
+                           schema: Optional[Dict[str, Any]] = None) -> str:
+        """Create a message with the shared Anthropic client."""
+        client = provider_clients.anthropic_client(self.anthropic_key)
+        prefill = self._claude_prefill(schema)
         response = client.messages.create(
-            model="claude-3-sonnet-20240229",
-            max_tokens=500,
-            messages=[{"role": "user", "content": prompt}]
+            model=model,
+            max_tokens=max_tokens,
+            system=self._claude_system(system),
+            messages=self._claude_messages(prompt, prefill),
+            timeout=timeout
         )
+        return prefill + response.content[0].text
+    
+    # Shared provider call path
+    @staticmethod
+    def _chat_messages(system: str, prompt: str) -> List[Dict[str, str]]:
+        """OpenAI-style messages: the static system prefix, then the variable prompt."""
+        messages = [{"role": "system", "content": system}] if system else []
+        return messages + [{"role": "user", "content": prompt}]
+    
+    @staticmethod
+    def _claude_system(system: str) -> List[Dict[str, Any]]:
+        """Anthropic system block, marked as a cacheable prompt prefix."""
+        return [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+    
+    @staticmethod
+    def _response_format(provider: str, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """``response_format`` request field for OpenAI-compatible providers, if enabled."""
+        mode = settings.AI_STRUCTURED_OUTPUT.get(provider, 'none')
+        if schema is None or mode == 'none':
+            return {}
+        if mode == 'json_schema':
+            return {'response_format': {'type': 'json_schema', 'json_schema': {'name': 'response', 'schema': schema}}}
+        return {'response_format': {'type': 'json_object'}}
+    
+    @staticmethod
+    def _claude_prefill(schema: Optional[Dict[str, Any]]) -> str:
+        """Start of the Anthropic reply written for the model, to force a JSON object."""
+        if schema is not None and settings.AI_STRUCTURED_OUTPUT.get('anthropic') == 'prefill':
+            return '{'
+        return ''
+    
+    @staticmethod
+    def _claude_messages(prompt: str, prefill: str) -> List[Dict[str, str]]:
+        messages = [{"role": "user", "content": prompt}]
+        if prefill:
+            messages.append({"role": "assistant", "content": prefill})
+        return messages
+    
+    def _completion_params(self, operation: str, provider: str, prompt: str):
+        """
+        Route, generation parameters and timeout for an operation's prompt on a provider.
         
-        ai_response = response.content[0].text
-        return self._parse_enhancement_response(ai_response)
+        The parameters include the operation's static system prompt and
+        response schema, so both are part of the result cache key.
+        """
+        system = SYSTEM_PROMPTS[operation]
+        chosen = route(operation, provider, f"{system}\n{prompt}")
+        params = dict(self.OPERATION_PARAMS[operation])
+        timeout = params.pop('timeout')
+        params['max_tokens'] = chosen.max_tokens
+        params['system'] = system
+        params['schema'] = SCHEMAS[operation]
+        if provider == 'anthropic':
+            params.pop('temperature')
+        return chosen, params, timeout
     
-    def _prioritize_with_claude(self, tasks: List[Dict]) -> List[Dict]:
-        """Prioritize tasks using Claude."""
-        import anthropic
+    def _record_provider_error(self, provider: str, breaker, error: Exception):
+        """
+        Record a failed provider call.
         
-        client = anthropic.Anthropic(api_key=self.anthropic_key)
-        prompt = self._build_prioritization_prompt(tasks)
+        A 429 pauses the provider's rate limiter instead of counting against
+        its circuit breaker: the provider is healthy, we are just too fast.
+        """
+        retry_after = rate_limit_retry_after(error)
+        if retry_after is None:
+            breaker.record_failure(error)
+        else:
+            rate_limiters.limiter(provider).penalize(retry_after)
+            breaker.release_probe()
+    
+    def _validated_response(self, operation: str, provider: str, ai_response: str, repair) -> str:
+        """
+        Check a response against the operation's schema and return JSON text to parse.
         
-        response = client.messages.create(
-            model="claude-3-sonnet-20240229",
-            max_tokens=800,
-            messages=[{"role": "user", "content": prompt}]
+        An invalid response gets one repair call (``repair(prompt)``).
+        
+        Raises:
+            StructuredOutputError: If the repaired response is still invalid
+        """
+        errors = self._schema_errors(operation, provider, ai_response)
+        if not errors:
+            return ai_response
+        
+        try:
+            repaired = repair(repair_prompt(operation, ai_response, errors))
+        except Exception as e:
+            print(f"AI {operation} repair with {provider} failed: {e}")
+            repaired = ''
+        return self._accept_repair(operation, provider, errors, repaired)
+    
+    def _schema_errors(self, operation: str, provider: str, ai_response: str) -> List[str]:
+        """Validate a response against the operation's schema, counting valid ones."""
+        _, errors = check_response(operation, ai_response)
+        if not errors:
+            structured_stats.record(provider, operation, 'valid')
+        return errors
+    
+    def _accept_repair(self, operation: str, provider: str, errors: List[str], repaired: str) -> str:
+        """Record the outcome of a repair call and return the repaired text if it is valid."""
+        _, repair_errors = check_response(operation, repaired)
+        if repair_errors:
+            structured_stats.record(provider, operation, 'failed')
+            raise StructuredOutputError(f"{provider} returned invalid {operation} output: {'; '.join(errors[:3])}")
+        structured_stats.record(provider, operation, 'repaired')
+        return repaired
+    
+    @staticmethod
+    def _repair_params(params: Dict[str, Any]) -> Dict[str, Any]:
+        """Completion parameters for a repair call: the repair system prompt, deterministic."""
+        repair_params = dict(params, system=REPAIR_SYSTEM)
+        if 'temperature' in repair_params:
+            repair_params['temperature'] = 0
+        return repair_params
+    
+    def _repair_call(self, provider: str, completion, chosen, params: Dict[str, Any], timeout: float):
+        """A callable that sends a repair prompt to the same provider and model."""
+        repair_params = self._repair_params(params)
+        
+        def repair(prompt: str) -> str:
+            with rate_limiters.limiter(provider).permit(chosen.total_tokens, self.priority, max_wait(self.priority)):
+                return completion(prompt, model=chosen.model, timeout=timeout, **repair_params)
+        return repair
+    
+    def _run_completion(self, operation: str, provider: str, prompt: str, parse) -> Any:
+        """
+        Run a provider completion and parse it, serving repeats from the cache.
+        
+        The cache stores parsed results, so a hit skips both the provider call
+        and ``parse``. Cache misses wait for the provider's rate limiter, then
+        go through its circuit breaker, which records the outcome and latency
+        of every real call. Responses are validated against the operation's
+        schema (with one repair call) before they are parsed and cached; the
+        breaker counts a response that stays invalid as a failure.
+        """
+        chosen, params, timeout = self._completion_params(operation, provider, prompt)
+        model = chosen.model
+        key = None
+        if self.use_cache:
+            key = ai_cache.make_key(operation, provider, model, prompt, params)
+            cached = ai_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        completion = {
+            'lm_studio': self._lm_studio_completion,
+            'anthropic': self._claude_completion,
+            'openai': self._openai_completion,
+        }[provider]
+        
+        limiter = rate_limiters.limiter(provider)
+        with limiter.permit(chosen.total_tokens, self.priority, max_wait(self.priority)):
+            breaker = provider_health.breaker(provider)
+            if not breaker.allow_request():
+                raise ProviderUnavailable(f"{provider} circuit is open")
+            
+            start = time.monotonic()
+            try:
+                ai_response = completion(prompt, model=model, timeout=timeout, **params)
+            except Exception as e:
+                self._record_provider_error(provider, breaker, e)
+                raise
+            latency = time.monotonic() - start
+        
+        # Output that stays invalid after its repair counts as a failed call
+        try:
+            ai_response = self._validated_response(
+                operation, provider, ai_response, self._repair_call(provider, completion, chosen, params, timeout)
+            )
+        except StructuredOutputError as e:
+            breaker.record_failure(e)
+            raise
+        breaker.record_success(latency)
+        result = parse(ai_response)
+        
+        if key:
+            ai_cache.set(key, result)
+        return result
+    
+    # Streaming
+    def _stream_operation(self, operation: str, prompt: str, parse, fallback) -> Iterator[Dict[str, Any]]:
+        """
+        Stream an operation through the provider chain.
+        
+        Each event is a dict with ``event`` and ``data`` keys. If a provider
+        fails after sending partial output, a ``reset`` event tells the client
+        to discard it before the next provider (or the rules) takes over.
+        """
+        for provider in self.configured_providers():
+            chosen, params, timeout = self._completion_params(operation, provider, prompt)
+            model = chosen.model
+            key = ai_cache.make_key(operation, provider, model, prompt, params) if self.use_cache else None
+            
+            cached = ai_cache.get(key) if key else None
+            if cached is not None:
+                yield {'event': 'result', 'data': cached, 'provider': provider, 'cached': True}
+                return
+            
+            limiter = rate_limiters.limiter(provider)
+            if not limiter.acquire(chosen.total_tokens, self.priority, max_wait(self.priority)):
+                continue
+            try:
+                breaker = provider_health.breaker(provider)
+                if not breaker.allow_request():
+                    continue
+                
+                stream = {
+                    'lm_studio': self._lm_studio_stream,
+                    'anthropic': self._claude_stream,
+                    'openai': self._openai_stream,
+                }[provider]
+                
+                start = time.monotonic()
+                chunks = []
+                try:
+                    for text in stream(prompt, model=model, timeout=timeout, **params):
+                        chunks.append(text)
+                        yield {'event': 'delta', 'data': {'text': text}, 'provider': provider}
+                except GeneratorExit:
+                    # Client went away mid-stream; don't count it against the provider
+                    breaker.release_probe()
+                    raise
+                except Exception as e:
+                    self._record_provider_error(provider, breaker, e)
+                    print(f"AI {operation} stream with {provider} failed: {e}")
+                    if chunks:
+                        yield {'event': 'reset', 'data': {'reason': str(e)}, 'provider': provider}
+                    continue
+                latency = time.monotonic() - start
+            finally:
+                limiter.release()
+            
+            completion = {
+                'lm_studio': self._lm_studio_completion,
+                'anthropic': self._claude_completion,
+                'openai': self._openai_completion,
+            }[provider]
+            try:
+                ai_response = self._validated_response(
+                    operation, provider, ''.join(chunks),
+                    self._repair_call(provider, completion, chosen, params, timeout)
+                )
+            except StructuredOutputError as e:
+                breaker.record_failure(e)
+                print(f"AI {operation} stream with {provider} failed: {e}")
+                yield {'event': 'reset', 'data': {'reason': str(e)}, 'provider': provider}
+                continue
+            breaker.record_success(latency)
+            result = parse(ai_response)
+            if key:
+                ai_cache.set(key, result)
+            yield {'event': 'result', 'data': result, 'provider': provider, 'cached': False}
+            return
+        
+        yield {'event': 'result', 'data': fallback(), 'provider': 'rules', 'cached': False}
+    
+    def _lm_studio_stream(self, prompt: str, system: str, model: str, temperature: float, max_tokens: int, timeout: float,
+                          schema: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Stream a chat completion from LM Studio (OpenAI-compatible SSE)."""
+        response = provider_clients.lm_studio_session().post(
+            f"{self.lm_studio_url}/v1/chat/completions",
+            json={
+                "model": model,
+                "messages": self._chat_messages(system, prompt),
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": True,
+                **self._response_format('lm_studio', schema)
+            },
+            timeout=(settings.AI_HTTP_CONNECT_TIMEOUT, timeout),
+            stream=True
         )
         
-        ai_response = response.content[0].text
-        return self._parse_prioritization_response(ai_response, tasks)
+        with response:
+            if response.status_code == 429:
+                raise RateLimited("LM Studio API error: 429", retry_after_header(response))
+            if response.status_code != 200:
+                raise Exception(f"LM Studio API error: {response.status_code}")
+            
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                payload = line[len('data:'):].strip()
+                if payload == '[DONE]':
+                    break
+                delta = json.loads(payload)['choices'][0].get('delta', {}).get('content')
+                if delta:
+                    yield delta
+    
+    def _openai_stream(self, prompt: str, system: str, model: str, temperature: float, max_tokens: int, timeout: float,
+                       schema: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Stream a chat completion with the shared OpenAI client."""
+        client = provider_clients.openai_client(self.openai_key)
+        stream = client.chat.completions.create(
+            model=model,
+            messages=self._chat_messages(system, prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+            stream=True,
+            **self._response_format('openai', schema)
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    def _claude_stream(self, prompt: str, system: str, model: str, max_tokens: int, timeout: float,
+                       schema: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Stream a message with the shared Anthropic client."""
+        client = provider_clients.anthropic_client(self.anthropic_key)
+        prefill = self._claude_prefill(schema)
+        with client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            system=self._claude_system(system),
+            messages=self._claude_messages(prompt, prefill),
+            timeout=timeout
+        ) as stream:
+            if prefill:
+                yield prefill
+            for text in stream.text_stream:
+                yield text
     
     # Rule-based fallback implementations
     def _analyze_with_rules(self, content: str, source_type: str) -> Dict[str, Any]:
         """Fallback rule-based context analysis."""
-        # Extract keywords
-        keywords = self._extract_keywords_simple(content)
+        # Keywords and sentiment come from a single pass over the content
+        analysis = rules.analyze_text(content)
         
         # Detect tasks using patterns
-        task_patterns = [
-            r'need to (.+?)(?:\.|$)',
-            r'should (.+?)(?:\.|$)',
-            r'must (.+?)(?:\.|$)',
-            r'have to (.+?)(?:\.|$)',
-            r'remember to (.+?)(?:\.|$)',
-            r'don\'t forget to (.+?)(?:\.|$)',
-        ]
-        
         extracted_tasks = []
-        for pattern in task_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                task_text = match.group(1).strip()
-                if len(task_text) > 5:  # Minimum length
-                    priority = self._estimate_priority_rules(task_text, content)
-                    extracted_tasks.append({
-                        'title': task_text.capitalize(),
-                        'description': f'Extracted from {source_type}',
-                        'priority': priority,
-                        'category': self._guess_category_rules(task_text)
-                    })
-        
-        # Sentiment analysis (simple)
-        sentiment_score = self._analyze_sentiment_simple(content)
+        for task_text in rules.extract_task_phrases(content):
+            if len(task_text) > 5:  # Minimum length
+                task_analysis = rules.analyze_text(task_text)
+                extracted_tasks.append({
+                    'title': task_text.capitalize(),
+                    'description': f'Extracted from {source_type}',
+                    'priority': task_analysis['priority'],
+                    'category': task_analysis['category']
+                })
+        
+        sentiment_score = analysis['sentiment_score']
         
         return {
             'insights': {
@@ -305,16 +865,15 @@ class AIService:
             },
             'extracted_tasks': extracted_tasks,
             'sentiment_score': sentiment_score,
-            'keywords': keywords
+            'keywords': analysis['keywords']
         }
     
     def _enhance_task_rules(self, title: str, description: str, category: str) -> Dict[str, Any]:
         """Fallback rule-based task enhancement."""
-        # Estimate priority based on keywords
-        priority = self._estimate_priority_rules(title + ' ' + description)
-        
-        # Suggest deadline based on urgency keywords
-        deadline = self._suggest_deadline_rules(title + ' ' + description)
+        # Priority and deadline come from a single pass over the text
+        analysis = rules.analyze_text(title + ' ' + description)
+        priority = analysis['priority']
+        deadline = self._deadline_from_days(analysis['deadline_days'])
         
         # Enhanced description
         enhanced_desc = description
@@ -339,207 +898,107 @@ class AIService:
     
     # Helper methods
     def _build_context_analysis_prompt(self, content: str, source_type: str) -> str:
-        """Build prompt for context analysis."""
-        return f"""
-        Analyze the following {source_type} content and extract actionable insights:
-
-        Content: "{content}"
-
-        Please provide a JSON response with:
-        1. insights: {{summary, task_count, urgency_level}}
-        2. extracted_tasks: [{{title, description, priority (1-10), category, deadline}}]
-        3. sentiment_score: float between -1 and 1
-        4. keywords: list of relevant keywords
-
-        Focus on identifying tasks, deadlines, and priorities. Be practical and actionable.
-        """
+        """Build the variable part of the context analysis prompt (see prompts.CONTEXT_ANALYSIS_SYSTEM)."""
+        return f'Analyze the following {source_type} content:\n\n"{content}"'
+    
+    def _build_batch_analysis_prompt(self, batch: List[Dict[str, Any]]) -> str:
+        """Build the variable part of the batch analysis prompt (see prompts.BATCH_ANALYSIS_SYSTEM)."""
+        documents = "\n\n".join(format_entry(entry) for entry in batch)
+        ids = ", ".join(str(entry['id']) for entry in batch)
+        return f"Analyze these {len(batch)} entries (ids: {ids}):\n\n{documents}"
     
     def _build_task_enhancement_prompt(self, title: str, description: str, category: str) -> str:
-        """Build prompt for task enhancement."""
-        return f"""
-        Enhance this task with AI-powered suggestions:
-
-        Title: {title}
-        Description: {description}
-        Category: {category or 'Unknown'}
-
-        Please provide a JSON response with:
-        1. priority: integer 1-10 (based on urgency and importance)
-        2. suggested_deadline: ISO date string (realistic estimate)
-        3. enhanced_description: improved, more detailed description
-        4. suggested_categories: list of relevant categories
-        5. insights: explanation of priority and recommendations
-
-        Be practical and helpful in your suggestions.
-        """
+        """Build the variable part of the task enhancement prompt (see prompts.TASK_ENHANCEMENT_SYSTEM)."""
+        return f"Title: {title}\nDescription: {description}\nCategory: {category or 'Unknown'}"
+    
+    def _build_task_batch_enhancement_prompt(self, batch: List[Dict[str, Any]]) -> str:
+        """Build the variable part of the batch enhancement prompt (see prompts.TASK_BATCH_ENHANCEMENT_SYSTEM)."""
+        documents = "\n\n".join(format_task(task) for task in batch)
+        ids = ", ".join(str(task['id']) for task in batch)
+        return f"Enhance these {len(batch)} tasks (ids: {ids}):\n\n{documents}"
     
     def _build_prioritization_prompt(self, tasks: List[Dict]) -> str:
-        """Build prompt for task prioritization."""
+        """Build the variable part of the prioritization prompt (see prompts.PRIORITIZATION_SYSTEM)."""
         task_list = "\n".join([
             f"{i+1}. {task.get('title', 'Untitled')} - {task.get('description', '')}"
             for i, task in enumerate(tasks)
         ])
-        
-        return f"""
-        Prioritize these tasks based on urgency and importance:
-
-        {task_list}
-
-        Please provide a JSON response with:
-        - prioritized_tasks: array of task indices (0-based) in priority order
-        - priority_scores: array of scores 1-10 for each task
-        - reasoning: explanation of prioritization logic
-
-        Consider deadlines, complexity, and impact when prioritizing.
-        """
+        return f"Prioritize these tasks:\n\n{task_list}"
+    
+    def _extract_json(self, response: str) -> Optional[Any]:
+        """Extract the JSON object from an AI response (see structured.extract_json)."""
+        return extract_json(response)
     
     def _parse_analysis_response(self, response: str) -> Dict[str, Any]:
-        """Parse AI response for context analysis."""
-        try:
-            # Try to extract JSON from response
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-        except:
-            pass
-        
-        # Fallback parsing
-        return {
-            'insights': {'summary': 'AI analysis completed'},
-            'extracted_tasks': [],
-            'sentiment_score': 0.0,
-            'keywords': []
-        }
+        """Parse a validated AI response for context analysis."""
+        return self._extract_json(response)
+    
+    def _parse_batch_response(self, response: str) -> Dict[str, Any]:
+        """Demultiplex a validated batch response into sections keyed by entry or task id."""
+        sections = {}
+        for section in self._extract_json(response)['results']:
+            section = dict(section)
+            sections[str(section.pop('id'))] = section
+        return sections
+    
+    def _is_analysis(self, section: Any) -> bool:
+        """Check that a batch section looks like a context analysis."""
+        return isinstance(section, dict) and ('insights' in section or 'extracted_tasks' in section)
+    
+    def _is_enhancement(self, section: Any) -> bool:
+        """Check that a batch section looks like a task enhancement."""
+        return (
+            isinstance(section, dict) and 'enhanced_description' in section
+            and valid_score(section.get('priority')) is not None
+        )
     
     def _parse_enhancement_response(self, response: str) -> Dict[str, Any]:
-        """Parse AI response for task enhancement."""
-        try:
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-        except:
-            pass
-        
-        return {
-            'priority': 5,
-            'suggested_deadline': None,
-            'enhanced_description': '',
-            'suggested_categories': [],
-            'insights': 'Enhancement completed'
-        }
+        """Parse a validated AI response for task enhancement."""
+        return self._extract_json(response)
     
     def _parse_prioritization_response(self, response: str, tasks: List[Dict]) -> List[Dict]:
         """Parse AI response for task prioritization."""
-        try:
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group())
-                priority_scores = data.get('priority_scores', [])
-                
-                for i, task in enumerate(tasks):
-                    if i < len(priority_scores):
-                        task['priority_score'] = priority_scores[i]
-                
-                return tasks
-        except:
-            pass
+        return self._apply_priority_scores(tasks, self._parse_priority_scores(response))
+    
+    def _parse_priority_scores(self, response: str) -> List:
+        """Extract the list of priority scores from a validated prioritization response."""
+        return self._extract_json(response)['priority_scores']
+    
+    def _apply_priority_scores(self, tasks: List[Dict], priority_scores: List) -> List[Dict]:
+        """
+        Apply positional priority scores to tasks.
+        
+        Tasks without a valid score (e.g. the response was truncated) get
+        their rule-based priority rather than keeping a stale score.
+        """
+        for i, task in enumerate(tasks):
+            score = valid_score(priority_scores[i]) if i < len(priority_scores) else None
+            task['priority_score'] = int(round(score)) if score is not None else rule_score(task)
         
         return tasks
     
     def _estimate_priority_rules(self, content: str, context: str = '') -> int:
         """Estimate priority using rule-based approach."""
-        content_lower = content.lower()
-        
-        # High priority keywords
-        high_priority = ['urgent', 'asap', 'immediately', 'critical', 'important', 'deadline', 'due']
-        # Medium priority keywords
-        medium_priority = ['soon', 'today', 'tomorrow', 'this week', 'meeting', 'call']
-        # Low priority keywords
-        low_priority = ['later', 'eventually', 'when possible', 'someday']
-        
-        priority = 5  # Default
-        
-        for keyword in high_priority:
-            if keyword in content_lower:
-                priority = max(priority, 8)
-        
-        for keyword in medium_priority:
-            if keyword in content_lower:
-                priority = max(priority, 6)
-        
-        for keyword in low_priority:
-            if keyword in content_lower:
-                priority = min(priority, 3)
-        
-        return priority
+        return rules.analyze_text(content)['priority']
     
     def _suggest_deadline_rules(self, content: str) -> Optional[str]:
         """Suggest deadline using rule-based approach."""
-        content_lower = content.lower()
-        
-        # Look for time indicators
-        if any(word in content_lower for word in ['today', 'asap', 'immediately']):
-            return (datetime.now() + timedelta(days=1)).isoformat()
-        elif any(word in content_lower for word in ['tomorrow', 'next day']):
-            return (datetime.now() + timedelta(days=2)).isoformat()
-        elif any(word in content_lower for word in ['this week', 'week']):
-            return (datetime.now() + timedelta(days=7)).isoformat()
-        elif any(word in content_lower for word in ['next week']):
-            return (datetime.now() + timedelta(days=14)).isoformat()
-        elif any(word in content_lower for word in ['month', 'monthly']):
-            return (datetime.now() + timedelta(days=30)).isoformat()
-        
-        return None
+        return self._deadline_from_days(rules.analyze_text(content)['deadline_days'])
+    
+    def _deadline_from_days(self, days: Optional[int]) -> Optional[str]:
+        """Turn a deadline hint in days into an ISO timestamp."""
+        if days is None:
+            return None
+        return (datetime.now() + timedelta(days=days)).isoformat()
     
     def _guess_category_rules(self, content: str) -> str:
         """Guess category using rule-based approach."""
-        content_lower = content.lower()
-        
-        if any(word in content_lower for word in ['work', 'office', 'meeting', 'project', 'client']):
-            return 'Work'
-        elif any(word in content_lower for word in ['doctor', 'health', 'gym', 'exercise', 'medical']):
-            return 'Health'
-        elif any(word in content_lower for word in ['buy', 'shop', 'grocery', 'store', 'purchase']):
-            return 'Shopping'
-        elif any(word in content_lower for word in ['family', 'home', 'house', 'personal']):
-            return 'Personal'
-        elif any(word in content_lower for word in ['learn', 'study', 'course', 'education']):
-            return 'Education'
-        else:
-            return 'General'
+        return rules.analyze_text(content)['category']
     
     def _extract_keywords_simple(self, text: str) -> List[str]:
         """Simple keyword extraction."""
-        # Remove common stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
-            'before', 'after', 'above', 'below', 'between', 'among', 'is', 'are',
-            'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does',
-            'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can',
-            'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'
-        }
-        
-        # Extract words
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        keywords = [word for word in words if word not in stop_words]
-        
-        # Return most frequent keywords
-        from collections import Counter
-        word_freq = Counter(keywords)
-        return [word for word, count in word_freq.most_common(10)]
+        return rules.analyze_text(text)['keywords']
     
     def _analyze_sentiment_simple(self, text: str) -> float:
         """Simple sentiment analysis."""
-        positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'love', 'like', 'happy', 'excited']
-        negative_words = ['bad', 'terrible', 'awful', 'hate', 'dislike', 'sad', 'angry', 'frustrated', 'annoyed', 'upset']
-        
-        text_lower = text.lower()
-        
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
-        
-        if positive_count + negative_count == 0:
-            return 0.0
-        
-        return (positive_count - negative_count) / (positive_count + negative_count) 
\ No newline at end of file
+        return rules.analyze_text(text)['sentiment_score']
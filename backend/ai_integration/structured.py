@@ -0,0 +1,338 @@
+"""
+Structured output for the AI operations.
+
+Every operation has a JSON Schema for its response. Providers are asked for
+JSON natively where they support it (``settings.AI_STRUCTURED_OUTPUT``):
+
+- ``json_schema``: OpenAI-compatible ``response_format`` with the schema
+  (LM Studio constrains generation to it)
+- ``json_object``: OpenAI JSON mode
+- ``prefill``: the Anthropic reply is prefilled with ``{`` so it starts
+  as a JSON object
+- ``none``: plain text
+
+Whatever comes back goes through a tolerant extractor (code fences, prose
+around the object, trailing commas and output truncated by ``max_tokens``)
+and is validated against the schema. An invalid response gets exactly one
+constrained repair call; if that fails too the call raises
+StructuredOutputError, so the caller moves on to the next provider or the
+rule-based fallback instead of using a placeholder result. Outcomes are
+counted per provider and operation so wasted calls can be measured.
+"""
+
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+MAX_ERRORS = 10
+# Failed object starts the extractor tries to repair before giving up on them
+MAX_REPAIR_STARTS = 3
+# How much of an invalid response the repair prompt quotes
+REPAIR_MAX_CHARS = 6000
+FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+_STRING_LIST = {'type': 'array', 'items': {'type': 'string'}}
+_EXTRACTED_TASK = {
+    'type': 'object',
+    'required': ['title'],
+    'properties': {
+        'title': {'type': 'string'},
+        'description': {'type': ['string', 'null']},
+        'priority': {'type': ['number', 'null']},
+        'category': {'type': ['string', 'null']},
+        'deadline': {'type': ['string', 'null']},
+    },
+}
+_ANALYSIS_PROPERTIES = {
+    'insights': {
+        'type': 'object',
+        'properties': {
+            'summary': {'type': 'string'},
+            'task_count': {'type': 'number'},
+            'urgency_level': {'type': 'string'},
+        },
+    },
+    'extracted_tasks': {'type': 'array', 'items': _EXTRACTED_TASK},
+    'sentiment_score': {'type': 'number', 'minimum': -1, 'maximum': 1},
+    'keywords': _STRING_LIST,
+}
+_ENHANCEMENT_PROPERTIES = {
+    'priority': {'type': 'number', 'minimum': 1, 'maximum': 10},
+    'suggested_deadline': {'type': ['string', 'null']},
+    'enhanced_description': {'type': 'string'},
+    'suggested_categories': _STRING_LIST,
+    'insights': {'type': 'string'},
+}
+
+SCHEMAS = {
+    'analyze_context': {
+        'type': 'object',
+        'required': ['insights', 'extracted_tasks'],
+        'properties': _ANALYSIS_PROPERTIES,
+    },
+    'analyze_context_batch': {
+        'type': 'object',
+        'required': ['results'],
+        'properties': {
+            'results': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    # Sections without an analysis fall back per entry, not the whole batch
+                    'required': ['id'],
+                    'properties': dict(_ANALYSIS_PROPERTIES, id={'type': ['integer', 'string']}),
+                },
+            },
+        },
+    },
+    'enhance_task': {
+        'type': 'object',
+        'required': ['priority', 'enhanced_description'],
+        'properties': _ENHANCEMENT_PROPERTIES,
+    },
+    'enhance_task_batch': {
+        'type': 'object',
+        'required': ['results'],
+        'properties': {
+            'results': {
+                'type': 'array',
+                'items': {
+                    'type': 'object',
+                    # Sections without an enhancement fall back per task, not the whole batch
+                    'required': ['id'],
+                    'properties': dict(_ENHANCEMENT_PROPERTIES, id={'type': ['integer', 'string']}),
+                },
+            },
+        },
+    },
+    'prioritize_tasks': {
+        'type': 'object',
+        'required': ['priority_scores'],
+        'properties': {
+            'prioritized_tasks': {'type': 'array', 'items': {'type': 'integer'}},
+            'priority_scores': {'type': 'array', 'items': {'type': 'number'}},
+            'reasoning': {'type': 'string'},
+        },
+    },
+}
+
+REPAIR_SYSTEM = """You repair JSON so that it is valid and matches a JSON Schema.
+Reply with only the corrected JSON object: no prose, no code fences.
+Keep every value from the original that fits the schema; fill missing required fields with sensible values."""
+
+
+class StructuredOutputError(Exception):
+    """Raised when a provider response is not valid JSON for its schema, even after repair."""
+
+
+def extract_json(text: str) -> Optional[Any]:
+    """
+    Extract the first JSON object from a model response.
+
+    Tries the whole text and fenced code blocks, then decodes incrementally
+    from each ``{`` in the text (so prose before or after the object is
+    ignored). Where decoding fails, the object is retried with trailing
+    commas removed and any brackets left open by truncation closed.
+    """
+    if not text:
+        return None
+    candidates = [text.strip()] + [block.strip() for block in FENCE_RE.findall(text)]
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+            if isinstance(data, dict):
+                return data
+        except ValueError:
+            pass
+
+    decoder = json.JSONDecoder()
+    repairs_left = MAX_REPAIR_STARTS
+    start = text.find('{')
+    while start != -1:
+        try:
+            data, _ = decoder.raw_decode(text, start)
+            if isinstance(data, dict):
+                return data
+        except ValueError:
+            # Try the truncation/trailing-comma repair here before moving on to
+            # a later (possibly nested) object
+            if repairs_left:
+                repairs_left -= 1
+                data = _decode_repaired(text[start:])
+                if data is not None:
+                    return data
+        start = text.find('{', start + 1)
+    return None
+
+
+def validate(data: Any, schema: Dict[str, Any], path: str = '$') -> List[str]:
+    """
+    Validate data against the JSON Schema subset used in SCHEMAS.
+
+    Supports ``type`` (a name or list of names), ``required``,
+    ``properties``, ``items``, ``minimum`` and ``maximum``. Returns a list of
+    error messages (empty when valid).
+    """
+    errors = []
+    _validate(data, schema, path, errors)
+    return errors[:MAX_ERRORS]
+
+
+def check_response(operation: str, text: str) -> Tuple[Optional[Any], List[str]]:
+    """Extract and validate a response; returns (data, errors)."""
+    data = extract_json(text)
+    if data is None:
+        return None, ['response contains no JSON object']
+    return data, validate(data, SCHEMAS[operation])
+
+
+def repair_prompt(operation: str, text: str, errors: List[str]) -> str:
+    """The user prompt for the single repair call."""
+    problems = "\n".join(f"- {error}" for error in errors)
+    return (
+        f"JSON Schema:\n{json.dumps(SCHEMAS[operation])}\n\n"
+        f"Problems found:\n{problems}\n\n"
+        f"Response to repair:\n{text[:REPAIR_MAX_CHARS]}"
+    )
+
+
+class StructuredOutputStats:
+    """Per provider and operation counts of valid, repaired and failed responses."""
+
+    OUTCOMES = ('valid', 'repaired', 'failed')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, provider: str, operation: str, outcome: str):
+        with self._lock:
+            counts = self._counts.setdefault(provider, {}).setdefault(
+                operation, {name: 0 for name in self.OUTCOMES}
+            )
+            counts[outcome] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            snapshot = {}
+            for provider, operations in self._counts.items():
+                for operation, counts in operations.items():
+                    responses = sum(counts.values())
+                    snapshot.setdefault(provider, {})[operation] = dict(
+                        counts,
+                        responses=responses,
+                        repair_rate=round((counts['repaired'] + counts['failed']) / responses, 4),
+                        failure_rate=round(counts['failed'] / responses, 4),
+                    )
+            return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+_JSON_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'boolean': bool,
+    'null': type(None),
+}
+
+
+def _is_type(value: Any, name: str) -> bool:
+    if name in ('number', 'integer'):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return name == 'number' or float(value).is_integer()
+    return isinstance(value, _JSON_TYPES[name])
+
+
+def _validate(data: Any, schema: Dict[str, Any], path: str, errors: List[str]):
+    types = schema.get('type')
+    if types is not None:
+        names = types if isinstance(types, list) else [types]
+        if not any(_is_type(data, name) for name in names):
+            errors.append(f"{path}: expected {' or '.join(names)}, got {type(data).__name__}")
+            return
+
+    if isinstance(data, dict):
+        for key in schema.get('required', []):
+            if key not in data:
+                errors.append(f"{path}: missing required field '{key}'")
+        for key, subschema in schema.get('properties', {}).items():
+            if key in data:
+                _validate(data[key], subschema, f"{path}.{key}", errors)
+    elif isinstance(data, list) and 'items' in schema:
+        for index, item in enumerate(data):
+            _validate(item, schema['items'], f"{path}[{index}]", errors)
+            if len(errors) >= MAX_ERRORS:
+                return
+    elif _is_type(data, 'number'):
+        if 'minimum' in schema and data < schema['minimum']:
+            errors.append(f"{path}: {data} is below the minimum {schema['minimum']}")
+        if 'maximum' in schema and data > schema['maximum']:
+            errors.append(f"{path}: {data} is above the maximum {schema['maximum']}")
+
+
+def _decode_repaired(fragment: str) -> Optional[Dict[str, Any]]:
+    for candidate in _completions(fragment):
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def _completions(fragment: str):
+    """
+    Candidate repairs of a JSON fragment, most complete first.
+
+    Trailing commas are dropped and brackets left open are closed; if the
+    fragment was cut inside a value, it is also retried cut back to each
+    earlier comma outside a string.
+    """
+    stack = []
+    cuts = []
+    cleaned = []
+    in_string = escape = False
+    for char in fragment:
+        if in_string:
+            cleaned.append(char)
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+        elif char in '}]':
+            # Drop a trailing comma before the closing bracket
+            while cleaned and cleaned[-1].isspace():
+                cleaned.pop()
+            if cleaned and cleaned[-1] == ',':
+                cleaned.pop()
+            if stack:
+                stack.pop()
+            if not stack:
+                cleaned.append(char)
+                yield ''.join(cleaned)
+                return
+        elif char == ',':
+            cuts.append((len(cleaned), list(stack)))
+        cleaned.append(char)
+
+    text = ''.join(cleaned)
+    yield text + ('"' if in_string else '') + ''.join(reversed(stack))
+    for position, open_brackets in reversed(cuts[-20:]):
+        yield text[:position] + ''.join(reversed(open_brackets))
+
+
+structured_stats = StructuredOutputStats()
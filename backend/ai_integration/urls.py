@@ -5,14 +5,32 @@ URL patterns for AI integration app.
 from django.urls import path
 from .views import (
     TaskEnhancementView,
+    TaskBatchEnhancementView,
+    TaskEnhancementStateView,
+    TaskEnhancementChangesView,
+    TaskEnhancementStreamView,
     TaskPrioritizationView,
     ContextAnalysisView,
-    AICapabilitiesView
+    ContextAnalysisStreamView,
+    AICapabilitiesView,
+    AIMetricsView,
+    AsyncTaskEnhancementView,
+    AsyncTaskPrioritizationView,
+    AsyncContextAnalysisView
 )
 
 urlpatterns = [
     path('enhance-task/', TaskEnhancementView.as_view(), name='enhance-task'),
+    path('enhance-task/batch/', TaskBatchEnhancementView.as_view(), name='enhance-task-batch'),
+    path('enhance-task/changes/', TaskEnhancementChangesView.as_view(), name='enhance-task-changes'),
+    path('enhance-task/<int:task_id>/', TaskEnhancementStateView.as_view(), name='enhance-task-state'),
+    path('enhance-task/stream/', TaskEnhancementStreamView.as_view(), name='enhance-task-stream'),
     path('prioritize-tasks/', TaskPrioritizationView.as_view(), name='prioritize-tasks'),
     path('analyze-context/', ContextAnalysisView.as_view(), name='analyze-context'),
+    path('analyze-context/stream/', ContextAnalysisStreamView.as_view(), name='analyze-context-stream'),
     path('capabilities/', AICapabilitiesView.as_view(), name='ai-capabilities'),
+    path('metrics/', AIMetricsView.as_view(), name='ai-metrics'),
+    path('async/enhance-task/', AsyncTaskEnhancementView.as_view(), name='async-enhance-task'),
+    path('async/prioritize-tasks/', AsyncTaskPrioritizationView.as_view(), name='async-prioritize-tasks'),
+    path('async/analyze-context/', AsyncContextAnalysisView.as_view(), name='async-analyze-context'),
 ] 
\ No newline at end of file
@@ -5,17 +5,115 @@ AI Integration API views.
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import JsonResponse
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from .admission import admission_controlled, admission_gates
+from .async_services import AsyncAIService
+from .cache import ai_cache
+from .coalescing import single_flight
+from .fanout import fan_out, in_input_order
+from .health import provider_health
+from .ratelimit import rate_limiters
+from .revalidation import enhancement_changes, enhancement_state, schedule_enhancement, start_enhancement
 from .services import AIService
+from .structured import structured_stats
 from tasks.models import Task
 from tasks.serializers import TaskSerializer
+from tasks.stats import bulk_update_tasks
+
+
+def use_ai_cache(request):
+    """
+    Honour ``Cache-Control: no-cache`` or ``?cache=false`` to bypass the AI cache.
+    
+    Returns False to bypass, or None to follow ``settings.AI_CACHE_ENABLED``.
+    """
+    if 'no-cache' in request.headers.get('Cache-Control', ''):
+        return False
+    params = getattr(request, 'query_params', request.GET)
+    if params.get('cache', 'true').lower() == 'false':
+        return False
+    return None
+
+
+def interactive_service(request, service_class=AIService):
+    """AI service for a user-facing request; rule-based only if admitted degraded."""
+    return service_class(
+        use_cache=use_ai_cache(request),
+        interactive=True,
+        rules_only=getattr(request, 'ai_degraded', False)
+    )
+
+
+def wants_provisional(request, data):
+    """``provisional`` in the body or query string selects stale-while-revalidate enhancement."""
+    value = data.get('provisional', request.query_params.get('provisional', False))
+    return value is True or str(value).lower() == 'true'
+
+
+def parse_task_id(value):
+    """Positive integer task id from a request body, or None if it is not one."""
+    if isinstance(value, bool):
+        return None
+    try:
+        task_id = int(value)
+    except (TypeError, ValueError):
+        return None
+    return task_id if task_id > 0 and str(task_id) == str(value).strip() else None
+
+
+def provisional_enhancement(task_id, title, description, category):
+    """
+    Answer with the rule-based enhancement now and enhance the task with the LLM in the background.
+    
+    Returns:
+        The provisional enhancement with its revision token, or None if the task does not exist
+    """
+    revision = start_enhancement(task_id)
+    if revision is None:
+        return None
+    # The rule engine directly: a coalesced call could wait on the LLM enhancement in flight
+    enhancement = AIService(rules_only=True)._enhance_task_rules(title, description, category)
+    schedule_enhancement(task_id, revision, title, description, category)
+    return dict(enhancement, provisional=True, task_id=task_id, revision=revision)
+
+
+def sse_response(operation, events):
+    """Wrap AIService stream events in a Server-Sent Events response."""
+    def stream():
+        # Open the stream right away so clients get the first byte immediately
+        yield f"event: start\ndata: {json.dumps({'operation': operation})}\n\n"
+        try:
+            for event in events:
+                payload = {key: value for key, value in event.items() if key != 'event'}
+                yield f"event: {event['event']}\ndata: {json.dumps(payload, default=str)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 class TaskEnhancementView(APIView):
     """API view for AI-powered task enhancement."""
     
+    @admission_controlled
     def post(self, request):
-        """Enhance a task with AI suggestions."""
+        """
+        Enhance a task with AI suggestions.
+        
+        With ``provisional`` and a ``task_id``, returns the rule-based
+        enhancement at once and stores the AI enhancement on the task later.
+        """
         try:
             data = request.data
             title = data.get('title', '')
@@ -28,7 +126,24 @@ class TaskEnhancementView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            ai_service = AIService()
+            if wants_provisional(request, data):
+                if not data.get('task_id'):
+                    return Response(
+                        {'error': 'task_id is required for a provisional enhancement'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                task_id = parse_task_id(data['task_id'])
+                if task_id is None:
+                    return Response(
+                        {'error': 'task_id must be a positive integer'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                enhancement = provisional_enhancement(task_id, title, description, category)
+                if enhancement is None:
+                    return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+                return Response(enhancement, status=status.HTTP_202_ACCEPTED)
+            
+            ai_service = interactive_service(request)
             enhancement = ai_service.enhance_task(title, description, category)
             
             return Response(enhancement)
@@ -40,9 +155,162 @@ class TaskEnhancementView(APIView):
             )
 
 
+def enhance_item(ai_service, task):
+    """Enhance one task of a batch request."""
+    if not isinstance(task, dict) or not task.get('title'):
+        raise ValueError('Title is required')
+    return ai_service.enhance_task(task['title'], task.get('description', ''), task.get('category', ''))
+
+
+def ndjson_response(outcomes):
+    """Stream fan-out outcomes as newline-delimited JSON, one line per item as it completes."""
+    def stream():
+        try:
+            for outcome in outcomes:
+                yield json.dumps(outcome, default=str) + "\n"
+        finally:
+            # Client went away: don't start the remaining items
+            outcomes.close()
+    
+    response = StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+class TaskBatchEnhancementView(APIView):
+    """API view for enhancing a list of tasks in one request."""
+    
+    @admission_controlled
+    def post(self, request):
+        """
+        Enhance up to ``AI_ENHANCE_BATCH_MAX_ITEMS`` tasks with bounded parallelism.
+        
+        Returns one result per task in input order, each with its own
+        status and error. With ``?stream=ndjson`` the results are streamed as
+        JSON lines (carrying their ``index``) as each task completes.
+        """
+        tasks = request.data.get('tasks')
+        if not isinstance(tasks, list) or not tasks:
+            return Response(
+                {'error': 'tasks list is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(tasks) > settings.AI_ENHANCE_BATCH_MAX_ITEMS:
+            return Response(
+                {'error': f'At most {settings.AI_ENHANCE_BATCH_MAX_ITEMS} tasks per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Bulk work: wait for provider capacity rather than racing the rules
+        ai_service = AIService(use_cache=use_ai_cache(request), rules_only=getattr(request, 'ai_degraded', False))
+        outcomes = fan_out(tasks, lambda task: enhance_item(ai_service, task))
+        if request.query_params.get('stream') == 'ndjson':
+            return ndjson_response(outcomes)
+        
+        results = in_input_order(outcomes, len(tasks))
+        failed = sum(1 for result in results if result['status'] == 'error')
+        return Response({'results': results, 'succeeded': len(results) - failed, 'failed': failed})
+
+
+class TaskEnhancementStateView(APIView):
+    """API view for polling a task's enhancement state."""
+    
+    def get(self, request, task_id):
+        """Get the task's enhancement revision, status and stored AI result."""
+        try:
+            task = Task.objects.get(id=task_id)
+        except Task.DoesNotExist:
+            return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(enhancement_state(task))
+
+
+class TaskEnhancementChangesView(APIView):
+    """API view serving the feed of stored task enhancements."""
+    
+    def get(self, request):
+        """Get enhancements stored after ``?cursor=`` (oldest first) and the cursor for the next page."""
+        try:
+            limit = min(int(request.query_params.get('limit', settings.AI_CHANGE_FEED_PAGE_SIZE)),
+                        settings.AI_CHANGE_FEED_PAGE_SIZE)
+            changes, cursor = enhancement_changes(request.query_params.get('cursor'), max(limit, 1))
+        except ValueError:
+            return Response({'error': 'Invalid cursor or limit'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'changes': changes, 'cursor': cursor})
+
+
+class TaskEnhancementStreamView(APIView):
+    """API view streaming AI task enhancement as Server-Sent Events."""
+    
+    @admission_controlled
+    def post(self, request):
+        """Stream partial output, then the parsed enhancement as the last event."""
+        data = request.data
+        title = data.get('title', '')
+        
+        if not title:
+            return Response(
+                {'error': 'Title is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        ai_service = interactive_service(request)
+        events = ai_service.stream_enhance_task(
+            title,
+            data.get('description', ''),
+            data.get('category', '')
+        )
+        return sse_response('enhance_task', events)
+
+
+def prioritization_data(tasks):
+    """Prompt input for ``prioritize_tasks`` (load the tasks with their category)."""
+    return [
+        {
+            'id': task.id,
+            'title': task.title,
+            'description': task.description,
+            'category': task.category.name if task.category else None,
+            'current_priority': task.priority_score,
+            'deadline': task.deadline.isoformat() if task.deadline else None
+        }
+        for task in tasks
+    ]
+
+
+def save_prioritized_tasks(tasks, prioritized_tasks):
+    """
+    Store AI priorities on the loaded tasks with one bulk update.
+    
+    Args:
+        tasks: Task instances the priorities were computed for
+        prioritized_tasks: ``prioritize_tasks`` result
+    
+    Returns:
+        The tasks in Task.Meta.ordering order, ready to serialize without
+        re-querying
+    """
+    tasks_by_id = {task.id: task for task in tasks}
+    now = timezone.now()
+    updated = []
+    for task_data in prioritized_tasks:
+        task = tasks_by_id.get(task_data['id'])
+        if task is not None and 'priority_score' in task_data:
+            task.priority_score = task_data['priority_score']
+            task.ai_insights = f"Priority updated by AI: {task_data.get('reasoning', '')}"
+            task.updated_at = now  # bulk_update skips auto_now
+            updated.append(task)
+    
+    with transaction.atomic():
+        bulk_update_tasks(Task.objects, updated, ['priority_score', 'ai_insights', 'updated_at'])
+    
+    return sorted(tasks, key=lambda task: (task.priority_score, task.created_at), reverse=True)
+
+
 class TaskPrioritizationView(APIView):
     """API view for AI-powered task prioritization."""
     
+    @admission_controlled
     def post(self, request):
         """Prioritize a list of tasks using AI."""
         try:
@@ -54,35 +322,14 @@ class TaskPrioritizationView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Get tasks from database
-            tasks = Task.objects.filter(id__in=task_ids)
-            task_data = []
-            
-            for task in tasks:
-                task_data.append({
-                    'id': task.id,
-                    'title': task.title,
-                    'description': task.description,
-                    'category': task.category.name if task.category else None,
-                    'current_priority': task.priority_score,
-                    'deadline': task.deadline.isoformat() if task.deadline else None
-                })
+            # One read with the categories joined in
+            tasks = list(Task.objects.select_related('category').filter(id__in=task_ids))
             
             # Prioritize with AI
-            ai_service = AIService()
-            prioritized_tasks = ai_service.prioritize_tasks(task_data)
-            
-            # Update tasks in database
-            for task_data in prioritized_tasks:
-                task = tasks.get(id=task_data['id'])
-                if 'priority_score' in task_data:
-                    task.priority_score = task_data['priority_score']
-                    task.ai_insights = f"Priority updated by AI: {task_data.get('reasoning', '')}"
-                    task.save()
+            ai_service = interactive_service(request)
+            prioritized_tasks = ai_service.prioritize_tasks(prioritization_data(tasks))
             
-            # Return updated tasks
-            updated_tasks = Task.objects.filter(id__in=task_ids)
-            serializer = TaskSerializer(updated_tasks, many=True)
+            serializer = TaskSerializer(save_prioritized_tasks(tasks, prioritized_tasks), many=True)
             
             return Response({
                 'prioritized_tasks': serializer.data,
@@ -99,6 +346,7 @@ class TaskPrioritizationView(APIView):
 class ContextAnalysisView(APIView):
     """API view for context analysis."""
     
+    @admission_controlled
     def post(self, request):
         """Analyze context content and extract insights."""
         try:
@@ -111,7 +359,7 @@ class ContextAnalysisView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            ai_service = AIService()
+            ai_service = interactive_service(request)
             analysis = ai_service.analyze_context(content, source_type)
             
             return Response(analysis)
@@ -123,13 +371,42 @@ class ContextAnalysisView(APIView):
             )
 
 
+class ContextAnalysisStreamView(APIView):
+    """API view streaming context analysis as Server-Sent Events."""
+    
+    @admission_controlled
+    def post(self, request):
+        """Stream partial output, then the parsed analysis as the last event."""
+        content = request.data.get('content', '')
+        source_type = request.data.get('source_type', 'notes')
+        
+        if not content:
+            return Response(
+                {'error': 'Content is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        ai_service = interactive_service(request)
+        events = ai_service.stream_analyze_context(content, source_type)
+        return sse_response('analyze_context', events)
+
+
 class AICapabilitiesView(APIView):
     """API view to check AI capabilities and status."""
     
+    PROVIDERS = {
+        'lm_studio': {'name': 'LM Studio', 'type': 'local'},
+        'anthropic': {'name': 'Anthropic Claude', 'type': 'cloud'},
+        'openai': {'name': 'OpenAI GPT', 'type': 'cloud'},
+    }
+    BREAKER_STATUS = {
+        'closed': 'available',
+        'half_open': 'recovering',
+        'open': 'unavailable',
+    }
+    
     def get(self, request):
-        """Get information about available AI providers."""
-        from django.conf import settings
-        
+        """Get information about available AI providers and their live health."""
         capabilities = {
             'available_providers': [],
             'features': {
@@ -139,36 +416,131 @@ class AICapabilitiesView(APIView):
                 'sentiment_analysis': True,
                 'keyword_extraction': True
             },
-            'status': 'operational'
+            'status': 'operational',
+            'cache': ai_cache.stats(),
+            'coalescing': single_flight.stats()
         }
         
-        # Check available providers
-        if settings.LM_STUDIO_BASE_URL:
-            capabilities['available_providers'].append({
-                'name': 'LM Studio',
-                'type': 'local',
-                'status': 'available'
-            })
-        
-        if settings.ANTHROPIC_API_KEY:
+        # Report configured providers with their circuit breaker and rate limiter state
+        for provider in AIService().configured_providers():
+            circuit = provider_health.breaker(provider).snapshot()
             capabilities['available_providers'].append({
-                'name': 'Anthropic Claude',
-                'type': 'cloud',
-                'status': 'available'
+                **self.PROVIDERS[provider],
+                'id': provider,
+                'status': self.BREAKER_STATUS[circuit['state']],
+                'circuit': circuit,
+                'rate_limit': rate_limiters.limiter(provider).snapshot()
             })
         
-        if settings.OPENAI_API_KEY:
-            capabilities['available_providers'].append({
-                'name': 'OpenAI GPT',
-                'type': 'cloud',
-                'status': 'available'
-            })
+        healthy = [
+            provider for provider in capabilities['available_providers']
+            if provider['status'] != 'unavailable'
+        ]
+        if capabilities['available_providers'] and not healthy:
+            capabilities['status'] = 'degraded'
         
-        if not capabilities['available_providers']:
+        if not healthy:
             capabilities['available_providers'].append({
                 'name': 'Rule-based Fallback',
                 'type': 'local',
                 'status': 'available'
             })
         
-        return Response(capabilities) 
\ No newline at end of file
+        return Response(capabilities)
+
+
+class AIMetricsView(APIView):
+    """API view exposing this process's AI load metrics."""
+    
+    def get(self, request):
+        """Get admission, rate limit, circuit, cache, coalescing and structured output metrics."""
+        return Response({
+            'admission': admission_gates.snapshot(),
+            'rate_limits': rate_limiters.snapshot(),
+            'circuits': provider_health.snapshot(),
+            'cache': ai_cache.stats(),
+            'coalescing': single_flight.stats(),
+            'structured_output': structured_stats.snapshot()
+        })
+
+
+# Async endpoints (served natively under ASGI: uvicorn smart_todo.asgi:application)
+
+def json_body(request):
+    """Parse a JSON request body for the async views; returns None if it is invalid."""
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncTaskEnhancementView(View):
+    """Async API view for AI-powered task enhancement."""
+    
+    @admission_controlled
+    async def post(self, request):
+        """Enhance a task with AI suggestions without holding a worker thread."""
+        data = json_body(request)
+        if not data or not data.get('title'):
+            return JsonResponse({'error': 'Title is required'}, status=400)
+        
+        try:
+            ai_service = interactive_service(request, AsyncAIService)
+            enhancement = await ai_service.enhance_task(
+                data['title'],
+                data.get('description', ''),
+                data.get('category', '')
+            )
+            return JsonResponse(enhancement)
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncTaskPrioritizationView(View):
+    """Async API view for AI-powered task prioritization."""
+    
+    @admission_controlled
+    async def post(self, request):
+        """Prioritize a list of tasks using AI without holding a worker thread."""
+        data = json_body(request)
+        task_ids = data.get('task_ids', []) if data else []
+        if not task_ids:
+            return JsonResponse({'error': 'task_ids list is required'}, status=400)
+        
+        try:
+            tasks = [
+                task async for task in Task.objects.select_related('category').filter(id__in=task_ids)
+            ]
+            
+            ai_service = interactive_service(request, AsyncAIService)
+            prioritized_tasks = await ai_service.prioritize_tasks(prioritization_data(tasks))
+            
+            ordered = await sync_to_async(save_prioritized_tasks)(tasks, prioritized_tasks)
+            return JsonResponse({
+                'prioritized_tasks': TaskSerializer(ordered, many=True).data,
+                'reasoning': 'Tasks prioritized using AI analysis'
+            })
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncContextAnalysisView(View):
+    """Async API view for context analysis."""
+    
+    @admission_controlled
+    async def post(self, request):
+        """Analyze context content without holding a worker thread."""
+        data = json_body(request)
+        if not data or not data.get('content'):
+            return JsonResponse({'error': 'Content is required'}, status=400)
+        
+        try:
+            ai_service = interactive_service(request, AsyncAIService)
+            analysis = await ai_service.analyze_context(data['content'], data.get('source_type', 'notes'))
+            return JsonResponse(analysis)
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
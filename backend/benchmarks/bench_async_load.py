@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: the WSGI enhance endpoint under gunicorn sync workers vs the
+async endpoint under a single uvicorn worker, with every request waiting on
+a slow LLM (a local LM Studio stub server).
+
+Requires gunicorn (``pip install gunicorn``) for the WSGI side.
+
+Run from the backend directory:
+    python benchmarks/bench_async_load.py --concurrency 200 --delay 1.0 --wsgi-workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.stub_server import start_stub_server
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(command, port, env):
+    process = subprocess.Popen(
+        command, cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Server did not start: {' '.join(command)}")
+
+
+async def load(url, concurrency, timeout):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        run = os.urandom(4).hex()
+
+        async def one(i):
+            start = time.perf_counter()
+            try:
+                response = await client.post(url, json={
+                    'title': f"Prepare report {run}-{i}",
+                    'description': 'Quarterly numbers',
+                    'category': 'Work'
+                })
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            return ok, time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[one(i) for i in range(concurrency)])
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for ok, latency in results if ok)
+    return elapsed, len(latencies), latencies
+
+
+def report(label, elapsed, succeeded, latencies, concurrency):
+    if latencies:
+        p50 = statistics.median(latencies)
+        p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+    else:
+        p50 = p99 = float('nan')
+    print(f"{label:<28} {succeeded:>4}/{concurrency:<4} ok   {elapsed:7.2f} s total   "
+          f"{succeeded / elapsed:7.1f} req/s   p50 {p50:6.2f} s   p99 {p99:6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=1.0, help='Stub LLM latency in seconds')
+    parser.add_argument('--wsgi-workers', type=int, default=4)
+    parser.add_argument('--timeout', type=float, default=120)
+    args = parser.parse_args()
+
+    stub, stub_url = start_stub_server(delay=args.delay)
+    env = dict(
+        os.environ,
+        LM_STUDIO_BASE_URL=stub_url,
+        OPENAI_API_KEY='',
+        ANTHROPIC_API_KEY='',
+        AI_CACHE_ENABLED='False',
+        DEBUG='False',
+        # No latency budget: no hedging to the rules, every request waits for the LLM
+        AI_ENHANCE_TASK_BUDGET='0',
+    )
+
+    print(f"{args.concurrency} concurrent requests, stub LLM latency {args.delay}s\n")
+
+    port = free_port()
+    server = start_server(
+        [sys.executable, '-m', 'gunicorn', 'smart_todo.wsgi:application',
+         '--workers', str(args.wsgi_workers), '--bind', f'127.0.0.1:{port}', '--timeout', str(int(args.timeout))],
+        port, env
+    )
+    try:
+        elapsed, succeeded, latencies = asyncio.run(
+            load(f'http://127.0.0.1:{port}/api/ai/enhance-task/', args.concurrency, args.timeout)
+        )
+        report(f"WSGI gunicorn x{args.wsgi_workers} sync", elapsed, succeeded, latencies, args.concurrency)
+    finally:
+        server.terminate()
+        server.wait()
+
+    port = free_port()
+    server = start_server(
+        [sys.executable, '-m', 'uvicorn', 'smart_todo.asgi:application',
+         '--workers', '1', '--port', str(port), '--log-level', 'warning'],
+        port, env
+    )
+    try:
+        elapsed, succeeded, latencies = asyncio.run(
+            load(f'http://127.0.0.1:{port}/api/ai/async/enhance-task/', args.concurrency, args.timeout)
+        )
+        report("ASGI uvicorn x1 async", elapsed, succeeded, latencies, args.concurrency)
+    finally:
+        server.terminate()
+        server.wait()
+
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: entries per minute for per-entry context analysis vs packed
+multi-entry prompts, against a local LM Studio stub server.
+
+The stub charges a fixed per-request overhead (queueing, prompt processing,
+network) plus generation time per analyzed entry, so batching only saves the
+per-request part.
+
+Run from the backend directory:
+    python benchmarks/bench_batch_analysis.py --entries 40 --overhead 0.4 --per-entry 0.1
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from ai_integration.services import AIService
+from benchmarks.stub_server import start_stub_server
+
+ENTRY_RE = re.compile(r'=== ENTRY (\d+) ')
+
+SAMPLE = (
+    "Hi team, the deadline for the Q3 budget review moved to next week. We need to update "
+    "the forecast and schedule a call with finance. Don't forget to send the slides to the client."
+)
+
+
+def analysis(entry_id=None):
+    result = {
+        'insights': {'summary': 'Budget review follow-ups', 'task_count': 2, 'urgency_level': 'high'},
+        'extracted_tasks': [
+            {'title': 'Update the forecast', 'description': '', 'priority': 8, 'category': 'Work', 'deadline': None},
+            {'title': 'Schedule a call with finance', 'description': '', 'priority': 6, 'category': 'Work', 'deadline': None},
+        ],
+        'sentiment_score': 0.0,
+        'keywords': ['budget', 'forecast', 'finance'],
+    }
+    if entry_id is not None:
+        result['id'] = entry_id
+    return result
+
+
+def make_reply(per_entry):
+    def reply(body):
+        prompt = body['messages'][-1]['content']
+        ids = [int(entry_id) for entry_id in ENTRY_RE.findall(prompt)]
+        time.sleep(per_entry * max(len(ids), 1))
+        if ids:
+            return json.dumps({'results': [analysis(entry_id) for entry_id in ids]})
+        return json.dumps(analysis())
+    return reply
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entries', type=int, default=40)
+    parser.add_argument('--overhead', type=float, default=0.4, help='Seconds of fixed cost per request')
+    parser.add_argument('--per-entry', type=float, default=0.1, help='Seconds of generation per entry')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(delay=args.overhead, reply=make_reply(args.per_entry))
+    settings.LM_STUDIO_BASE_URL = base_url
+    service = AIService(use_cache=False)
+    service.anthropic_key = service.openai_key = ''
+
+    entries = [
+        {'id': i, 'content': f"{SAMPLE} (note {i})", 'source_type': 'email'}
+        for i in range(1, args.entries + 1)
+    ]
+    print(f"{args.entries} entries, batches of up to {settings.AI_BATCH_MAX_ENTRIES} "
+          f"within {settings.AI_BATCH_TOKEN_BUDGET} tokens\n")
+
+    start = time.perf_counter()
+    for entry in entries:
+        service.analyze_context(entry['content'], entry['source_type'])
+    single = time.perf_counter() - start
+    print(f"per-entry calls   {single:7.2f} s   {args.entries / single * 60:8.1f} entries/min")
+
+    start = time.perf_counter()
+    results = service.analyze_contexts(entries)
+    packed = time.perf_counter() - start
+    print(f"packed prompts    {packed:7.2f} s   {args.entries / packed * 60:8.1f} entries/min")
+
+    assert len(results) == args.entries
+    print(f"\nSpeedup: {single / packed:.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: enhancing an import of N tasks with one /api/ai/enhance-task/
+request per task versus one /api/ai/enhance-task/batch/ request, returned as
+JSON or streamed as NDJSON (time to the first result line).
+
+A few items in the batch are invalid to show per-item errors. The stub
+provider has a fixed latency per call.
+
+Run from the backend directory:
+    python benchmarks/bench_batch_enhance_endpoint.py --tasks 200 --delay 0.2
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.test import Client
+from benchmarks.stub_server import start_stub_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--delay', type=float, default=0.2, help='Stub provider latency in seconds')
+    args = parser.parse_args()
+
+    settings.ALLOWED_HOSTS = ['*']
+    settings.AI_COALESCE_ENABLED = False
+    # A local server that takes as many parallel requests as one batch keeps in flight
+    settings.AI_RATE_LIMITS = {'lm_studio': {'max_concurrency': settings.AI_FANOUT_PER_REQUEST}}
+    server, base_url = start_stub_server(delay=args.delay)
+    settings.LM_STUDIO_BASE_URL = base_url
+    client = Client()
+
+    tasks = [{'title': f"Imported task #{i}", 'description': 'From the old tracker'} for i in range(args.tasks)]
+    tasks[3] = {'description': 'no title'}
+    tasks[7] = 'not an object'
+
+    print(f"{args.tasks} tasks, provider latency {args.delay}s, "
+          f"{settings.AI_FANOUT_PER_REQUEST} in flight per batch request\n")
+    print(f"{'mode':<26} {'first result (s)':>17} {'total (s)':>10} {'ok':>5} {'errors':>7}")
+
+    start = time.perf_counter()
+    first = None
+    ok = errors = 0
+    for task in tasks:
+        response = client.post('/api/ai/enhance-task/?cache=false', task if isinstance(task, dict) else {},
+                               content_type='application/json')
+        first = first or time.perf_counter() - start
+        ok, errors = (ok + 1, errors) if response.status_code == 200 else (ok, errors + 1)
+    print(f"{'one request per task':<26} {first:>17.2f} {time.perf_counter() - start:>10.2f} {ok:>5} {errors:>7}")
+
+    start = time.perf_counter()
+    body = client.post('/api/ai/enhance-task/batch/?cache=false', {'tasks': tasks},
+                       content_type='application/json').json()
+    elapsed = time.perf_counter() - start
+    in_order = [result['index'] for result in body['results']] == list(range(args.tasks))
+    print(f"{'batch, JSON':<26} {elapsed:>17.2f} {elapsed:>10.2f} {body['succeeded']:>5} {body['failed']:>7}")
+
+    start = time.perf_counter()
+    response = client.post('/api/ai/enhance-task/batch/?cache=false&stream=ndjson', {'tasks': tasks},
+                           content_type='application/json')
+    first = None
+    lines = []
+    for chunk in response.streaming_content:
+        first = first or time.perf_counter() - start
+        lines.extend(json.loads(line) for line in chunk.decode().splitlines() if line)
+    failed = sum(1 for line in lines if line['status'] == 'error')
+    print(f"{'batch, NDJSON stream':<26} {first:>17.2f} {time.perf_counter() - start:>10.2f} "
+          f"{len(lines) - failed:>5} {failed:>7}")
+    server.shutdown()
+
+    print(f"\nJSON results in input order: {in_order}; item 3 error: {body['results'][3]['error']!r}")
+
+
+if __name__ == "__main__":
+    main()
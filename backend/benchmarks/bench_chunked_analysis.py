@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency of analyzing a long context entry with one prompt vs
+map-reduce chunking, against a local LM Studio stub server.
+
+The stub's response time grows with the length of the content it is given
+(prompt processing plus generation), so a single prompt pays for the whole
+entry while concurrent chunks only pay for the longest chunk.
+
+Run from the backend directory:
+    python benchmarks/bench_chunked_analysis.py --paragraphs 40 --seconds-per-1k-chars 0.5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from ai_integration.services import AIService
+from benchmarks.bench_batch_analysis import SAMPLE, analysis
+from benchmarks.stub_server import start_stub_server
+
+
+def make_reply(seconds_per_1k_chars):
+    def reply(body):
+        prompt = body['messages'][-1]['content']
+        time.sleep(len(prompt) / 1000 * seconds_per_1k_chars)
+        return json.dumps(analysis())
+    return reply
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--paragraphs', type=int, default=40)
+    parser.add_argument('--seconds-per-1k-chars', type=float, default=0.5)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(reply=make_reply(args.seconds_per_1k_chars))
+    settings.LM_STUDIO_BASE_URL = base_url
+    # The stub has no concurrency ceiling; don't throttle chunks to LM Studio's default limit
+    settings.AI_RATE_LIMITS = {'lm_studio': {'max_concurrency': settings.AI_CHUNK_MAX_WORKERS}}
+    service = AIService(use_cache=False)
+    service.anthropic_key = service.openai_key = ''
+
+    content = "\n\n".join(f"{SAMPLE} (message {i})" for i in range(args.paragraphs))
+    print(f"{len(content)} chars, chunk budget {settings.AI_CHUNK_TOKEN_BUDGET} tokens, "
+          f"{settings.AI_CHUNK_MAX_WORKERS} workers\n")
+
+    start = time.perf_counter()
+    service._analyze_content(content, 'email')
+    single = time.perf_counter() - start
+    print(f"single prompt     {single:7.2f} s")
+
+    start = time.perf_counter()
+    result = service.analyze_context(content, 'email')
+    chunked = time.perf_counter() - start
+    print(f"chunked ({result['insights']['chunks']:>2})      {chunked:7.2f} s")
+
+    print(f"\nSpeedup: {single / chunked:.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: provider calls made by concurrent identical enhance_task requests,
+with and without single-flight coalescing, against a local LM Studio stub.
+
+Callers run as threads in one process and as separate processes; the stub
+counts the completion requests it receives.
+
+Run from the backend directory:
+    python benchmarks/bench_coalescing.py --callers 20 --delay 0.5
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from ai_integration.services import AIService
+from benchmarks.stub_server import DEFAULT_REPLY, start_stub_server
+
+TITLE = "Prepare the weekly report"
+
+
+def enhance(barrier=None):
+    service = AIService(use_cache=False)
+    service.anthropic_key = service.openai_key = ''
+    if barrier is not None:
+        barrier.wait()
+    service.enhance_task(TITLE, "Collect numbers  from every team", "Work")
+
+
+def run_threads(callers):
+    barrier = threading.Barrier(callers)
+    threads = [threading.Thread(target=enhance, args=(barrier,)) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_processes(callers):
+    barrier = multiprocessing.Barrier(callers)
+    processes = [multiprocessing.Process(target=enhance, args=(barrier,)) for _ in range(callers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--callers', type=int, default=20)
+    parser.add_argument('--delay', type=float, default=0.5)
+    args = parser.parse_args()
+
+    requests_seen = multiprocessing.Value('i', 0)
+
+    def reply(body):
+        with requests_seen.get_lock():
+            requests_seen.value += 1
+        return DEFAULT_REPLY
+
+    server, base_url = start_stub_server(delay=args.delay, reply=reply)
+    settings.LM_STUDIO_BASE_URL = base_url
+
+    print(f"{args.callers} concurrent identical enhance_task calls, {args.delay}s provider latency\n")
+    print(f"{'mode':<10} {'coalescing':<11} {'provider calls':>14} {'time (s)':>9}")
+    for mode, runner in (('threads', run_threads), ('processes', run_processes)):
+        for enabled in (False, True):
+            settings.AI_COALESCE_ENABLED = enabled
+            requests_seen.value = 0
+            start = time.perf_counter()
+            runner(args.callers)
+            elapsed = time.perf_counter() - start
+            print(f"{mode:<10} {'on' if enabled else 'off':<11} {requests_seen.value:>14} {elapsed:>9.2f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
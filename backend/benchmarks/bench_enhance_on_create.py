@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: creating tasks with background enhancement ("enhance": true)
+versus creating them and then calling /api/ai/enhance-task/ for each, and
+batched versus one-task-per-call background enhancement.
+
+Uses a throwaway SQLite database and a stub provider whose latency is a fixed
+per-request overhead plus a per-task generation cost.
+
+Run from the backend directory:
+    python benchmarks/bench_enhance_on_create.py --tasks 24 --overhead 0.4 --per-task 0.1
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client
+from benchmarks.stub_server import DEFAULT_REPLY, start_stub_server
+from tasks.models import Task
+
+TASK_RE = re.compile(r"=== TASK (\d+) ===")
+
+
+def make_reply(overhead, per_task, calls):
+    lock = threading.Lock()
+
+    def reply(body):
+        ids = [int(task_id) for task_id in TASK_RE.findall(body['messages'][-1]['content'])]
+        with lock:
+            calls.append(len(ids) or 1)
+        time.sleep(overhead + per_task * max(len(ids), 1))
+        if ids:
+            return json.dumps({'results': [dict(json.loads(DEFAULT_REPLY), id=task_id) for task_id in ids]})
+        return DEFAULT_REPLY
+    return reply
+
+
+def create(client, i, enhance):
+    start = time.perf_counter()
+    response = client.post('/api/tasks/', {'title': f"Prepare report #{i}", 'description': 'Quarterly numbers',
+                                           'enhance': enhance}, content_type='application/json')
+    return time.perf_counter() - start, response.json()
+
+
+def wait_all_enhanced(count, timeout):
+    start = time.perf_counter()
+    while Task.objects.filter(ai_status='enhanced').count() < count:
+        if time.perf_counter() - start > timeout:
+            raise TimeoutError("background enhancements did not finish")
+        time.sleep(0.02)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=24)
+    parser.add_argument('--overhead', type=float, default=0.4, help='Seconds of fixed cost per provider request')
+    parser.add_argument('--per-task', type=float, default=0.1, help='Seconds of generation per task')
+    args = parser.parse_args()
+
+    settings.DATABASES['default']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    settings.ALLOWED_HOSTS = ['*']
+    settings.AI_CACHE_ENABLED = False
+    settings.AI_COALESCE_ENABLED = False
+    call_command('migrate', verbosity=0)
+    calls = []
+    server, base_url = start_stub_server(reply=make_reply(args.overhead, args.per_task, calls))
+    settings.LM_STUDIO_BASE_URL = base_url
+    client = Client()
+
+    print(f"{args.tasks} tasks created back to back; provider {args.overhead}s/request + {args.per_task}s/task\n")
+    print(f"{'mode':<34} {'create p50 (ms)':>16} {'all enhanced (s)':>17} {'provider calls':>15}")
+
+    start = time.perf_counter()
+    latencies = []
+    for i in range(args.tasks):
+        created, task = create(client, i, False)
+        enhance_start = time.perf_counter()
+        client.post('/api/ai/enhance-task/', {'title': task['title'], 'description': task['description']},
+                    content_type='application/json')
+        latencies.append(created + time.perf_counter() - enhance_start)
+    print(f"{'create + blocking enhance call':<34} {statistics.median(latencies) * 1000:>16.1f} "
+          f"{time.perf_counter() - start:>17.2f} {len(calls):>15}")
+
+    for label, max_tasks in (('background, one task per call', 1), ('background, batched', 8)):
+        Task.objects.all().delete()
+        calls.clear()
+        settings.AI_ENHANCE_BATCH_MAX_TASKS = max_tasks
+        start = time.perf_counter()
+        latencies = [create(client, i, True)[0] for i in range(args.tasks)]
+        wait_all_enhanced(args.tasks, timeout=120)
+        print(f"{label:<34} {statistics.median(latencies) * 1000:>16.1f} "
+              f"{time.perf_counter() - start:>17.2f} {len(calls):>15}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
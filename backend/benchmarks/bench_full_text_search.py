@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: task search with the previous icontains filter (title,
+description and category name, joined) versus the full-text index, for the
+?search= list page (first page + count) and the ranked /search/ endpoint.
+
+Also checks that the index finds exactly the tasks with a word starting
+with the term, and that it follows inserts, edits and deletes.
+
+Uses a throwaway SQLite database.
+
+Run from the backend directory:
+    python benchmarks/bench_full_text_search.py --tasks 500000
+"""
+
+import argparse
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import Q
+from tasks.models import Category, Task
+from tasks.search import task_index
+
+COMMON = ['report', 'meeting', 'review', 'call', 'email', 'update', 'plan', 'budget', 'team', 'client']
+RARE = ['quarterly', 'plumber', 'invoice', 'dentist', 'passport']
+
+
+def text(rng, vocabulary, words):
+    return ' '.join(rng.choice(vocabulary) for _ in range(words))
+
+
+def page(queryset):
+    return queryset.count(), list(queryset.order_by('-priority_score', '-created_at', '-id')[:21])
+
+
+def legacy_filter(queryset, search):
+    return queryset.filter(
+        Q(title__icontains=search) | Q(description__icontains=search) | Q(category__name__icontains=search)
+    )
+
+
+def measure(call, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = call()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=500000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    settings.DATABASES['default']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    call_command('migrate', verbosity=0)
+    rng = random.Random(1)
+    filler = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 9))) for _ in range(5000)]
+    # Common words in ~1 of 10 texts, rare ones in ~1 of 1000
+    vocabulary = filler * 2 + COMMON * 100 + RARE
+    categories = [Category.objects.create(name=name) for name in ('Work', 'Personal', 'Health', 'Finance')]
+    start = time.perf_counter()
+    Task.objects.bulk_create((
+        Task(title=text(rng, vocabulary, rng.randint(3, 7)), description=text(rng, vocabulary, rng.randint(10, 30)),
+             category=rng.choice(categories + [None]), priority_score=rng.randint(1, 10))
+        for _ in range(args.tasks)
+    ), batch_size=5000)
+    print(f"{args.tasks} tasks inserted (index maintained by triggers) in {time.perf_counter() - start:.1f}s\n")
+
+    base = Task.objects.select_related('category')
+    print(f"{'query':<18} {'matches':>8} {'icontains page (ms)':>20} {'index page (ms)':>16} {'ranked top 20 (ms)':>19}")
+    for query in ('quarterly', 'report', 'plumb', 'budget review', 'finance'):
+        legacy_ms, (legacy_count, _) = measure(lambda: page(legacy_filter(base, query)), args.repeat)
+        index_ms, (count, _) = measure(lambda: page(task_index.filter(base, query)), args.repeat)
+        ranked_ms, _ = measure(lambda: task_index.search(base, query, 20), args.repeat)
+        print(f"{query:<18} {count:>8} {legacy_ms:>20.1f} {index_ms:>16.1f} {ranked_ms:>19.1f}")
+
+    # Word-prefix semantics: the index finds exactly the tasks with a word starting with the term
+    word = re.compile(r'\bplumb', re.IGNORECASE)
+    expected = {pk for pk, title, description in Task.objects.values_list('id', 'title', 'description')
+                if word.search(title) or word.search(description)}
+    found = set(task_index.filter(Task.objects.all(), 'plumb').values_list('id', flat=True))
+    print(f"\n'plumb' matches the tasks with a word starting with it: {found == expected} ({len(found)} tasks)")
+
+    task = Task.objects.create(title='Renew passport photos')
+    added = task.id in task_index.filter(Task.objects.all(), 'photos').values_list('id', flat=True)
+    task.title = 'Renew driving licence'
+    task.save()
+    edited = not task_index.filter(Task.objects.all(), 'photos').exists()
+    task.delete()
+    deleted = not task_index.filter(Task.objects.all(), 'licence').exists()
+    print(f"Index follows insert: {added}, edit: {edited}, delete: {deleted}")
+    top = task_index.search(base, 'quarterly report', 1)
+    if top:
+        print(f"Best match for 'quarterly report': {top[0][2]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/tasks/ page latency at increasing depth with page-number
+pagination (COUNT(*) + OFFSET) versus keyset pagination, with and without
+the total count. Afterwards a list with many equal sort keys is walked
+forwards and backwards through the next/previous links to check that no row
+is skipped or repeated.
+
+Uses a throwaway SQLite database.
+
+Run from the backend directory:
+    python benchmarks/bench_list_pagination.py --tasks 200000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client
+from django.utils import timezone
+from rest_framework.pagination import PageNumberPagination
+from context_entries.models import ContextEntry
+from smart_todo.pagination import KeysetPagination
+from tasks.models import Task
+from tasks.views import TaskViewSet
+
+
+def timed(client, url, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        times.append(time.perf_counter() - start)
+    assert response.status_code == 200, response.content
+    return statistics.median(times) * 1000, response.json()
+
+
+def cursor_at(offset):
+    """Keyset cursor that starts a page at ``offset`` (what following next links would give)."""
+    row = Task.objects.order_by(*KeysetPagination.get_ordering(Task))[offset - 1]
+    return KeysetPagination().cursor_after(row)
+
+
+def walk(client, url, link):
+    ids = []
+    while url:
+        body = client.get(url).json()
+        page = [entry['id'] for entry in body['results']]
+        ids.extend(page if link == 'next' else reversed(page))
+        url = body[link]
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    settings.DATABASES['default']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    settings.ALLOWED_HOSTS = ['*']
+    call_command('migrate', verbosity=0)
+    rng = random.Random(1)
+    now = timezone.now()
+    Task.objects.bulk_create((
+        Task(title=f"Task {i}", priority_score=rng.randint(1, 10))
+        for i in range(args.tasks)
+    ), batch_size=5000)
+    client = Client()
+    page_size = KeysetPagination.page_size
+
+    print(f"{args.tasks} tasks, {page_size} per page\n")
+    print(f"{'depth (rows)':>12} {'page number (ms)':>17} {'keyset (ms)':>12} {'keyset, count=false (ms)':>25}")
+    for depth in (0, args.tasks // 10, args.tasks // 2, args.tasks - page_size):
+        TaskViewSet.pagination_class = PageNumberPagination
+        offset_ms, offset_body = timed(client, f'/api/tasks/?page={depth // page_size + 1}', args.repeat)
+        TaskViewSet.pagination_class = KeysetPagination
+        query = f'cursor={cursor_at(depth)}&' if depth else ''
+        keyset_ms, keyset_body = timed(client, f'/api/tasks/?{query}', args.repeat)
+        no_count_ms, _ = timed(client, f'/api/tasks/?{query}count=false', args.repeat)
+        assert [t['id'] for t in offset_body['results']] == [t['id'] for t in keyset_body['results']]
+        print(f"{depth:>12} {offset_ms:>17.1f} {keyset_ms:>12.1f} {no_count_ms:>25.1f}")
+
+    # Many entries share a timestamp, so only the id tie-break keeps pages apart
+    stamps = [now - timedelta(minutes=rng.randint(0, 20)) for _ in range(1000)]
+    ContextEntry.objects.bulk_create(ContextEntry(content=f"Note {i}", source_type='notes') for i in range(1000))
+    for entry, stamp in zip(ContextEntry.objects.all(), stamps):
+        ContextEntry.objects.filter(id=entry.id).update(timestamp=stamp)
+    expected = list(ContextEntry.objects.order_by('-timestamp', '-id').values_list('id', flat=True))
+    forward = walk(client, '/api/context/?count=false', 'next')
+    last_page = client.get('/api/context/?count=false').json()
+    while last_page['next']:
+        last_page = client.get(last_page['next']).json()
+    backward = walk(client, last_page['previous'], 'previous')
+    backward = list(reversed(backward)) + [entry['id'] for entry in last_page['results']]
+    print(f"\n1000 context entries over 21 distinct minutes: forward walk matches ORDER BY: {forward == expected}; "
+          f"backward walk matches: {backward == expected}")
+
+
+if __name__ == "__main__":
+    main()
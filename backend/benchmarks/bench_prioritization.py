@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: chunked, anchor-calibrated prioritization of large task lists
+against a local LM Studio stub server.
+
+Each task carries a hidden true importance. The stub scores a prompt's tasks
+with that importance plus a random per-request bias (models grade on a curve
+within each prompt), answers at most ``--max-scores`` tasks (a truncated
+``max_tokens`` answer) and takes longer the more tasks it has to score.
+
+Reported per list size: the number of rounds of the chunk pool, wall-clock
+time, and the Spearman rank correlation between the final scores and the
+true importance with and without anchors. Time follows the rounds: flat up
+to one round, then linear.
+
+Run from the backend directory:
+    python benchmarks/bench_prioritization.py --sizes 25 100 400 1600
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from ai_integration.services import AIService
+from benchmarks.stub_server import start_stub_server
+
+IMPORTANCE_RE = re.compile(r'^\s*\d+\. .*importance (\d+)', re.MULTILINE)
+
+
+def make_reply(max_scores, seconds_per_task, seed):
+    rng = random.Random(seed)
+
+    def reply(body):
+        prompt = body['messages'][-1]['content']
+        importance = [int(value) for value in IMPORTANCE_RE.findall(prompt)]
+        time.sleep(seconds_per_task * min(len(importance), max_scores))
+        bias = rng.uniform(-2.5, 2.5)
+        scores = [min(max(round(value + bias), 1), 10) for value in importance]
+        return json.dumps({'priority_scores': scores[:max_scores]})
+    return reply
+
+
+def spearman(xs, ys):
+    def ranks(values):
+        order = sorted(range(len(values)), key=lambda i: values[i])
+        result = [0.0] * len(values)
+        i = 0
+        while i < len(order):
+            j = i
+            while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+                j += 1
+            for k in range(i, j + 1):
+                result[order[k]] = (i + j) / 2
+            i = j + 1
+        return result
+
+    rx, ry = ranks(xs), ranks(ys)
+    mean_x, mean_y = sum(rx) / len(rx), sum(ry) / len(ry)
+    covariance = sum((a - mean_x) * (b - mean_y) for a, b in zip(rx, ry))
+    variance = (sum((a - mean_x) ** 2 for a in rx) * sum((b - mean_y) ** 2 for b in ry)) ** 0.5
+    return covariance / variance if variance else 0.0
+
+
+def run(service, size, seed):
+    rng = random.Random(seed)
+    tasks = [
+        {'id': i, 'title': f"Task {i} importance {rng.randint(1, 10)}", 'description': ''}
+        for i in range(size)
+    ]
+    truth = {task['id']: int(task['title'].rsplit(' ', 1)[1]) for task in tasks}
+
+    start = time.perf_counter()
+    ranked = service.prioritize_tasks(tasks)
+    elapsed = time.perf_counter() - start
+
+    correlation = spearman([truth[task['id']] for task in ranked], [task['priority_score'] for task in ranked])
+    return elapsed, correlation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[25, 100, 400, 1600])
+    parser.add_argument('--max-scores', type=int, default=40)
+    parser.add_argument('--seconds-per-task', type=float, default=0.02)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(reply=make_reply(args.max_scores, args.seconds_per_task, seed=1))
+    settings.LM_STUDIO_BASE_URL = base_url
+    # The stub has no concurrency ceiling; don't throttle chunks to LM Studio's default limit
+    settings.AI_RATE_LIMITS = {'lm_studio': {'max_concurrency': settings.AI_CHUNK_MAX_WORKERS}}
+    service = AIService(use_cache=False)
+    service.anthropic_key = service.openai_key = ''
+
+    print(f"chunks of {settings.AI_PRIORITIZE_CHUNK_SIZE} + {settings.AI_PRIORITIZE_ANCHORS} anchors, "
+          f"{settings.AI_CHUNK_MAX_WORKERS} workers\n")
+    print(f"{'tasks':>6}  {'rounds':>7}  {'time (s)':>9}  {'rho anchored':>13}  {'rho no anchors':>15}")
+
+    anchors = settings.AI_PRIORITIZE_ANCHORS
+    for size in args.sizes:
+        elapsed, anchored = run(service, size, seed=size)
+        settings.AI_PRIORITIZE_ANCHORS = 0
+        _, unanchored = run(service, size, seed=size)
+        settings.AI_PRIORITIZE_ANCHORS = anchors
+        chunk_size = settings.AI_PRIORITIZE_CHUNK_SIZE
+        chunks = -(-(size - anchors) // chunk_size) if size > chunk_size else 1
+        rounds = -(-chunks // settings.AI_CHUNK_MAX_WORKERS)
+        print(f"{size:>6}  {rounds:>7}  {elapsed:>9.2f}  {anchored:>13.3f}  {unanchored:>15.3f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
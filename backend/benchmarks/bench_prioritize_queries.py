@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: database queries and time of one /api/ai/prioritize-tasks/
+request (sync and async views) as the number of task ids grows.
+
+The stub provider scores every task at once and without latency, so the
+time is the view's own database and serialization work.
+
+Doubles as the query-count check (the repo has no test suite): exits with
+an error if, for either view, the largest size runs more queries than the
+smallest one plus the extra UPDATE statements Django's bulk_update needs
+to batch that many rows on this database, if the response is not in
+Task.Meta.ordering order, or if the new scores are not stored.
+
+Uses a throwaway SQLite database.
+
+Run from the backend directory:
+    python benchmarks/bench_prioritize_queries.py --sizes 10 100 1000
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from benchmarks.stub_server import start_stub_server
+from tasks.models import Category, Task
+
+# Fields save_prioritized_tasks bulk-updates
+UPDATED_FIELDS = ['priority_score', 'ai_insights', 'updated_at']
+URLS = ('/api/ai/prioritize-tasks/?cache=false', '/api/ai/async/prioritize-tasks/?cache=false')
+
+
+def reply(body):
+    # One score per numbered task line of the prompt
+    tasks = re.findall(r'^\s*\d+\. ', body['messages'][-1]['content'], re.MULTILINE)
+    return json.dumps({'priority_scores': [(i * 7) % 10 + 1 for i in range(len(tasks))]})
+
+
+def request(client, url, task_ids):
+    # CaptureQueriesContext counts within a bounded log; start from an empty one
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = client.post(url, {'task_ids': task_ids}, content_type='application/json')
+        elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.content
+    return elapsed * 1000, len(queries), response.json()['prioritized_tasks']
+
+
+def update_batches(tasks):
+    """UPDATE statements bulk_update needs for these tasks (SQLite caps the query parameters)."""
+    batch_size = connection.ops.bulk_batch_size(['pk', 'pk'] + UPDATED_FIELDS, tasks) or len(tasks)
+    return -(-len(tasks) // batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    settings.DATABASES['default']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    call_command('migrate', verbosity=0)
+    server, base_url = start_stub_server(reply=reply)
+    settings.LM_STUDIO_BASE_URL = base_url
+    settings.AI_COALESCE_ENABLED = False
+    # Score each request's tasks in one prompt
+    settings.AI_PRIORITIZE_CHUNK_SIZE = max(args.sizes)
+    client = Client()
+
+    categories = [Category.objects.create(name=name) for name in ('Work', 'Personal', 'Health')]
+    tasks = Task.objects.bulk_create(
+        Task(title=f"Task {i}", description='Imported', category=categories[i % 4] if i % 4 < 3 else None)
+        for i in range(max(args.sizes))
+    )
+
+    smallest, largest = min(args.sizes), max(args.sizes)
+    allowance = update_batches(tasks[:largest]) - update_batches(tasks[:smallest])
+    failures = []
+    print(f"{'view':<6} {'tasks':>6} {'queries':>8} {'time (ms)':>10}")
+    for url in URLS:
+        view = 'async' if '/async/' in url else 'sync'
+        most = {}
+        for size in args.sizes:
+            task_ids = [task.id for task in tasks[:size]]
+            runs = [request(client, url, task_ids) for _ in range(args.repeat)]
+            elapsed = statistics.median(run[0] for run in runs)
+            counts = sorted({run[1] for run in runs})
+            most[size] = counts[-1]
+            print(f"{view:<6} {size:>6} {'/'.join(map(str, counts)):>8} {elapsed:>10.1f}")
+
+        results = runs[-1][2]
+        ordered = [(task['priority_score'], task['created_at']) for task in results]
+        stored = dict(Task.objects.filter(id__in=task_ids).values_list('id', 'priority_score'))
+        in_order = ordered == sorted(ordered, reverse=True)
+        saved = all(stored[task['id']] == task['priority_score'] for task in results)
+        print(f"  response ordered: {in_order}, scores stored: {saved}")
+        if most[largest] > most[smallest] + allowance:
+            failures.append(f"{view}: {most[largest]} queries for {largest} tasks, "
+                            f"more than {most[smallest]} for {smallest} plus {allowance} update batches")
+        if not in_order or not saved:
+            failures.append(f"{view}: response out of order or scores not stored")
+    server.shutdown()
+
+    if failures:
+        print("\nFAILED\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print(f"\nQuery count is constant (allowing {allowance} extra bulk_update batches for {largest} tasks)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time-to-first-token of streamed enhance_task and analyze_context
+calls with the previous prompt layout (variable content in the middle of
+one user message) and the current one (static system prefix + variable
+suffix), against a stub that models llama.cpp prefill with KV-cache reuse.
+
+Run from the backend directory:
+    python benchmarks/bench_prompt_prefix.py --calls 20 --prefill-per-token 0.004
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from ai_integration.prompts import SYSTEM_PROMPTS
+from ai_integration.services import AIService
+from benchmarks.bench_batch_analysis import SAMPLE
+from benchmarks.stub_server import start_stub_server
+
+
+def legacy_enhancement_prompt(title, description, category):
+    return f"""
+        Enhance this task with AI-powered suggestions:
+
+        Title: {title}
+        Description: {description}
+        Category: {category or 'Unknown'}
+
+        Please provide a JSON response with:
+        1. priority: integer 1-10 (based on urgency and importance)
+        2. suggested_deadline: ISO date string (realistic estimate)
+        3. enhanced_description: improved, more detailed description
+        4. suggested_categories: list of relevant categories
+        5. insights: explanation of priority and recommendations
+
+        Be practical and helpful in your suggestions.
+        """
+
+
+def legacy_analysis_prompt(content, source_type):
+    return f"""
+        Analyze the following {source_type} content and extract actionable insights:
+
+        Content: "{content}"
+
+        Please provide a JSON response with:
+        1. insights: {{summary, task_count, urgency_level}}
+        2. extracted_tasks: [{{title, description, priority (1-10), category, deadline}}]
+        3. sentiment_score: float between -1 and 1
+        4. keywords: list of relevant keywords
+
+        Focus on identifying tasks, deadlines, and priorities. Be practical and actionable.
+        """
+
+
+def calls(service, count, layout):
+    """(system, prompt) pairs alternating enhance_task and analyze_context."""
+    for i in range(count):
+        title, description = f"Prepare report #{i}", f"Numbers for region {i}"
+        content = f"{SAMPLE} (message {i})"
+        if layout == 'legacy':
+            yield '', legacy_enhancement_prompt(title, description, 'Work')
+            yield '', legacy_analysis_prompt(content, 'email')
+        else:
+            yield SYSTEM_PROMPTS['enhance_task'], service._build_task_enhancement_prompt(title, description, 'Work')
+            yield SYSTEM_PROMPTS['analyze_context'], service._build_context_analysis_prompt(content, 'email')
+
+
+def time_to_first_token(service, system, prompt):
+    start = time.perf_counter()
+    stream = service._lm_studio_stream(
+        prompt, system=system, model='local-model', temperature=0.7, max_tokens=500, timeout=30
+    )
+    next(stream)
+    elapsed = time.perf_counter() - start
+    stream.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20, help='Calls per operation')
+    parser.add_argument('--prefill-per-token', type=float, default=0.004,
+                        help='Stub prompt processing cost in seconds per uncached token')
+    args = parser.parse_args()
+
+    print(f"{args.calls} enhance_task + {args.calls} analyze_context streams, "
+          f"prefill {args.prefill_per_token * 1000:.1f} ms/token\n")
+    print(f"{'layout':<16} {'TTFT p50 (ms)':>14} {'TTFT mean (ms)':>15}")
+    for layout in ('legacy', 'system prefix'):
+        # Fresh server per layout so neither starts with a warm KV cache
+        server, base_url = start_stub_server(prefill_per_token=args.prefill_per_token)
+        settings.LM_STUDIO_BASE_URL = base_url
+        service = AIService(use_cache=False)
+        latencies = [
+            time_to_first_token(service, system, prompt)
+            for system, prompt in calls(service, args.calls, layout)
+        ]
+        print(f"{layout:<16} {statistics.median(latencies) * 1000:>14.1f} {statistics.mean(latencies) * 1000:>15.1f}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
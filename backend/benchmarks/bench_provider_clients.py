@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call latency of bare ``requests.post`` vs the pooled provider
+client registry, against a local LM Studio stub server.
+
+Run from the backend directory:
+    python benchmarks/bench_provider_clients.py --calls 500
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+import requests
+from django.conf import settings
+from ai_integration.clients import provider_clients
+from ai_integration.services import AIService
+from benchmarks.stub_server import start_stub_server
+
+
+def time_calls(label, call, calls):
+    """Time ``calls`` sequential invocations and print latency stats."""
+    call()  # warm-up
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    p50 = statistics.median(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{label:<32} mean {statistics.mean(samples):7.3f} ms   p50 {p50:7.3f} ms   p99 {p99:7.3f} ms")
+    return statistics.mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=300)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server()
+    settings.LM_STUDIO_BASE_URL = base_url
+    url = f"{base_url}/v1/chat/completions"
+    payload = {
+        "model": "local-model",
+        "messages": [{"role": "user", "content": "Enhance: finish report"}],
+        "temperature": 0.7,
+        "max_tokens": 500
+    }
+
+    print(f"Stub server at {base_url}, {args.calls} sequential calls each\n")
+
+    bare = time_calls(
+        "bare requests.post",
+        lambda: requests.post(url, json=payload, timeout=20),
+        args.calls
+    )
+    pooled = time_calls(
+        "pooled session",
+        lambda: provider_clients.lm_studio_session().post(url, json=payload, timeout=20),
+        args.calls
+    )
+    time_calls(
+        "AIService() per call (pooled)",
+        lambda: AIService()._lm_studio_completion("Enhance: finish report", "local-model", 0.7, 500, 20),
+        args.calls
+    )
+
+    print(f"\nSaved per call: {bare - pooled:.3f} ms ({(1 - pooled / bare) * 100:.1f}%)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: response time of POST /api/ai/enhance-task/ waiting for the LLM
+versus the provisional (stale-while-revalidate) mode, and how long until the
+LLM result is stored on the task and visible to polling clients.
+
+Uses a throwaway SQLite database and a stub provider with a fixed latency.
+
+Run from the backend directory:
+    python benchmarks/bench_provisional_enhancement.py --requests 10 --delay 1.5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client
+from benchmarks.stub_server import start_stub_server
+from tasks.models import Task
+
+
+def timed_post(client, data):
+    start = time.perf_counter()
+    response = client.post('/api/ai/enhance-task/?cache=false', data, content_type='application/json')
+    return time.perf_counter() - start, response
+
+
+def wait_enhanced(client, task_id, revision, timeout):
+    """Poll the task's enhancement state until the revision is enhanced; returns seconds waited."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        state = client.get(f'/api/ai/enhance-task/{task_id}/').json()
+        if state['revision'] == revision and state['status'] == 'enhanced':
+            return time.perf_counter() - start
+        time.sleep(0.02)
+    raise TimeoutError(f"task {task_id} was not enhanced within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=10)
+    parser.add_argument('--delay', type=float, default=1.5, help='Stub provider latency in seconds')
+    args = parser.parse_args()
+
+    settings.DATABASES['default']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    settings.ALLOWED_HOSTS = ['*']
+    settings.AI_COALESCE_ENABLED = False
+    call_command('migrate', verbosity=0)
+    server, base_url = start_stub_server(delay=args.delay)
+    settings.LM_STUDIO_BASE_URL = base_url
+    client = Client()
+
+    tasks = [Task.objects.create(title=f"Prepare report #{i}", description="Quarterly numbers") for i in range(args.requests)]
+    body = lambda task, provisional: {
+        'task_id': task.id, 'title': task.title, 'description': task.description, 'provisional': provisional
+    }
+
+    blocking = [timed_post(client, body(task, False))[0] for task in tasks]
+
+    provisional, until_stored = [], []
+    for task in tasks:
+        elapsed, response = timed_post(client, body(task, True))
+        provisional.append(elapsed)
+        until_stored.append(elapsed + wait_enhanced(client, task.id, response.json()['revision'], args.delay * 5))
+
+    # Two requests back to back: only the second revision may be stored
+    task = tasks[0]
+    first = timed_post(client, body(task, True))[1].json()['revision']
+    second = timed_post(client, body(task, True))[1].json()['revision']
+    wait_enhanced(client, task.id, second, args.delay * 5)
+    time.sleep(args.delay)
+    task.refresh_from_db()
+    feed = client.get('/api/ai/enhance-task/changes/').json()
+    server.shutdown()
+
+    print(f"{args.requests} enhance requests, provider latency {args.delay}s\n")
+    print(f"{'mode':<28} {'p50 (ms)':>9} {'max (ms)':>9}")
+    for label, values in (('blocking response', blocking), ('provisional response', provisional),
+                          ('provisional -> LLM stored', until_stored)):
+        print(f"{label:<28} {statistics.median(values) * 1000:>9.1f} {max(values) * 1000:>9.1f}")
+    print(f"\nSuperseded revision {first} dropped, task kept revision {task.ai_revision} "
+          f"({task.ai_status}); change feed lists {len(feed['changes'])} tasks")
+
+
+if __name__ == "__main__":
+    main()
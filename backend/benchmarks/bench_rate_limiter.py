@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: a burst of background enhance_task calls plus a few interactive
+ones against a local LM Studio stub that serves at most N concurrent
+generations and answers 429 beyond that, with and without the per-provider
+rate limiter.
+
+Reports 429s seen by the stub, calls that fell back to the rules, total time,
+and the latency of the interactive calls that arrive behind the burst.
+
+Run from the backend directory:
+    python benchmarks/bench_rate_limiter.py --background 60 --interactive 5 --ceiling 4 --delay 0.3
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from ai_integration.health import provider_health
+from ai_integration.ratelimit import rate_limiters
+from ai_integration.services import AIService
+from benchmarks.stub_server import start_stub_server
+
+
+def enhance(title, interactive):
+    service = AIService(use_cache=False, interactive=interactive)
+    service.anthropic_key = service.openai_key = ''
+    start = time.perf_counter()
+    service.enhance_task(title, "Collect numbers from every team", "Work")
+    return time.perf_counter() - start
+
+
+def run(server, args, limited):
+    settings.AI_RATE_LIMITS = {
+        'lm_studio': {'max_concurrency': args.ceiling if limited else 0},
+    }
+    rate_limiters.reset()
+    provider_health.reset()
+    server.reset_counters()
+    run_id = os.urandom(4).hex()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.background + args.interactive) as pool:
+        background = [
+            pool.submit(enhance, f"Background report {run_id}-{i}", False)
+            for i in range(args.background)
+        ]
+        # Interactive calls arrive once the burst is queued
+        time.sleep(args.delay / 2)
+        interactive = [
+            pool.submit(enhance, f"Interactive report {run_id}-{i}", True)
+            for i in range(args.interactive)
+        ]
+        interactive_latencies = [future.result() for future in interactive]
+        for future in background:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    calls = args.background + args.interactive
+    return {
+        'elapsed': elapsed,
+        'served': server.served,
+        'rejected': server.rejected,
+        'fallbacks': calls - server.served,
+        'interactive_p50': statistics.median(interactive_latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--background', type=int, default=60)
+    parser.add_argument('--interactive', type=int, default=5)
+    parser.add_argument('--ceiling', type=int, default=4, help='Concurrent generations the stub serves')
+    parser.add_argument('--delay', type=float, default=0.3)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(delay=args.delay, max_concurrency=args.ceiling)
+    settings.LM_STUDIO_BASE_URL = base_url
+    settings.AI_COALESCE_ENABLED = False
+    settings.AI_LATENCY_BUDGETS = {}  # no hedging; measure queueing only
+
+    print(f"{args.background} background + {args.interactive} interactive enhance_task calls, "
+          f"stub ceiling {args.ceiling} concurrent, {args.delay}s latency\n")
+    print(f"{'limiter':<8} {'LLM-served':>10} {'429s':>6} {'rule fallbacks':>15} "
+          f"{'time (s)':>9} {'interactive p50 (s)':>20}")
+    for limited in (False, True):
+        result = run(server, args, limited)
+        print(f"{'on' if limited else 'off':<8} {result['served']:>10} {result['rejected']:>6} "
+              f"{result['fallbacks']:>15} {result['elapsed']:>9.2f} {result['interactive_p50']:>20.2f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
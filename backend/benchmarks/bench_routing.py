@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: model and max_tokens chosen by the routing table for typical
+prompts, against the previous fixed model and max_tokens per operation.
+
+"Reserved" is input + max_tokens, what a call counts against a provider's
+tokens-per-minute budget.
+
+Run from the backend directory:
+    python benchmarks/bench_routing.py --provider anthropic
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from ai_integration.routing import count_tokens, route
+from ai_integration.services import AIService
+from benchmarks.bench_batch_analysis import SAMPLE
+
+FIXED_MODELS = {
+    'lm_studio': 'local-model',
+    'anthropic': 'claude-3-sonnet-20240229',
+    'openai': 'gpt-3.5-turbo',
+}
+FIXED_MAX_TOKENS = {
+    'analyze_context': 1000,
+    'enhance_task': 500,
+    'prioritize_tasks': 800,
+    'analyze_context_batch': 4000,
+}
+
+
+def cases(service):
+    tasks = [
+        {'title': f"Task {i}: follow up on the vendor contract", 'description': 'Check terms and reply to legal'}
+        for i in range(25)
+    ]
+    entries = [{'id': i, 'content': SAMPLE, 'source_type': 'email'} for i in range(6)]
+    return [
+        ('enhance short task', 'enhance_task',
+         service._build_task_enhancement_prompt("Call the dentist", "", "Personal")),
+        ('enhance described task', 'enhance_task',
+         service._build_task_enhancement_prompt("Prepare quarterly report", SAMPLE, "Work")),
+        ('analyze short note', 'analyze_context',
+         service._build_context_analysis_prompt("Meeting with Sam moved to Friday 3pm", 'notes')),
+        ('analyze email', 'analyze_context', service._build_context_analysis_prompt(SAMPLE, 'email')),
+        ('analyze long chunk', 'analyze_context', service._build_context_analysis_prompt(SAMPLE * 30, 'email')),
+        ('prioritize 5 tasks', 'prioritize_tasks', service._build_prioritization_prompt(tasks[:5])),
+        ('prioritize 25 tasks', 'prioritize_tasks', service._build_prioritization_prompt(tasks)),
+        ('batch of 6 entries', 'analyze_context_batch', service._build_batch_analysis_prompt(entries)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--provider', default='anthropic', choices=sorted(FIXED_MODELS))
+    args = parser.parse_args()
+
+    print(f"{'case':<24} {'input':>6} {'fixed max':>10} {'routed max':>11} {'routed model':<26} {'reserved saved':>15}")
+    fixed_total = routed_total = 0
+    for label, operation, prompt in cases(AIService()):
+        chosen = route(operation, args.provider, prompt)
+        input_tokens = count_tokens(prompt)
+        fixed = input_tokens + FIXED_MAX_TOKENS[operation]
+        fixed_total += fixed
+        routed_total += chosen.total_tokens
+        print(f"{label:<24} {input_tokens:>6} {FIXED_MAX_TOKENS[operation]:>10} {chosen.max_tokens:>11} "
+              f"{chosen.model:<26} {1 - chosen.total_tokens / fixed:>14.0%}")
+    print(f"\nTotal reserved tokens: fixed {fixed_total}, routed {routed_total} "
+          f"({1 - routed_total / fixed_total:.0%} less); fixed model was {FIXED_MODELS[args.provider]}")
+
+
+if __name__ == "__main__":
+    main()
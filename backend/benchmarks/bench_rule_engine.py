@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: compiled single-pass rule engine vs the previous keyword
+loops (priority, category, deadline, sentiment and keyword extraction run as
+separate substring scans).
+
+Run from the backend directory:
+    python benchmarks/bench_rule_engine.py --iterations 20000
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_integration import rules
+
+SAMPLES = [
+    "Finish report",
+    "Urgent: prepare the quarterly client presentation for tomorrow's meeting",
+    "Don't forget to buy groceries and call the dentist this week. Feeling great about the new project!",
+    ("Hi team, the deadline for the Q3 budget review moved to next week. We need to update the forecast, "
+     "schedule a call with finance and I'm frustrated that the numbers are still late. Also remember to "
+     "book the gym class and study for the certification course when possible. ") * 4,
+]
+
+
+class LegacyRules:
+    """The keyword loops AIService used before the compiled engine."""
+
+    stop_words = rules.STOP_WORDS
+
+    def estimate_priority(self, content):
+        content_lower = content.lower()
+        priority = 5
+        for keyword in ['urgent', 'asap', 'immediately', 'critical', 'important', 'deadline', 'due']:
+            if keyword in content_lower:
+                priority = max(priority, 8)
+        for keyword in ['soon', 'today', 'tomorrow', 'this week', 'meeting', 'call']:
+            if keyword in content_lower:
+                priority = max(priority, 6)
+        for keyword in ['later', 'eventually', 'when possible', 'someday']:
+            if keyword in content_lower:
+                priority = min(priority, 3)
+        return priority
+
+    def suggest_deadline(self, content):
+        content_lower = content.lower()
+        if any(word in content_lower for word in ['today', 'asap', 'immediately']):
+            return 1
+        elif any(word in content_lower for word in ['tomorrow', 'next day']):
+            return 2
+        elif any(word in content_lower for word in ['this week', 'week']):
+            return 7
+        elif any(word in content_lower for word in ['next week']):
+            return 14
+        elif any(word in content_lower for word in ['month', 'monthly']):
+            return 30
+        return None
+
+    def guess_category(self, content):
+        content_lower = content.lower()
+        for category, words in rules.CATEGORY_KEYWORDS:
+            if any(word in content_lower for word in words):
+                return category
+        return 'General'
+
+    def extract_keywords(self, text):
+        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
+        keywords = [word for word in words if word not in self.stop_words]
+        return [word for word, count in Counter(keywords).most_common(10)]
+
+    def sentiment(self, text):
+        text_lower = text.lower()
+        positive_count = sum(1 for word in rules.POSITIVE_WORDS if word in text_lower)
+        negative_count = sum(1 for word in rules.NEGATIVE_WORDS if word in text_lower)
+        if positive_count + negative_count == 0:
+            return 0.0
+        return (positive_count - negative_count) / (positive_count + negative_count)
+
+    def analyze(self, text):
+        return (
+            self.estimate_priority(text),
+            self.guess_category(text),
+            self.suggest_deadline(text),
+            self.sentiment(text),
+            self.extract_keywords(text),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=10000)
+    args = parser.parse_args()
+
+    legacy = LegacyRules()
+    print(f"{args.iterations} iterations per sample\n")
+    print(f"{'chars':>6}  {'legacy (us)':>12}  {'engine (us)':>12}  {'speedup':>8}")
+
+    for text in SAMPLES:
+        legacy_time = timeit.timeit(lambda: legacy.analyze(text), number=args.iterations)
+        engine_time = timeit.timeit(lambda: rules.analyze_text(text), number=args.iterations)
+        per_legacy = legacy_time / args.iterations * 1e6
+        per_engine = engine_time / args.iterations * 1e6
+        print(f"{len(text):>6}  {per_legacy:>12.2f}  {per_engine:>12.2f}  {per_legacy / per_engine:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
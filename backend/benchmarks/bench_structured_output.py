@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: how often enhance_task ends up with a placeholder result when the
+model's output is not clean JSON, with the previous parser (greedy regex +
+json.loads, placeholder on failure) and with schema validation plus one
+repair call.
+
+The stub replies cycle through outputs seen from local models: clean JSON,
+JSON in a code fence with prose around it, trailing commas, output cut off
+by max_tokens, JSON missing a required field or out of range, and prose
+with no JSON at all. Repair calls get a valid reply.
+
+Run from the backend directory:
+    python benchmarks/bench_structured_output.py --calls 70
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from ai_integration.services import AIService
+from ai_integration.structured import REPAIR_SYSTEM, check_response, structured_stats
+from benchmarks.stub_server import DEFAULT_REPLY, start_stub_server
+
+BODY = DEFAULT_REPLY
+OUTPUTS = [
+    ('clean', BODY),
+    ('fenced with prose', f"Here is the enhancement:\n```json\n{BODY}\n```\nLet me know if you need more."),
+    ('trailing comma', BODY[:-1] + ', }'),
+    ('truncated', BODY[:BODY.index('"insights"') + 20]),
+    ('missing field', json.dumps({'priority': 6, 'insights': 'No description'})),
+    ('out of range', BODY.replace('"priority": 7', '"priority": 15')),
+    ('prose only', "This task looks important; I would give it a priority of 8."),
+]
+LEGACY_PLACEHOLDER = {'priority': 5, 'suggested_deadline': None, 'enhanced_description': '',
+                      'suggested_categories': [], 'insights': 'Enhancement completed'}
+
+
+def legacy_parse(response):
+    """The parser before schema validation: greedy regex, placeholder on failure."""
+    try:
+        match = re.search(r'\{.*\}', response, re.DOTALL)
+        if match:
+            return json.loads(match.group())
+    except ValueError:
+        pass
+    return dict(LEGACY_PLACEHOLDER)
+
+
+def legacy_outcome(response):
+    data = legacy_parse(response)
+    if data == LEGACY_PLACEHOLDER:
+        return 'placeholder'
+    if not 1 <= data.get('priority', 0) <= 10 or 'enhanced_description' not in data:
+        return 'parsed, wrong shape'
+    return 'parsed'
+
+
+def make_reply(calls_seen):
+    def reply(body):
+        if body['messages'][0]['content'] == REPAIR_SYSTEM:
+            calls_seen['repair'] += 1
+            return BODY
+        calls_seen['first'] += 1
+        return OUTPUTS[(calls_seen['first'] - 1) % len(OUTPUTS)][1]
+    return reply
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=70)
+    args = parser.parse_args()
+
+    print(f"{'output':<20} {'legacy result':<22} {'validated result':<16}")
+    for label, output in OUTPUTS:
+        _, errors = check_response('enhance_task', output)
+        print(f"{label:<20} {legacy_outcome(output):<22} {'repair call' if errors else 'valid'}")
+
+    calls_seen = Counter()
+    server, base_url = start_stub_server(reply=make_reply(calls_seen))
+    settings.LM_STUDIO_BASE_URL = base_url
+    service = AIService(use_cache=False)
+    structured_stats.reset()
+
+    legacy_bad = sum(1 for i in range(args.calls) if legacy_outcome(OUTPUTS[i % len(OUTPUTS)][1]) != 'parsed')
+    results = [service.enhance_task(f"Task {i}", "Write the quarterly report", "Work") for i in range(args.calls)]
+    placeholders = sum(1 for result in results if result == LEGACY_PLACEHOLDER)
+    server.shutdown()
+
+    counts = structured_stats.snapshot()['lm_studio']['enhance_task']
+    print(f"\n{args.calls} enhance_task calls")
+    print(f"legacy parser: {legacy_bad} placeholder or wrong-shape results ({legacy_bad / args.calls:.0%})")
+    print(f"validated:     {placeholders} placeholder results, {counts['valid']} valid, "
+          f"{counts['repaired']} repaired, {counts['failed']} failed; "
+          f"{calls_seen['repair']} repair calls for {calls_seen['first']} completions "
+          f"(+{calls_seen['repair'] / calls_seen['first']:.0%} provider calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/tasks/stats/ computed the previous way (six COUNT queries plus
+loading every task for is_overdue), with one conditional-aggregate query, and
+from the TaskCounter table. Afterwards a mix of creates, saves, deletes and
+bulk updates runs with counters on and the counters are checked against the
+aggregate.
+
+Uses a throwaway SQLite database.
+
+Run from the backend directory:
+    python benchmarks/bench_task_stats.py --tasks 200000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, reset_queries
+from django.utils import timezone
+from tasks.models import Task
+from tasks.stats import bulk_update_tasks, counter_stats, rebuild_counters, task_stats
+
+STATUSES = ['pending', 'in_progress', 'completed', 'cancelled']
+
+
+def legacy_stats(queryset):
+    return {
+        'total_tasks': queryset.count(),
+        'completed_tasks': queryset.filter(status='completed').count(),
+        'pending_tasks': queryset.filter(status='pending').count(),
+        'in_progress_tasks': queryset.filter(status='in_progress').count(),
+        'high_priority_tasks': queryset.filter(priority_score__gte=8, status__in=['pending', 'in_progress']).count(),
+        'ai_suggested_tasks': queryset.filter(ai_suggested=True).count(),
+        'overdue_tasks': sum(1 for task in queryset if task.is_overdue),
+    }
+
+
+def random_task(rng, now, i):
+    return Task(
+        title=f"Task {i}",
+        status=rng.choice(STATUSES),
+        priority_score=rng.randint(1, 10),
+        ai_suggested=rng.random() < 0.2,
+        deadline=now + timedelta(days=rng.randint(-30, 30)) if rng.random() < 0.6 else None,
+    )
+
+
+def measure(label, call, repeat):
+    times = []
+    for _ in range(repeat):
+        reset_queries()
+        start = time.perf_counter()
+        result = call()
+        times.append(time.perf_counter() - start)
+    print(f"{label:<24} {statistics.median(times) * 1000:>10.1f} {len(connection.queries):>8}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    settings.DATABASES['default']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+    settings.DEBUG = True  # record queries
+    call_command('migrate', verbosity=0)
+    rng = random.Random(1)
+    now = timezone.now()
+    Task.objects.bulk_create((random_task(rng, now, i) for i in range(args.tasks)), batch_size=5000)
+    rebuild_counters()
+
+    # A fresh queryset per run, as each request builds its own (no result cache reuse)
+    queryset = lambda: Task.objects.select_related('category')
+    print(f"{args.tasks} tasks\n")
+    print(f"{'stats':<24} {'p50 (ms)':>10} {'queries':>8}")
+    legacy = measure('legacy (6 counts + scan)', lambda: legacy_stats(queryset()), args.repeat)
+    aggregate = measure('one aggregate query', lambda: task_stats(queryset()), args.repeat)
+    counters = measure('counter table', counter_stats, args.repeat)
+    print(f"\nAll three agree: {legacy == aggregate == counters}")
+
+    settings.TASK_STATS_COUNTERS = True
+    ids = list(Task.objects.values_list('id', flat=True)[:2000])
+    for i in range(300):
+        random_task(rng, now, f"new {i}").save()
+    for task in Task.objects.filter(id__in=ids[:300]):
+        task.status = rng.choice(STATUSES)
+        task.priority_score = rng.randint(1, 10)
+        task.save()
+    Task.objects.filter(id__in=ids[300:600]).delete()
+    batch = list(Task.objects.filter(id__in=ids[600:1000]))
+    for task in batch:
+        task.priority_score = rng.randint(1, 10)
+    bulk_update_tasks(Task.objects, batch, ['priority_score'])
+    print(f"Counters match the aggregate after 300 creates, 300 saves, 300 deletes and a 400-task bulk update: "
+          f"{counter_stats() == task_stats(Task.objects.all())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Local OpenAI-compatible stub server used by the benchmark scripts.
+
+It answers ``POST /v1/chat/completions`` like LM Studio does, with an optional
+artificial generation delay, and supports HTTP/1.1 keep-alive. The reply is a
+fixed string or a callable that builds it from the request body. With
+``max_concurrency`` set it behaves like a provider at its rate limit: requests
+beyond that many in flight get a 429 with a Retry-After header. With
+``prefill_per_token`` set it models prompt processing like llama.cpp: the
+prompt costs that many seconds per token, except for the longest prefix
+shared with a recent prompt, which is reused from the (simulated) KV cache.
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = json.dumps({
+    'priority': 7,
+    'suggested_deadline': None,
+    'enhanced_description': 'Stub enhancement',
+    'suggested_categories': ['Work'],
+    'insights': 'Stub response'
+})
+
+# Prompts whose KV cache the simulated server keeps, and the token size used for prefill
+KV_SLOTS = 4
+CHARS_PER_TOKEN = 4
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+
+        if not self.server.admit():
+            self.send_response(429)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        try:
+            self._reply(body)
+        finally:
+            self.server.finish()
+
+    def _reply(self, body):
+        self.server.prefill(body.get('messages', []))
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        reply = self.server.reply(body) if callable(self.server.reply) else self.server.reply
+
+        if body.get('stream'):
+            self._stream_reply(reply)
+            return
+
+        payload = json.dumps({
+            'choices': [{'message': {'role': 'assistant', 'content': reply}}]
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream_reply(self, reply):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        for piece in [reply[i:i + 16] for i in range(0, len(reply), 16)]:
+            chunk = {'choices': [{'delta': {'content': piece}}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    # Load benchmarks open hundreds of connections at once
+    request_queue_size = 1024
+    daemon_threads = True
+    max_concurrency = 0
+
+    def admit(self) -> bool:
+        with self.lock:
+            if self.max_concurrency and self.active >= self.max_concurrency:
+                self.rejected += 1
+                return False
+            self.active += 1
+            self.served += 1
+            return True
+
+    def finish(self):
+        with self.lock:
+            self.active -= 1
+
+    def prefill(self, messages):
+        if not self.prefill_per_token:
+            return
+        prompt = ''.join(f"<|{message['role']}|>{message['content']}" for message in messages)
+        with self.lock:
+            cached = max((len(os.path.commonprefix([prompt, seen])) for seen in self.kv_slots), default=0)
+            self.kv_slots = ([prompt] + [seen for seen in self.kv_slots if seen != prompt])[:KV_SLOTS]
+        time.sleep((len(prompt) - cached) / CHARS_PER_TOKEN * self.prefill_per_token)
+
+    def reset_counters(self):
+        with self.lock:
+            self.served = self.rejected = 0
+
+
+def start_stub_server(delay: float = 0.0, reply=DEFAULT_REPLY, max_concurrency: int = 0, prefill_per_token: float = 0.0):
+    """Start the stub server on a free local port and return (server, base_url)."""
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    server.delay = delay
+    server.reply = reply
+    server.max_concurrency = max_concurrency
+    server.prefill_per_token = prefill_per_token
+    server.kv_slots = []
+    server.lock = threading.Lock()
+    server.active = server.served = server.rejected = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
@@ -3,7 +3,7 @@ Django admin configuration for context_entries app.
 """
 
 from django.contrib import admin
-from .models import ContextEntry
+from .models import ContextEntry, ProcessingJob
 
 
 @admin.register(ContextEntry)
@@ -26,4 +26,11 @@ class ContextEntryAdmin(admin.ModelAdmin):
     def preview(self, obj):
         """Show content preview in admin list."""
         return obj.preview
-    preview.short_description = 'Content Preview' 
\ No newline at end of file
+    preview.short_description = 'Content Preview' 
+
+
+@admin.register(ProcessingJob)
+class ProcessingJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'context_entry', 'status', 'attempts', 'available_at', 'lease_owner', 'leased_until']
+    list_filter = ['status', 'created_at']
+    readonly_fields = ['created_at', 'updated_at', 'heartbeat_at']
\ No newline at end of file
@@ -3,9 +3,15 @@ Django app configuration for context entries.
 """
 
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ContextEntriesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'context_entries'
-    verbose_name = 'Context Entries' 
\ No newline at end of file
+    verbose_name = 'Context Entries'
+
+    def ready(self):
+        # Reinstall the SQLite full-text triggers if a table rebuild dropped them
+        from .search import context_index
+        post_migrate.connect(context_index.repair_sqlite, sender=self) 
\ No newline at end of file
@@ -0,0 +1,249 @@
+"""
+Management command that runs a pool of AI processing workers.
+
+Usage:
+    python manage.py run_ai_workers --workers 4 --mode threads
+
+With ``--batch-size`` above 1 a worker leases several ready jobs at once and
+analyzes them with shared, packed prompts (useful for backfills).
+"""
+
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import uuid
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection, connections
+from context_entries import queue
+from context_entries.tasks import analyze_context_entries, analyze_context_entry, save_analysis_result
+
+
+class Worker:
+    """Single worker loop that leases and processes context entry jobs."""
+
+    def __init__(self, stop_event, poll_interval, lease_seconds, burst=False, log=print, batch_size=1):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.stop_event = stop_event
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.burst = burst
+        self.log = log
+        self.batch_size = max(batch_size, 1)
+
+    def run(self):
+        """Lease and process jobs until stopped (or the queue drains in burst mode)."""
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+                jobs = queue.lease_jobs(self.worker_id, self.batch_size, self.lease_seconds)
+                if not jobs:
+                    if self.burst:
+                        break
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+                if len(jobs) == 1:
+                    self.process(jobs[0])
+                else:
+                    self.process_batch(jobs)
+        finally:
+            connection.close()
+
+    def process(self, job):
+        """Process one leased job, keeping its lease alive while the AI call runs."""
+        stop_heartbeat = threading.Event()
+        heartbeat_thread = threading.Thread(
+            target=self._heartbeat,
+            args=([job], stop_heartbeat),
+            daemon=True
+        )
+        heartbeat_thread.start()
+
+        try:
+            context_entry = job.context_entry
+            analysis_result = analyze_context_entry(context_entry)
+
+            # Only store results while we still own the job; if the lease was
+            # lost another worker has taken over the entry.
+            if not queue.finish_job(job, self.worker_id, lambda: save_analysis_result(context_entry, analysis_result)):
+                self.log(f"[{self.worker_id}] Lost lease on job {job.id}, discarding result")
+                return
+            self.log(f"[{self.worker_id}] Processed context entry {job.context_entry_id}")
+
+        except Exception as e:
+            queue.fail_job(job, self.worker_id, e)
+            self.log(f"[{self.worker_id}] Job {job.id} failed: {e}")
+        finally:
+            stop_heartbeat.set()
+            heartbeat_thread.join()
+
+    def process_batch(self, jobs):
+        """
+        Process several leased jobs with packed prompts.
+
+        Entries whose batch section fails to parse are analyzed individually
+        by the AI service, so each job still gets its own result.
+        """
+        stop_heartbeat = threading.Event()
+        heartbeat_thread = threading.Thread(
+            target=self._heartbeat,
+            args=(jobs, stop_heartbeat),
+            daemon=True
+        )
+        heartbeat_thread.start()
+
+        try:
+            try:
+                results = analyze_context_entries([job.context_entry for job in jobs])
+            except Exception as e:
+                for job in jobs:
+                    queue.fail_job(job, self.worker_id, e)
+                self.log(f"[{self.worker_id}] Batch of {len(jobs)} jobs failed: {e}")
+                return
+
+            for job in jobs:
+                try:
+                    result = results[job.context_entry_id]
+                    if not queue.finish_job(job, self.worker_id, lambda: save_analysis_result(job.context_entry, result)):
+                        self.log(f"[{self.worker_id}] Lost lease on job {job.id}, discarding result")
+                        continue
+                    self.log(f"[{self.worker_id}] Processed context entry {job.context_entry_id}")
+
+                except Exception as e:
+                    queue.fail_job(job, self.worker_id, e)
+                    self.log(f"[{self.worker_id}] Job {job.id} failed: {e}")
+        finally:
+            stop_heartbeat.set()
+            heartbeat_thread.join()
+
+    def _heartbeat(self, jobs, stop_event):
+        """Periodically extend the job leases until processing finishes."""
+        interval = max(self.lease_seconds / 3, 1)
+        active = list(jobs)
+        try:
+            while active and not stop_event.wait(interval):
+                active = [
+                    job for job in active
+                    if queue.heartbeat(job, self.worker_id, self.lease_seconds)
+                ]
+        finally:
+            connection.close()
+
+
+def _run_worker_process(poll_interval, lease_seconds, burst, batch_size):
+    """Entry point for worker processes."""
+    import django
+    django.setup()
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+    Worker(stop_event, poll_interval, lease_seconds, burst, batch_size=batch_size).run()
+
+
+class Command(BaseCommand):
+    help = 'Run background workers that process queued context entries with AI'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.AI_WORKER_CONCURRENCY,
+            help='Number of concurrent workers'
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['threads', 'processes'],
+            default='threads',
+            help='Run workers as threads in this process or as separate processes'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.AI_WORKER_POLL_INTERVAL,
+            help='Seconds to wait between polls when the queue is empty'
+        )
+        parser.add_argument(
+            '--lease-seconds',
+            type=int,
+            default=settings.AI_JOB_LEASE_SECONDS,
+            help='Job lease duration; leases are renewed by heartbeats'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.AI_WORKER_BATCH_SIZE,
+            help='Maximum number of ready jobs a worker analyzes with one packed prompt'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling forever'
+        )
+
+    def handle(self, *args, **options):
+        workers = max(options['workers'], 1)
+        self.stdout.write(f"Starting {workers} AI worker(s) in {options['mode']} mode")
+
+        if options['mode'] == 'processes':
+            self._run_processes(workers, options)
+        else:
+            self._run_threads(workers, options)
+
+        self.stdout.write("AI workers stopped")
+
+    def _run_threads(self, workers, options):
+        stop_event = threading.Event()
+        threads = [
+            threading.Thread(
+                target=Worker(
+                    stop_event,
+                    options['poll_interval'],
+                    options['lease_seconds'],
+                    options['burst'],
+                    log=self.stdout.write,
+                    batch_size=options['batch_size']
+                ).run,
+                name=f"ai-worker-{i}"
+            )
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stdout.write("Shutting down, waiting for running jobs to finish...")
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+
+    def _run_processes(self, workers, options):
+        # Connections must not be shared with forked children
+        connections.close_all()
+
+        processes = [
+            multiprocessing.Process(
+                target=_run_worker_process,
+                args=(options['poll_interval'], options['lease_seconds'], options['burst'], options['batch_size']),
+                name=f"ai-worker-{i}"
+            )
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Shutting down, waiting for running jobs to finish...")
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("context_entries", "0002_processingjob"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contextentry",
+            index=models.Index(
+                fields=["timestamp", "id"], name="ctx_entry_list_order_idx"
+            ),
+        ),
+    ]
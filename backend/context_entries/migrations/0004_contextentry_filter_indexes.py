@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("context_entries", "0003_contextentry_list_order_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="contextentry",
+            index=models.Index(
+                fields=["source_type", "timestamp", "id"], name="ctx_entry_source_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contextentry",
+            index=models.Index(
+                condition=models.Q(("is_processed", True)),
+                fields=["timestamp", "id"],
+                name="ctx_entry_processed_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="contextentry",
+            index=models.Index(
+                condition=models.Q(("is_processed", False)),
+                fields=["timestamp", "id"],
+                name="ctx_entry_unprocessed_idx",
+            ),
+        ),
+    ]
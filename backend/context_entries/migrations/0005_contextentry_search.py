@@ -0,0 +1,110 @@
+# Full-text search index for context entries (see smart_todo/search.py)
+
+from django.db import migrations
+
+# SQLite: an FTS5 table filled by triggers. Inlined so this migration keeps
+# running the same SQL; smart_todo/search.py builds the same statements to
+# reinstall the triggers when a later table rebuild drops them
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE context_entries_contextentry_fts USING fts5(
+        content, insights, tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER context_entries_contextentry_fts_insert AFTER INSERT ON context_entries_contextentry BEGIN
+        INSERT INTO context_entries_contextentry_fts (rowid, content, insights)
+        VALUES (new.id, new.content, (SELECT group_concat(value, ' ') FROM json_tree(new.processed_insights) WHERE type = 'text'));
+    END
+    """,
+    """
+    CREATE TRIGGER context_entries_contextentry_fts_update AFTER UPDATE OF content, processed_insights ON context_entries_contextentry
+    WHEN old.content IS NOT new.content OR old.processed_insights IS NOT new.processed_insights BEGIN
+        UPDATE context_entries_contextentry_fts SET content = new.content, insights = (SELECT group_concat(value, ' ') FROM json_tree(new.processed_insights) WHERE type = 'text')
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER context_entries_contextentry_fts_delete AFTER DELETE ON context_entries_contextentry BEGIN
+        DELETE FROM context_entries_contextentry_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    INSERT INTO context_entries_contextentry_fts (rowid, content, insights)
+    SELECT new.id, new.content, (SELECT group_concat(value, ' ') FROM json_tree(new.processed_insights) WHERE type = 'text') FROM context_entries_contextentry AS new
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS context_entries_contextentry_fts_insert",
+    "DROP TRIGGER IF EXISTS context_entries_contextentry_fts_update",
+    "DROP TRIGGER IF EXISTS context_entries_contextentry_fts_delete",
+    "DROP TABLE IF EXISTS context_entries_contextentry_fts",
+]
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE context_entries_contextentry ADD COLUMN search_vector tsvector",
+    # The change check is in the function body: a generated column, a WHEN
+    # clause or an UPDATE OF column list would block later column type changes
+    """
+    CREATE FUNCTION context_entries_contextentry_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' THEN
+            IF NEW.content IS NOT DISTINCT FROM OLD.content
+                    AND NEW.processed_insights IS NOT DISTINCT FROM OLD.processed_insights THEN
+                RETURN NEW;
+            END IF;
+        END IF;
+        NEW.search_vector := setweight(to_tsvector('english', coalesce(NEW.content, '')), 'A')
+            || setweight(jsonb_to_tsvector('english', coalesce(NEW.processed_insights, '{}'::jsonb), '["string"]'), 'B');
+        RETURN NEW;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER context_entries_contextentry_search_vector BEFORE INSERT OR UPDATE ON context_entries_contextentry
+    FOR EACH ROW EXECUTE FUNCTION context_entries_contextentry_search_vector()
+    """,
+    """
+    UPDATE context_entries_contextentry SET search_vector = setweight(to_tsvector('english', coalesce(content, '')), 'A')
+        || setweight(jsonb_to_tsvector('english', coalesce(processed_insights, '{}'::jsonb), '["string"]'), 'B')
+    """,
+    "CREATE INDEX context_entries_contextentry_search_idx ON context_entries_contextentry USING gin (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP TRIGGER IF EXISTS context_entries_contextentry_search_vector ON context_entries_contextentry",
+    "DROP FUNCTION IF EXISTS context_entries_contextentry_search_vector()",
+    "ALTER TABLE context_entries_contextentry DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def forward(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_FORWARD:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        for sql in POSTGRES_FORWARD:
+            schema_editor.execute(sql)
+
+
+def reverse(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_REVERSE:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        for sql in POSTGRES_REVERSE:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("context_entries", "0004_contextentry_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, reverse),
+    ]
@@ -50,6 +50,24 @@ class ContextEntry(models.Model):
         ordering = ['-timestamp']
         verbose_name = "Context Entry"
         verbose_name_plural = "Context Entries"
+        indexes = [
+            # Context list pages: keyset seek in (-timestamp, -id) order; also
+            # serves ?days_back= (timestamp >= now - days)
+            models.Index(fields=['timestamp', 'id'], name='ctx_entry_list_order_idx'),
+            # ?source_type= lists and counts, and the per-source stats breakdown
+            models.Index(fields=['source_type', 'timestamp', 'id'], name='ctx_entry_source_idx'),
+            # ?is_processed= is a bare boolean column filter: one partial index per value
+            models.Index(
+                fields=['timestamp', 'id'],
+                condition=models.Q(is_processed=True),
+                name='ctx_entry_processed_idx',
+            ),
+            models.Index(
+                fields=['timestamp', 'id'],
+                condition=models.Q(is_processed=False),
+                name='ctx_entry_unprocessed_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.get_source_type_display()} - {self.timestamp.strftime('%Y-%m-%d %H:%M')}"
@@ -59,4 +77,52 @@ class ContextEntry(models.Model):
         """Return a preview of the content (first 100 characters)."""
         if len(self.content) > 100:
             return self.content[:100] + "..."
-        return self.content 
\ No newline at end of file
+        return self.content 
+
+class ProcessingJob(models.Model):
+    """Queued AI processing job for a context entry, leased by background workers."""
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ['queued', 'running']
+    
+    context_entry = models.ForeignKey(
+        ContextEntry,
+        on_delete=models.CASCADE,
+        related_name='processing_jobs'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    available_at = models.DateTimeField(help_text="Earliest time the job may be leased")
+    
+    # Lease held by the worker currently processing the job
+    lease_owner = models.CharField(max_length=100, blank=True)
+    leased_until = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['available_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='ctx_job_status_avail_idx'),
+        ]
+        constraints = [
+            # At most one queued/running job per entry, so an entry is never
+            # processed by two workers at the same time.
+            models.UniqueConstraint(
+                fields=['context_entry'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='ctx_job_one_active_per_entry',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Job {self.id} for entry {self.context_entry_id} ({self.status})"
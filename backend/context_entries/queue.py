@@ -0,0 +1,268 @@
+"""
+Database-backed job queue for context entry AI processing.
+
+Jobs are stored in the ProcessingJob table and leased by workers started with
+``manage.py run_ai_workers``. A lease is claimed with a conditional UPDATE, so
+only one worker can win a given job, and is kept alive with heartbeats while
+the job runs. Jobs whose lease expires (e.g. the worker died) become leasable
+again until their attempts run out; failed jobs are retried with exponential
+backoff. A result is stored and its job completed in one transaction holding
+the job row, so an entry's result is saved at most once.
+"""
+
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import ContextEntry, ProcessingJob
+
+# Insert attempts when other requests keep queueing (and finishing) the same entry
+ENQUEUE_ATTEMPTS = 3
+
+
+def enqueue_context_entry(context_entry, delay_seconds=0):
+    """
+    Queue a context entry for AI processing.
+
+    If the entry already has a queued or running job, that job is returned
+    instead of creating a second one.
+
+    Args:
+        context_entry: ContextEntry instance or primary key
+        delay_seconds: Seconds to wait before the job becomes leasable
+
+    Returns:
+        The active ProcessingJob for the entry
+    """
+    entry_id = context_entry.pk if isinstance(context_entry, ContextEntry) else context_entry
+
+    for _ in range(ENQUEUE_ATTEMPTS):
+        existing = _active_job(entry_id)
+        if existing:
+            return existing
+
+        try:
+            with transaction.atomic():
+                return ProcessingJob.objects.create(
+                    context_entry_id=entry_id,
+                    available_at=timezone.now() + timedelta(seconds=delay_seconds),
+                    max_attempts=settings.AI_JOB_MAX_ATTEMPTS
+                )
+        except IntegrityError:
+            # Another request queued the entry between our check and insert;
+            # its job may also have finished before we look it up again
+            continue
+
+    # Competing jobs kept finishing in between: the latest one covers the entry
+    return ProcessingJob.objects.filter(context_entry_id=entry_id).latest('created_at', 'id')
+
+
+def lease_next_job(worker_id, lease_seconds=None):
+    """
+    Claim the next available job for a worker.
+
+    Args:
+        worker_id: Unique identifier of the leasing worker
+        lease_seconds: Lease duration; defaults to settings.AI_JOB_LEASE_SECONDS
+
+    Returns:
+        The leased ProcessingJob, or None if nothing is available
+    """
+    jobs = lease_jobs(worker_id, limit=1, lease_seconds=lease_seconds)
+    return jobs[0] if jobs else None
+
+
+def lease_jobs(worker_id, limit=1, lease_seconds=None):
+    """
+    Claim up to ``limit`` available jobs for a worker.
+
+    Each job is claimed with its own conditional UPDATE that only matches
+    while the job is still leasable, so concurrent workers never receive the
+    same job.
+    """
+    lease_seconds = lease_seconds or settings.AI_JOB_LEASE_SECONDS
+    now = timezone.now()
+    fail_exhausted_jobs(now)
+    leasable = _leasable(now)
+
+    candidate_ids = list(
+        ProcessingJob.objects.filter(leasable)
+        .order_by('available_at', 'id')
+        .values_list('id', flat=True)[:limit * 4]
+    )
+
+    leased_ids = []
+    for job_id in candidate_ids:
+        claimed = ProcessingJob.objects.filter(leasable, id=job_id).update(
+            status='running',
+            lease_owner=worker_id,
+            leased_until=now + timedelta(seconds=lease_seconds),
+            heartbeat_at=now,
+            attempts=F('attempts') + 1,
+            updated_at=now
+        )
+        if claimed:
+            leased_ids.append(job_id)
+            if len(leased_ids) >= limit:
+                break
+
+    if not leased_ids:
+        return []
+
+    jobs = ProcessingJob.objects.select_related('context_entry').in_bulk(leased_ids)
+    return [jobs[job_id] for job_id in leased_ids if job_id in jobs]
+
+
+def heartbeat(job, worker_id, lease_seconds=None):
+    """
+    Extend the lease on a running job.
+
+    Returns:
+        True if the worker still holds the lease, False if it was lost
+    """
+    lease_seconds = lease_seconds or settings.AI_JOB_LEASE_SECONDS
+    now = timezone.now()
+    return bool(
+        ProcessingJob.objects.filter(
+            id=job.id, status='running', lease_owner=worker_id
+        ).update(
+            leased_until=now + timedelta(seconds=lease_seconds),
+            heartbeat_at=now,
+            updated_at=now
+        )
+    )
+
+
+def finish_job(job, worker_id, save):
+    """
+    Store a job's result and mark it succeeded in one transaction.
+
+    The job row is locked first, so a worker re-leasing it after a lease
+    expiry waits for (and then skips) this job; if the claim is already
+    gone nothing is saved.
+
+    Args:
+        job: Leased ProcessingJob
+        worker_id: Identifier of the leasing worker
+        save: Callable that stores the result
+
+    Returns:
+        True if the result was stored, False if the worker lost the job
+    """
+    with transaction.atomic():
+        claimed = ProcessingJob.objects.select_for_update().filter(
+            id=job.id, status='running', lease_owner=worker_id
+        ).exists()
+        if not claimed:
+            return False
+        save()
+        if not complete_job(job, worker_id):
+            # Re-leased between the check and here (SQLite has no row locks)
+            transaction.set_rollback(True)
+            return False
+    return True
+
+
+def complete_job(job, worker_id):
+    """Mark a leased job as succeeded."""
+    return bool(
+        ProcessingJob.objects.filter(
+            id=job.id, status='running', lease_owner=worker_id
+        ).update(
+            status='succeeded',
+            leased_until=None,
+            last_error='',
+            updated_at=timezone.now()
+        )
+    )
+
+
+def fail_job(job, worker_id, error):
+    """
+    Record a failed attempt, rescheduling the job with exponential backoff.
+
+    Once ``max_attempts`` is reached the job is marked as failed and the
+    error is stored on the context entry.
+    """
+    job.refresh_from_db(fields=['attempts', 'max_attempts'])
+    now = timezone.now()
+    retry = job.attempts < job.max_attempts
+
+    updates = {
+        'leased_until': None,
+        'lease_owner': '',
+        'last_error': str(error),
+        'updated_at': now,
+    }
+    if retry:
+        updates['status'] = 'queued'
+        updates['available_at'] = now + timedelta(seconds=retry_delay(job.attempts))
+    else:
+        updates['status'] = 'failed'
+
+    updated = ProcessingJob.objects.filter(
+        id=job.id, status='running', lease_owner=worker_id
+    ).update(**updates)
+
+    if updated and not retry:
+        ContextEntry.objects.filter(id=job.context_entry_id).update(
+            processing_error=str(error),
+            is_processed=False
+        )
+    return bool(updated)
+
+
+def fail_exhausted_jobs(now=None):
+    """
+    Mark failed the running jobs whose lease expired on their last attempt.
+
+    A job that kills its worker every time (out of memory, a crash in a
+    provider SDK) never reaches ``fail_job``; without this it would be
+    re-leased forever.
+
+    Returns:
+        Number of jobs marked failed
+    """
+    now = now or timezone.now()
+    exhausted = ProcessingJob.objects.filter(
+        status='running', leased_until__lt=now, attempts__gte=F('max_attempts')
+    )
+    job_ids = list(exhausted.values_list('id', flat=True))
+    if not job_ids:
+        return 0
+
+    error = 'Lease expired on the last attempt; the worker stopped responding'
+    failed_ids = []
+    for job_id in job_ids:
+        # Conditional per job: a heartbeat may have renewed the lease meanwhile
+        if exhausted.filter(id=job_id).update(
+            status='failed', leased_until=None, lease_owner='', last_error=error, updated_at=now
+        ):
+            failed_ids.append(job_id)
+    ContextEntry.objects.filter(processing_jobs__id__in=failed_ids).update(
+        processing_error=error,
+        is_processed=False
+    )
+    return len(failed_ids)
+
+
+def retry_delay(attempts):
+    """Exponential backoff delay in seconds after the given number of attempts."""
+    base = settings.AI_JOB_RETRY_BACKOFF_SECONDS
+    return min(base * (2 ** max(attempts - 1, 0)), settings.AI_JOB_RETRY_BACKOFF_MAX_SECONDS)
+
+
+def _active_job(entry_id):
+    return ProcessingJob.objects.filter(
+        context_entry_id=entry_id,
+        status__in=ProcessingJob.ACTIVE_STATUSES
+    ).first()
+
+
+def _leasable(now):
+    """Jobs that are due, plus running jobs whose lease has expired with attempts left."""
+    return (
+        Q(status='queued', available_at__lte=now) |
+        Q(status='running', leased_until__lt=now, attempts__lt=F('max_attempts'))
+    )
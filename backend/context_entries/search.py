@@ -0,0 +1,20 @@
+"""
+Full-text index of context entries: the content and the text values of the
+AI-processed insights (not their JSON keys). Created by migration
+0005_contextentry_search.
+"""
+
+from smart_todo.search import FullTextIndex
+from .models import ContextEntry
+
+context_index = FullTextIndex(
+    ContextEntry,
+    migration=('context_entries', '0005_contextentry_search'),
+    fallback_fields=['content', 'processed_insights'],
+    sqlite_columns={
+        'content': 'new.content',
+        'insights': "(SELECT group_concat(value, ' ') FROM json_tree(new.processed_insights) WHERE type = 'text')",
+    },
+    sqlite_weights=(4.0, 1.0),
+    postgres_snippet='content',
+)
@@ -3,7 +3,7 @@ Django REST Framework serializers for context_entries app.
 """
 
 from rest_framework import serializers
-from .models import ContextEntry
+from .models import ContextEntry, ProcessingJob
 
 
 class ContextEntrySerializer(serializers.ModelSerializer):
@@ -32,16 +32,22 @@ class ContextEntryCreateSerializer(serializers.ModelSerializer):
         fields = ['content', 'source_type']
     
     def create(self, validated_data):
-        """Create context entry and trigger AI processing."""
+        """Create context entry and queue it for background AI processing."""
         context_entry = super().create(validated_data)
         
-        # Trigger AI processing in the background
-        # This would typically be done with Celery or similar
-        from .tasks import process_context_entry
-        try:
-            process_context_entry(context_entry.id)
-        except Exception as e:
-            context_entry.processing_error = str(e)
-            context_entry.save()
+        from .queue import enqueue_context_entry
+        context_entry.processing_job = enqueue_context_entry(context_entry)
         
-        return context_entry 
\ No newline at end of file
+        return context_entry
+
+
+class ProcessingJobSerializer(serializers.ModelSerializer):
+    """Serializer for background AI processing jobs."""
+    
+    class Meta:
+        model = ProcessingJob
+        fields = [
+            'id', 'context_entry', 'status', 'attempts', 'max_attempts',
+            'available_at', 'last_error', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
@@ -2,51 +2,48 @@
 AI processing tasks for context entries.
 """
 
-import json
-import re
-from django.conf import settings
-from .models import ContextEntry
 
+def analyze_context_entry(context_entry):
+    """Run AI analysis for a context entry without saving the results."""
+    # Import AI integration
+    from ai_integration.services import AIService
+    ai_service = AIService()
+    
+    return ai_service.analyze_context(
+        content=context_entry.content,
+        source_type=context_entry.source_type
+    )
+
+
+def analyze_context_entries(context_entries):
+    """
+    Run AI analysis for several context entries, packing them into shared prompts.
+    
+    Returns:
+        Dictionary mapping each entry id to its analysis results
+    """
+    from ai_integration.services import AIService
+    ai_service = AIService()
+    
+    return ai_service.analyze_contexts([
+        {'id': entry.id, 'content': entry.content, 'source_type': entry.source_type}
+        for entry in context_entries
+    ])
 
-def process_context_entry(context_entry_id):
-    """Process a context entry with AI to extract insights and tasks."""
-    try:
-        context_entry = ContextEntry.objects.get(id=context_entry_id)
-        
-        # Import AI integration
-        from ai_integration.services import AIService
-        ai_service = AIService()
-        
-        # Process the context content
-        analysis_result = ai_service.analyze_context(
-            content=context_entry.content,
-            source_type=context_entry.source_type
-        )
-        
-        # Update context entry with results
-        context_entry.processed_insights = analysis_result.get('insights', {})
-        context_entry.extracted_tasks = analysis_result.get('extracted_tasks', [])
-        context_entry.sentiment_score = analysis_result.get('sentiment_score')
-        context_entry.keywords = analysis_result.get('keywords', [])
-        context_entry.is_processed = True
-        context_entry.processing_error = ''
-        
-        context_entry.save()
-        
-        # Auto-create high-priority tasks if found
-        auto_create_tasks_from_context(context_entry, analysis_result)
-        
-    except ContextEntry.DoesNotExist:
-        print(f"Context entry {context_entry_id} not found")
-    except Exception as e:
-        try:
-            context_entry = ContextEntry.objects.get(id=context_entry_id)
-            context_entry.processing_error = str(e)
-            context_entry.is_processed = False
-            context_entry.save()
-        except:
-            pass
-        print(f"Error processing context entry {context_entry_id}: {e}")
+
+def save_analysis_result(context_entry, analysis_result):
+    """Store analysis results on a context entry and auto-create tasks."""
+    context_entry.processed_insights = analysis_result.get('insights', {})
+    context_entry.extracted_tasks = analysis_result.get('extracted_tasks', [])
+    context_entry.sentiment_score = analysis_result.get('sentiment_score')
+    context_entry.keywords = analysis_result.get('keywords', [])
+    context_entry.is_processed = True
+    context_entry.processing_error = ''
+    
+    context_entry.save()
+    
+    # Auto-create high-priority tasks if found
+    auto_create_tasks_from_context(context_entry, analysis_result)
 
 
 def auto_create_tasks_from_context(context_entry, analysis_result):
@@ -89,21 +86,5 @@ def auto_create_tasks_from_context(context_entry, analysis_result):
 
 def extract_keywords(text):
     """Simple keyword extraction from text."""
-    # Remove common stop words
-    stop_words = {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-        'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
-        'before', 'after', 'above', 'below', 'between', 'among', 'is', 'are',
-        'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does',
-        'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can',
-        'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them'
-    }
-    
-    # Extract words (basic approach)
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-    keywords = [word for word in words if word not in stop_words]
-    
-    # Return most frequent keywords
-    from collections import Counter
-    word_freq = Counter(keywords)
-    return [word for word, count in word_freq.most_common(10)] 
\ No newline at end of file
+    from ai_integration.rules import extract_keywords as extract_rule_keywords
+    return extract_rule_keywords(text)
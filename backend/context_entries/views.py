@@ -5,11 +5,20 @@ Django REST Framework views for context_entries app.
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q, Count, Avg
+from smart_todo.pagination import KeysetPagination
+from smart_todo.search import result_data, search_terms
+from django.conf import settings
+from django.db.models import Count, Avg
 from django.utils import timezone
 from datetime import timedelta
 from .models import ContextEntry
-from .serializers import ContextEntrySerializer, ContextEntryCreateSerializer
+from .queue import enqueue_context_entry
+from .search import context_index
+from .serializers import (
+    ContextEntrySerializer,
+    ContextEntryCreateSerializer,
+    ProcessingJobSerializer
+)
 
 
 class ContextEntryViewSet(viewsets.ModelViewSet):
@@ -17,6 +26,7 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
     
     queryset = ContextEntry.objects.all()
     serializer_class = ContextEntrySerializer
+    pagination_class = KeysetPagination
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -24,6 +34,16 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
             return ContextEntryCreateSerializer
         return ContextEntrySerializer
     
+    def create(self, request, *args, **kwargs):
+        """Create a context entry and return 202 with the queued processing job."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        context_entry = serializer.save()
+        
+        data = ContextEntrySerializer(context_entry).data
+        data['job_id'] = context_entry.processing_job.id
+        return Response(data, status=status.HTTP_202_ACCEPTED)
+    
     def get_queryset(self):
         """Filter context entries based on query parameters."""
         queryset = ContextEntry.objects.all()
@@ -48,16 +68,27 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
             except ValueError:
                 pass
         
-        # Search functionality
+        # Search functionality (full-text index over content and insights)
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(content__icontains=search) |
-                Q(processed_insights__icontains=search)
-            )
+            queryset = context_index.filter(queryset, search)
         
         return queryset
     
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text search: the best matches for ``?q=`` with rank and snippet."""
+        query = request.query_params.get('q', '')
+        if not search_terms(query):
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), settings.SEARCH_MAX_RESULTS)
+        except ValueError:
+            return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        results = context_index.search(ContextEntry.objects.all(), query, limit)
+        return Response({'query': query, 'results': result_data(results, ContextEntrySerializer)})
+    
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get context entry statistics."""
@@ -93,16 +124,25 @@ class ContextEntryViewSet(viewsets.ModelViewSet):
     def reprocess(self, request, pk=None):
         """Reprocess a context entry with AI."""
         context_entry = self.get_object()
+        job = enqueue_context_entry(context_entry)
+        return Response(
+            {'status': 'queued', 'job_id': job.id},
+            status=status.HTTP_202_ACCEPTED
+        )
+    
+    @action(detail=True, methods=['get'])
+    def job(self, request, pk=None):
+        """Get the most recent processing job for a context entry."""
+        context_entry = self.get_object()
+        job = context_entry.processing_jobs.order_by('-created_at', '-id').first()
         
-        try:
-            from .tasks import process_context_entry
-            process_context_entry(context_entry.id)
-            return Response({'status': 'processing started'})
-        except Exception as e:
+        if job is None:
             return Response(
-                {'error': str(e)},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {'error': 'No processing job found'},
+                status=status.HTTP_404_NOT_FOUND
             )
+        
+        return Response(ProcessingJobSerializer(job).data)
     
     @action(detail=False, methods=['get'])
     def insights(self, request):
@@ -0,0 +1,14 @@
+"""
+ASGI config for smart_todo project.
+
+Serves the async AI endpoints natively, e.g.:
+    uvicorn smart_todo.asgi:application --workers 2
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'smart_todo.settings')
+
+application = get_asgi_application()
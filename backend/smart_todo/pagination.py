@@ -0,0 +1,161 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+Pages are read in the model's ``Meta.ordering`` with ``id`` appended as a
+tie-breaker, and a page starts after the last row of the previous one:
+``WHERE (priority_score, created_at, id) < (%s, %s, %s) ORDER BY ... LIMIT n``.
+With a composite index on the ordering columns every page is one index
+seek, however deep, instead of an ``OFFSET`` scan over all earlier rows.
+
+The ``next``/``previous`` links carry an opaque ``?cursor=`` (the ordering
+values of the boundary row). ``count`` is included as before unless the
+client passes ``?count=false``, which skips the ``COUNT(*)`` query.
+"""
+
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+from django.db.models import BooleanField, F, Func, Q, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class RowCompare(Func):
+    """``(a, b, ...) < (x, y, ...)`` row-value comparison, which both SQLite and PostgreSQL can answer with an index range."""
+
+    output_field = BooleanField()
+
+    def __init__(self, columns: List[F], values: List[Value], operator: str):
+        super().__init__(*columns, *values)
+        self.operator = operator
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sqls, params = [], []
+        for expression in self.source_expressions:
+            sql, expression_params = compiler.compile(expression)
+            sqls.append(sql)
+            params.extend(expression_params)
+        half = len(sqls) // 2
+        return f"({', '.join(sqls[:half])}) {self.operator} ({', '.join(sqls[half:])})", params
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over the model's ``Meta.ordering`` plus ``id``."""
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.use_model(queryset.model)
+        position, reverse = self.decode_cursor(request)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() != 'false':
+            self.count = queryset.count()
+
+        ordering = [self.flip(name) for name in self.ordering] if reverse else self.ordering
+        page_queryset = queryset.order_by(*ordering)
+        if position is not None:
+            page_queryset = page_queryset.filter(self.after(ordering, position))
+        rows = list(page_queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Going forward there is a previous page whenever we started from a
+        # cursor; going back there is always a next page (the one we came from).
+        self.next_position = self.position(rows[-1]) if rows and (has_more or reverse) else None
+        self.previous_position = self.position(rows[0]) if rows and (has_more if reverse else position is not None) else None
+        return rows
+
+    def get_paginated_response(self, data):
+        response = {}
+        if self.count is not None:
+            response['count'] = self.count
+        response.update({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+        return Response(response)
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_position is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.next_position, False))
+
+    def get_previous_link(self) -> Optional[str]:
+        if self.previous_position is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.previous_position, True))
+
+    def use_model(self, model):
+        self.ordering = self.get_ordering(model)
+        self.fields = [model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+
+    def cursor_after(self, row) -> str:
+        """Cursor for the page that starts after ``row``, as a ``next`` link would carry."""
+        self.use_model(type(row))
+        return self.encode_cursor(self.position(row), False)
+
+    @staticmethod
+    def get_ordering(model) -> List[str]:
+        """The model's default ordering with ``id`` added as a tie-breaker."""
+        ordering = list(model._meta.ordering)
+        if not any(name.lstrip('-') == 'id' for name in ordering):
+            descending = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append('-id' if descending else 'id')
+        return ordering
+
+    @staticmethod
+    def flip(name: str) -> str:
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def after(self, ordering: List[str], position: List[Any]) -> Q:
+        """Filter for the rows that come after ``position`` in ``ordering``."""
+        descending = [name.startswith('-') for name in ordering]
+        columns = [F(field.name) for field in self.fields]
+        values = [Value(value, output_field=field) for field, value in zip(self.fields, position)]
+        if all(descending) or not any(descending):
+            return Q(RowCompare(columns, values, '<' if descending[0] else '>'))
+
+        # Mixed directions cannot be a single row comparison:
+        # a < x OR (a = x AND (b > y OR (b = y AND ...)))
+        condition = None
+        for column, value, desc in reversed(list(zip(columns, values, descending))):
+            name = column.name
+            beyond = Q(**{f'{name}__lt' if desc else f'{name}__gt': value})
+            condition = beyond if condition is None else beyond | (Q(**{name: value}) & condition)
+        return condition
+
+    def position(self, row) -> List[str]:
+        return [field.value_to_string(row) for field in self.fields]
+
+    def encode_cursor(self, position: List[str], reverse: bool) -> str:
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request) -> Tuple[Optional[List[Any]], bool]:
+        """
+        Parse ``?cursor=`` into ordering values and direction.
+
+        Raises:
+            NotFound: If the cursor is malformed
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            position = [field.to_python(value) for field, value in zip(self.fields, payload['p'], strict=True)]
+            return position, bool(payload.get('r'))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,240 @@
+"""
+Full-text search over tasks and context entries.
+
+The search documents are maintained by the database itself, so every write
+path (ORM saves, bulk updates, raw SQL) keeps them current:
+
+- SQLite: an FTS5 table per model (``<table>_fts``, rowid = primary key)
+  filled by triggers on the model table, porter-stemmed, with prefix
+  indexes for 2- and 3-character prefixes. Django rebuilds a SQLite table
+  (dropping its triggers) for many schema changes, so after every
+  ``migrate`` missing triggers are recreated and the index refilled.
+- PostgreSQL: a weighted ``search_vector`` tsvector column with a GIN
+  index, set by a BEFORE INSERT/UPDATE trigger (see
+  ``tasks/migrations/0006_task_search.py`` and
+  ``context_entries/migrations/0005_contextentry_search.py``).
+
+User input is reduced to word terms, each matched as a prefix and all
+required (``report q`` finds "quarterly report"). ``FullTextIndex.filter``
+restricts a queryset to matching rows; ``FullTextIndex.search`` returns the
+best matches by relevance (bm25 on SQLite, ts_rank_cd on PostgreSQL) with a
+highlighted snippet. Other database backends fall back to ``icontains``.
+"""
+
+import html
+import re
+from typing import Any, Dict, List, Tuple
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Text search configuration baked into the PostgreSQL search vectors
+POSTGRES_CONFIG = 'english'
+MAX_TERMS = 16
+# Snippet match markers, replaced with <mark> after HTML-escaping the text
+MATCH_START, MATCH_END = '\x02', '\x03'
+
+
+def search_terms(text: str) -> List[str]:
+    """Word terms of a user search string (at most ``MAX_TERMS``)."""
+    return re.findall(r'\w+', text.lower())[:MAX_TERMS]
+
+
+def highlight(snippet: str) -> str:
+    """HTML-escape a snippet and wrap its matches in ``<mark>``."""
+    return html.escape(snippet or '').replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+
+
+def result_data(results: List[Tuple[Any, float, str]], serializer_class) -> List[Dict[str, Any]]:
+    """Serialized search results with their rank and snippet."""
+    data = []
+    for obj, rank, snippet in results:
+        item = serializer_class(obj).data
+        item['rank'] = rank
+        item['snippet'] = snippet
+        data.append(item)
+    return data
+
+
+class FullTextIndex:
+    """Search access to one model's full-text index, and its SQLite triggers."""
+
+    def __init__(self, model, migration: Tuple[str, str], fallback_fields: List[str],
+                 sqlite_columns: Dict[str, str], sqlite_weights: Tuple[float, ...], postgres_snippet: str,
+                 related_fields: List[str] = None):
+        """
+        Args:
+            model: Indexed model
+            migration: (app label, migration name) that introduced the index
+            fallback_fields: Fields matched with ``icontains`` on other databases
+            sqlite_columns: FTS5 column -> SQL expression over the model row
+                ``new``. Only the model's own columns: a trigger that reads
+                another table breaks Django's SQLite table rebuilds
+            sqlite_weights: bm25 weight of each FTS5 column
+            postgres_snippet: SQL expression over the model table that
+                ts_headline picks the snippet from
+            related_fields: Fields of small related tables that ``filter``
+                also matches, with ``icontains``
+        """
+        self.model = model
+        self.migration = migration
+        self.fallback_fields = fallback_fields
+        self.sqlite_columns = sqlite_columns
+        self.sqlite_weights = sqlite_weights
+        self.postgres_snippet = postgres_snippet
+        self.related_fields = related_fields or []
+
+    @property
+    def table(self) -> str:
+        return self.model._meta.db_table
+
+    @property
+    def fts_table(self) -> str:
+        return f'{self.table}_fts'
+
+    def sqlite_triggers(self) -> Dict[str, str]:
+        """Triggers that copy inserts, text changes and deletes into the FTS5 table."""
+        table, fts = self.table, self.fts_table
+        columns = ', '.join(self.sqlite_columns)
+        values = ', '.join(self.sqlite_columns.values())
+        assignments = ', '.join(f'{column} = {value}' for column, value in self.sqlite_columns.items())
+        # Source columns the indexed expressions read; saves write every
+        # column, so the update trigger only fires when one of them changed
+        sources = sorted(set(re.findall(r'\bnew\.(\w+)', values)))
+        changed = ' OR '.join(f'old.{column} IS NOT new.{column}' for column in sources)
+        return {
+            f'{fts}_insert': (
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts} (rowid, {columns}) VALUES (new.id, {values}); END"
+            ),
+            f'{fts}_update': (
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {', '.join(sources)} ON {table} "
+                f"WHEN {changed} BEGIN UPDATE {fts} SET {assignments} WHERE rowid = new.id; END"
+            ),
+            f'{fts}_delete': (
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+                f"DELETE FROM {fts} WHERE rowid = old.id; END"
+            ),
+        }
+
+    def install_sqlite(self, connection) -> bool:
+        """
+        Create the FTS5 table and any missing trigger, refilling the table
+        from the model table when a trigger was missing.
+
+        Returns:
+            True if the index was (re)built
+        """
+        triggers = self.sqlite_triggers()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN ({', '.join(['%s'] * len(triggers))})",
+                list(triggers),
+            )
+            if {row[0] for row in cursor.fetchall()} == set(triggers):
+                return False
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5("
+                f"{', '.join(self.sqlite_columns)}, "
+                f"tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+            for sql in triggers.values():
+                cursor.execute(sql)
+            cursor.execute(f"DELETE FROM {self.fts_table}")
+            cursor.execute(
+                f"INSERT INTO {self.fts_table} (rowid, {', '.join(self.sqlite_columns)}) "
+                f"SELECT new.id, {', '.join(self.sqlite_columns.values())} FROM {self.table} AS new"
+            )
+        return True
+
+    def drop_sqlite(self, connection):
+        with connection.cursor() as cursor:
+            for name in self.sqlite_triggers():
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"DROP TABLE IF EXISTS {self.fts_table}")
+
+    def repair_sqlite(self, sender, using, **kwargs):
+        """post_migrate handler: reinstall triggers a table rebuild dropped."""
+        connection = connections[using]
+        if connection.vendor != 'sqlite' or self.migration not in MigrationRecorder(connection).applied_migrations():
+            return
+        if self.install_sqlite(connection):
+            print(f"Rebuilt full-text index {self.fts_table}")
+
+    def match_query(self, vendor: str, terms: List[str]) -> str:
+        """Search terms as an FTS5 MATCH or a to_tsquery expression: every term, as a prefix."""
+        if vendor == 'sqlite':
+            return ' '.join(f'"{term}"*' for term in terms)
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def filter(self, queryset, text: str):
+        """Restrict ``queryset`` to rows matching ``text``."""
+        terms = search_terms(text)
+        vendor = connections[queryset.db].vendor
+        if vendor == 'sqlite':
+            sql = f'SELECT rowid FROM "{self.fts_table}" WHERE "{self.fts_table}" MATCH %s'
+            params = [self.match_query(vendor, terms)]
+        elif vendor == 'postgresql':
+            sql = f'SELECT id FROM "{self.table}" WHERE search_vector @@ to_tsquery(%s, %s)'
+            params = [POSTGRES_CONFIG, self.match_query(vendor, terms)]
+        else:
+            condition = Q()
+            for field in self.fallback_fields:
+                condition |= Q(**{f'{field}__icontains': text})
+            return queryset.filter(condition)
+
+        condition = Q(id__in=RawSQL(sql, params)) if terms else Q(pk__in=[])
+        for path in self.related_fields:
+            # As "fk IN (SELECT id FROM related WHERE ...)" rather than a
+            # join, so both sides of the OR stay index lookups
+            name, _, related_path = path.partition('__')
+            related = self.model._meta.get_field(name).related_model
+            condition |= Q(**{f'{name}__in': related.objects.filter(**{f'{related_path}__icontains': text})})
+        return queryset.filter(condition)
+
+    def search(self, queryset, text: str, limit: int) -> List[Tuple[Any, float, str]]:
+        """
+        Best matches for ``text``, most relevant first.
+
+        Args:
+            queryset: Queryset the matched rows are loaded from (e.g. with select_related)
+            text: User search string
+            limit: Maximum number of results
+
+        Returns:
+            List of (object, rank, snippet) tuples; the rank is higher for
+            better matches and the snippet is HTML with ``<mark>`` around the
+            matched words
+        """
+        terms = search_terms(text)
+        if not terms:
+            return []
+        connection = connections[queryset.db]
+        if connection.vendor == 'sqlite':
+            fts = f'"{self.fts_table}"'
+            weights = ', '.join(str(weight) for weight in self.sqlite_weights)
+            sql = (
+                f"SELECT rowid, -bm25({fts}, {weights}), "
+                f"snippet({fts}, -1, char(2), char(3), '…', 16) "
+                f"FROM {fts} WHERE {fts} MATCH %s ORDER BY bm25({fts}, {weights}) LIMIT %s"
+            )
+            params = [self.match_query('sqlite', terms), limit]
+        elif connection.vendor == 'postgresql':
+            # ts_headline re-parses the text, so it runs only on the top rows
+            sql = (
+                f"SELECT best.id, best.rank, ts_headline(%s, {self.postgres_snippet}, best.query, "
+                f"'StartSel=\"{MATCH_START}\", StopSel=\"{MATCH_END}\", MaxWords=16, MinWords=6') "
+                f"FROM (SELECT id, query, ts_rank_cd(search_vector, query) AS rank "
+                f"FROM \"{self.table}\", to_tsquery(%s, %s) query WHERE search_vector @@ query "
+                f"ORDER BY rank DESC LIMIT %s) best JOIN \"{self.table}\" USING (id) ORDER BY best.rank DESC"
+            )
+            params = [POSTGRES_CONFIG, POSTGRES_CONFIG, self.match_query('postgresql', terms), limit]
+        else:
+            return [(obj, 0.0, '') for obj in self.filter(queryset, text)[:limit]]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        objects = queryset.in_bulk([row[0] for row in rows])
+        return [(objects[pk], float(rank), highlight(snippet)) for pk, rank, snippet in rows if pk in objects]
@@ -65,6 +65,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'smart_todo.wsgi.application'
+ASGI_APPLICATION = 'smart_todo.asgi.application'
 
 # Database - SQLite for development (easier setup)
 # You can switch to PostgreSQL/Supabase later by uncommenting the PostgreSQL config below
@@ -141,7 +142,190 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_ALL_ORIGINS = DEBUG
 
+# Serve the unfiltered task statistics from the materialized TaskCounter table
+# (run `python manage.py rebuild_task_counters` after turning this on)
+TASK_STATS_COUNTERS = os.getenv('TASK_STATS_COUNTERS', 'False') == 'True'
+
+# Most results returned by the ranked full-text search endpoints (?limit=)
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', '100'))
+
 # AI Integration Settings
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY', '')
-LM_STUDIO_BASE_URL = os.getenv('LM_STUDIO_BASE_URL', 'http://localhost:1234') 
\ No newline at end of file
+LM_STUDIO_BASE_URL = os.getenv('LM_STUDIO_BASE_URL', 'http://localhost:1234') 
+# Background AI processing (python manage.py run_ai_workers)
+AI_WORKER_CONCURRENCY = int(os.getenv('AI_WORKER_CONCURRENCY', '2'))
+AI_WORKER_POLL_INTERVAL = float(os.getenv('AI_WORKER_POLL_INTERVAL', '2'))
+AI_JOB_LEASE_SECONDS = int(os.getenv('AI_JOB_LEASE_SECONDS', '60'))
+AI_JOB_MAX_ATTEMPTS = int(os.getenv('AI_JOB_MAX_ATTEMPTS', '5'))
+AI_JOB_RETRY_BACKOFF_SECONDS = int(os.getenv('AI_JOB_RETRY_BACKOFF_SECONDS', '10'))
+AI_JOB_RETRY_BACKOFF_MAX_SECONDS = int(os.getenv('AI_JOB_RETRY_BACKOFF_MAX_SECONDS', '600'))
+AI_WORKER_BATCH_SIZE = int(os.getenv('AI_WORKER_BATCH_SIZE', '8'))
+
+# Multi-entry prompt packing for bulk context analysis
+AI_BATCH_TOKEN_BUDGET = int(os.getenv('AI_BATCH_TOKEN_BUDGET', '3000'))
+AI_BATCH_MAX_ENTRIES = int(os.getenv('AI_BATCH_MAX_ENTRIES', '8'))
+
+# Map-reduce chunking for long context entries
+AI_CHUNK_TOKEN_BUDGET = int(os.getenv('AI_CHUNK_TOKEN_BUDGET', '1500'))
+AI_CHUNK_MAX_WORKERS = int(os.getenv('AI_CHUNK_MAX_WORKERS', '8'))
+
+# Stale-while-revalidate enhancement: background LLM enhancements in flight per process
+AI_REVALIDATE_MAX_WORKERS = int(os.getenv('AI_REVALIDATE_MAX_WORKERS', '4'))
+AI_CHANGE_FEED_PAGE_SIZE = int(os.getenv('AI_CHANGE_FEED_PAGE_SIZE', '100'))
+# Enhance new tasks in the background when they are created (the request can also ask with "enhance")
+AI_ENHANCE_ON_CREATE = os.getenv('AI_ENHANCE_ON_CREATE', 'False') == 'True'
+# Tasks created within this window (seconds) share one enhancement prompt, up to the max per batch
+AI_ENHANCE_BATCH_WINDOW = float(os.getenv('AI_ENHANCE_BATCH_WINDOW', '0.5'))
+AI_ENHANCE_BATCH_MAX_TASKS = int(os.getenv('AI_ENHANCE_BATCH_MAX_TASKS', '8'))
+
+# Batch enhancement endpoint: process-wide fan-out pool and per-request items in flight
+AI_FANOUT_MAX_WORKERS = int(os.getenv('AI_FANOUT_MAX_WORKERS', '16'))
+AI_FANOUT_PER_REQUEST = int(os.getenv('AI_FANOUT_PER_REQUEST', '8'))
+AI_ENHANCE_BATCH_MAX_ITEMS = int(os.getenv('AI_ENHANCE_BATCH_MAX_ITEMS', '500'))
+
+# Chunked prioritization for large task lists: up to AI_CHUNK_MAX_WORKERS chunks
+# run in one round; longer lists take proportionally more rounds
+AI_PRIORITIZE_CHUNK_SIZE = int(os.getenv('AI_PRIORITIZE_CHUNK_SIZE', '25'))
+AI_PRIORITIZE_ANCHORS = int(os.getenv('AI_PRIORITIZE_ANCHORS', '3'))
+
+# Single-flight coalescing of concurrent identical AI requests
+AI_COALESCE_ENABLED = os.getenv('AI_COALESCE_ENABLED', 'True') == 'True'
+AI_COALESCE_CROSS_PROCESS = os.getenv('AI_COALESCE_CROSS_PROCESS', 'True') == 'True'
+AI_COALESCE_WAIT_SECONDS = float(os.getenv('AI_COALESCE_WAIT_SECONDS', '60'))
+AI_COALESCE_DIR = os.getenv('AI_COALESCE_DIR', os.path.join(BASE_DIR, '.ai_locks'))
+
+# AI provider HTTP connection pooling
+AI_HTTP_POOL_CONNECTIONS = int(os.getenv('AI_HTTP_POOL_CONNECTIONS', '4'))
+AI_HTTP_POOL_MAXSIZE = int(os.getenv('AI_HTTP_POOL_MAXSIZE', '20'))
+AI_HTTP_KEEPALIVE_EXPIRY = float(os.getenv('AI_HTTP_KEEPALIVE_EXPIRY', '60'))
+AI_HTTP_CONNECT_TIMEOUT = float(os.getenv('AI_HTTP_CONNECT_TIMEOUT', '5'))
+AI_HTTP_READ_TIMEOUT = float(os.getenv('AI_HTTP_READ_TIMEOUT', '30'))
+AI_PROVIDER_MAX_RETRIES = int(os.getenv('AI_PROVIDER_MAX_RETRIES', '2'))
+# Async endpoints hold many concurrent calls per process on one pool
+AI_ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv('AI_ASYNC_HTTP_MAX_CONNECTIONS', '500'))
+
+# Model and output-budget routing (ai_integration/routing.py)
+AI_MODELS = {
+    'lm_studio': {
+        'small': os.getenv('AI_LM_STUDIO_SMALL_MODEL', 'local-model'),
+        'large': os.getenv('AI_LM_STUDIO_LARGE_MODEL', 'local-model'),
+    },
+    'anthropic': {
+        'small': os.getenv('AI_ANTHROPIC_SMALL_MODEL', 'claude-3-haiku-20240307'),
+        'large': os.getenv('AI_ANTHROPIC_LARGE_MODEL', 'claude-3-sonnet-20240229'),
+    },
+    'openai': {
+        'small': os.getenv('AI_OPENAI_SMALL_MODEL', 'gpt-3.5-turbo'),
+        'large': os.getenv('AI_OPENAI_LARGE_MODEL', 'gpt-4-turbo'),
+    },
+}
+# max_tokens = output_base + output_per_input_token * input tokens, clamped to [min_output, max_output];
+# the large model is used when input + max_tokens exceeds large_model_above (None: never)
+AI_ROUTES = {
+    'enhance_task': {
+        'output_base': 300, 'output_per_input_token': 0.5, 'min_output': 350, 'max_output': 600,
+        'large_model_above': None,
+    },
+    'analyze_context': {
+        'output_base': 250, 'output_per_input_token': 0.5, 'min_output': 350, 'max_output': 1000,
+        'large_model_above': int(os.getenv('AI_ANALYZE_CONTEXT_LARGE_ABOVE', '1500')),
+    },
+    'prioritize_tasks': {
+        'output_base': 200, 'output_per_input_token': 0.3, 'min_output': 250, 'max_output': 800,
+        'large_model_above': int(os.getenv('AI_PRIORITIZE_TASKS_LARGE_ABOVE', '2500')),
+    },
+    'enhance_task_batch': {
+        'output_base': 300, 'output_per_input_token': 2.0, 'min_output': 600, 'max_output': 4000,
+        'large_model_above': None,
+    },
+    'analyze_context_batch': {
+        'output_base': 600, 'output_per_input_token': 1.2, 'min_output': 1000, 'max_output': 4000,
+        'large_model_above': int(os.getenv('AI_ANALYZE_CONTEXT_BATCH_LARGE_ABOVE', '3000')),
+    },
+}
+
+# Admission control for the AI endpoints
+AI_ADMISSION_MAX_CONCURRENT = int(os.getenv('AI_ADMISSION_MAX_CONCURRENT', '8'))
+AI_ADMISSION_ASYNC_MAX_CONCURRENT = int(os.getenv('AI_ADMISSION_ASYNC_MAX_CONCURRENT', '400'))
+AI_ADMISSION_MAX_QUEUE = int(os.getenv('AI_ADMISSION_MAX_QUEUE', '16'))
+AI_ADMISSION_QUEUE_TIMEOUT = float(os.getenv('AI_ADMISSION_QUEUE_TIMEOUT', '10'))
+# 'reject' answers 503 with Retry-After; 'degrade' serves overload from the rule-based engine
+AI_ADMISSION_OVERLOAD = os.getenv('AI_ADMISSION_OVERLOAD', 'reject')
+AI_ADMISSION_CROSS_PROCESS = os.getenv('AI_ADMISSION_CROSS_PROCESS', 'True') == 'True'
+AI_ADMISSION_DIR = os.getenv('AI_ADMISSION_DIR', os.path.join(BASE_DIR, '.ai_locks', 'admission'))
+
+# AI result cache: in-process LRU in front of a persistent file cache
+AI_CACHE_ENABLED = os.getenv('AI_CACHE_ENABLED', 'True') == 'True'
+AI_CACHE_LRU_SIZE = int(os.getenv('AI_CACHE_LRU_SIZE', '512'))
+AI_CACHE_TTL = int(os.getenv('AI_CACHE_TTL', str(7 * 24 * 3600)))
+AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', '10000'))
+AI_CACHE_DIR = os.getenv('AI_CACHE_DIR', os.path.join(BASE_DIR, '.ai_cache'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'ai_results': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': AI_CACHE_DIR,
+        'TIMEOUT': AI_CACHE_TTL,
+        'OPTIONS': {
+            'MAX_ENTRIES': AI_CACHE_MAX_ENTRIES,
+            'CULL_FREQUENCY': 4,
+        },
+    },
+}
+
+# AI provider circuit breakers
+AI_BREAKER_WINDOW_SECONDS = float(os.getenv('AI_BREAKER_WINDOW_SECONDS', '60'))
+AI_BREAKER_MINIMUM_CALLS = int(os.getenv('AI_BREAKER_MINIMUM_CALLS', '10'))
+AI_BREAKER_FAILURE_RATE = float(os.getenv('AI_BREAKER_FAILURE_RATE', '0.5'))
+AI_BREAKER_CONSECUTIVE_FAILURES = int(os.getenv('AI_BREAKER_CONSECUTIVE_FAILURES', '3'))
+AI_BREAKER_OPEN_SECONDS = float(os.getenv('AI_BREAKER_OPEN_SECONDS', '30'))
+
+# Hedged provider requests for interactive AI endpoints (seconds)
+AI_LATENCY_BUDGETS = {
+    'enhance_task': float(os.getenv('AI_ENHANCE_TASK_BUDGET', '6')),
+    'analyze_context': float(os.getenv('AI_ANALYZE_CONTEXT_BUDGET', '12')),
+    'prioritize_tasks': float(os.getenv('AI_PRIORITIZE_TASKS_BUDGET', '12')),
+}
+AI_HEDGE_PERCENTILE = float(os.getenv('AI_HEDGE_PERCENTILE', '0.9'))
+AI_HEDGE_DEFAULT_DELAY = float(os.getenv('AI_HEDGE_DEFAULT_DELAY', '3'))
+AI_HEDGE_MIN_DELAY = float(os.getenv('AI_HEDGE_MIN_DELAY', '0.2'))
+AI_HEDGE_MAX_WORKERS = int(os.getenv('AI_HEDGE_MAX_WORKERS', '16'))
+
+# Per-provider rate limits (0 = unlimited); tokens are counted prompt tokens + routed max_tokens
+AI_RATE_LIMITS = {
+    'lm_studio': {
+        'requests_per_minute': float(os.getenv('AI_LM_STUDIO_RPM', '0')),
+        'tokens_per_minute': float(os.getenv('AI_LM_STUDIO_TPM', '0')),
+        'max_concurrency': int(os.getenv('AI_LM_STUDIO_MAX_CONCURRENCY', '2')),
+    },
+    'anthropic': {
+        'requests_per_minute': float(os.getenv('AI_ANTHROPIC_RPM', '50')),
+        'tokens_per_minute': float(os.getenv('AI_ANTHROPIC_TPM', '40000')),
+        'max_concurrency': int(os.getenv('AI_ANTHROPIC_MAX_CONCURRENCY', '10')),
+    },
+    'openai': {
+        'requests_per_minute': float(os.getenv('AI_OPENAI_RPM', '500')),
+        'tokens_per_minute': float(os.getenv('AI_OPENAI_TPM', '60000')),
+        'max_concurrency': int(os.getenv('AI_OPENAI_MAX_CONCURRENCY', '20')),
+    },
+}
+# How long a call may queue for capacity before falling through to the next provider (seconds)
+AI_RATE_LIMIT_MAX_WAIT = {
+    'interactive': float(os.getenv('AI_RATE_LIMIT_INTERACTIVE_WAIT', '5')),
+    'background': float(os.getenv('AI_RATE_LIMIT_BACKGROUND_WAIT', '300')),
+}
+# Pause after a 429 that carries no Retry-After header (seconds)
+AI_RATE_LIMIT_DEFAULT_BACKOFF = float(os.getenv('AI_RATE_LIMIT_DEFAULT_BACKOFF', '5'))
+
+# Structured output: how each provider is asked for JSON matching the
+# operation's schema ('json_schema', 'json_object', 'prefill' or 'none').
+# Responses are validated either way and get one repair call if invalid.
+AI_STRUCTURED_OUTPUT = {
+    'lm_studio': os.getenv('AI_LM_STUDIO_STRUCTURED_OUTPUT', 'json_schema'),
+    'anthropic': os.getenv('AI_ANTHROPIC_STRUCTURED_OUTPUT', 'prefill'),
+    'openai': os.getenv('AI_OPENAI_STRUCTURED_OUTPUT', 'json_object'),
+}
@@ -3,9 +3,17 @@ Django app configuration for tasks.
 """
 
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
-    verbose_name = 'Tasks' 
\ No newline at end of file
+    verbose_name = 'Tasks'
+    
+    def ready(self):
+        # Connect the TaskCounter signal handlers
+        from . import signals  # noqa: F401
+        # Reinstall the SQLite full-text triggers if a table rebuild dropped them
+        from .search import task_index
+        post_migrate.connect(task_index.repair_sqlite, sender=self) 
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Management command that checks the query plans of the list and stats endpoints.
+
+Usage:
+    python manage.py check_query_plans
+    python manage.py check_query_plans --verbose
+
+Requests /api/tasks/ and /api/context/ (first page and a keyset page) and
+their stats for every combination of the indexed filters, EXPLAINs each
+SELECT they run and exits with an error if any plan reads a whole table:
+``SCAN <table>`` without an index on SQLite, ``Seq Scan`` on PostgreSQL
+(planned with ``enable_seqscan`` off, so a sequential scan means no index
+can answer the query, not that the table is small).
+
+The plans come from a freshly migrated test database (as the test runner
+creates), so they show whether the schema has an index for each access
+path; with real statistics a planner may still rightly prefer a scan for
+a filter that matches most rows. The unfiltered stats are not checked:
+they read every row by definition (see TASK_STATS_COUNTERS). ``?search=``
+goes through the full-text index; ``?category=`` is a LIKE '%...%' match on
+the small category table and is not covered.
+
+Works with SQLite and PostgreSQL; the configured database itself is not
+touched.
+"""
+
+import itertools
+import re
+from urllib.parse import urlencode
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from context_entries.models import ContextEntry
+from smart_todo.pagination import KeysetPagination
+from tasks.models import Task
+
+# Filter values per endpoint; every combination is checked
+TASK_FILTERS = {
+    'status': [None, 'pending'],
+    'priority': [None, 'high', 'medium', 'low'],
+    'ai_suggested': [None, 'true', 'false'],
+    'search': [None, 'report'],
+}
+CONTEXT_FILTERS = {
+    'source_type': [None, 'email'],
+    'is_processed': [None, 'true', 'false'],
+    'days_back': [None, '7'],
+    'search': [None, 'meeting'],
+}
+
+# Full-text matches show up as "SCAN <table>_fts VIRTUAL TABLE INDEX ...", an index lookup
+SQLITE_TABLE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+POSTGRES_TABLE_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def combinations(filters):
+    """Every combination of the filter values, as query parameter dicts."""
+    for values in itertools.product(*filters.values()):
+        yield {name: value for name, value in zip(filters, values) if value is not None}
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the task and context list/stats queries for every filter combination and fail on full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose', action='store_true', help='Print the plan of every query')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f"Query plan checks support SQLite and PostgreSQL, not {connection.vendor}")
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.check_plans(options['verbose'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def check_plans(self, verbose):
+        now = timezone.now()
+        task_cursor = KeysetPagination().cursor_after(Task(id=1, priority_score=5, created_at=now))
+        context_cursor = KeysetPagination().cursor_after(ContextEntry(id=1, timestamp=now))
+        urls = []
+        for base, filters, cursor in (
+            ('/api/tasks/', TASK_FILTERS, task_cursor),
+            ('/api/context/', CONTEXT_FILTERS, context_cursor),
+        ):
+            for params in combinations(filters):
+                urls.append(f"{base}?{urlencode(params)}")
+                urls.append(f"{base}?{urlencode(dict(params, cursor=cursor))}")
+                if params:
+                    urls.append(f"{base}stats/?{urlencode(params)}")
+
+        client = Client()
+        checked = failed = 0
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f"GET {url} returned {response.status_code}")
+
+            for query in queries:
+                if not query['sql'].lstrip().upper().startswith('SELECT'):
+                    continue
+                plan, scanned = self.explain(query['sql'])
+                checked += 1
+                if scanned:
+                    failed += 1
+                    self.stdout.write(f"FULL SCAN of {', '.join(scanned)}: GET {url}\n  {query['sql']}\n  {plan}")
+                elif verbose:
+                    self.stdout.write(f"ok: GET {url}\n  {query['sql']}\n  {plan}")
+
+        if failed:
+            raise CommandError(f"{failed} of {checked} queries from {len(urls)} requests read a whole table")
+        self.stdout.write(f"{checked} queries from {len(urls)} requests use an index")
+
+    def explain(self, sql):
+        """
+        Plan of one query and the tables it reads in full.
+
+        Returns:
+            Tuple of (plan as text, list of fully scanned table names)
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                details = [row[-1] for row in cursor.fetchall()]
+                scanned = [match.group(1) for match in map(SQLITE_TABLE_SCAN.match, details) if match]
+            else:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute(f"EXPLAIN {sql}")
+                details = [row[0] for row in cursor.fetchall()]
+                scanned = [table for detail in details for table in POSTGRES_TABLE_SCAN.findall(detail)]
+        return ' | '.join(details), scanned
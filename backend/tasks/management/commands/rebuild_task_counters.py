@@ -0,0 +1,21 @@
+"""
+Management command that recomputes the TaskCounter table from the tasks.
+
+Usage:
+    python manage.py rebuild_task_counters
+
+Run it after turning on TASK_STATS_COUNTERS for an existing database, or
+after bulk writes that bypassed the counter maintenance. It also marks the
+counters as built, so saves and deletes start maintaining them.
+"""
+
+from django.core.management.base import BaseCommand
+from tasks.stats import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized task counters used by the dashboard statistics'
+
+    def handle(self, *args, **options):
+        result = rebuild_counters()
+        self.stdout.write(f"Rebuilt {result['buckets']} counter buckets covering {result['tasks']} tasks")
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="ai_enhanced_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the last AI enhancement was stored",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="ai_revision",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Incremented on every enhancement request; background results for older revisions are dropped",
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="ai_status",
+            field=models.CharField(
+                choices=[
+                    ("none", "Not enhanced"),
+                    ("provisional", "Provisional"),
+                    ("enhanced", "Enhanced"),
+                    ("failed", "Failed"),
+                ],
+                default="none",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["ai_enhanced_at", "id"], name="task_ai_enhanced_idx"
+            ),
+        ),
+    ]
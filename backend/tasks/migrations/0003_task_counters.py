@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0002_task_ai_revision"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("status", models.CharField(max_length=20)),
+                ("high_priority", models.BooleanField()),
+                ("ai_suggested", models.BooleanField()),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["status", "deadline"], name="task_status_deadline_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="taskcounter",
+            constraint=models.UniqueConstraint(
+                fields=("status", "high_priority", "ai_suggested"),
+                name="task_counter_bucket",
+            ),
+        ),
+    ]
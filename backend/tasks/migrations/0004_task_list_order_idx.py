@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_task_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["priority_score", "created_at", "id"],
+                name="task_list_order_idx",
+            ),
+        ),
+    ]
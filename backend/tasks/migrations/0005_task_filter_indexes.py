@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0004_task_list_order_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["status", "priority_score", "created_at", "id"],
+                name="task_status_list_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("ai_suggested", True)),
+                fields=["priority_score", "created_at", "id"],
+                name="task_ai_suggested_list_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("ai_suggested", False)),
+                fields=["priority_score", "created_at", "id"],
+                name="task_manual_list_idx",
+            ),
+        ),
+    ]
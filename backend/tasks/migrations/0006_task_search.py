@@ -0,0 +1,109 @@
+# Full-text search index for tasks (see smart_todo/search.py)
+
+from django.db import migrations
+
+# SQLite: an FTS5 table filled by triggers. Inlined so this migration keeps
+# running the same SQL; smart_todo/search.py builds the same statements to
+# reinstall the triggers when a later table rebuild drops them
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE tasks_task_fts USING fts5(
+        title, description, tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_update AFTER UPDATE OF description, title ON tasks_task
+    WHEN old.description IS NOT new.description OR old.title IS NOT new.title BEGIN
+        UPDATE tasks_task_fts SET title = new.title, description = new.description
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+        DELETE FROM tasks_task_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    INSERT INTO tasks_task_fts (rowid, title, description)
+    SELECT new.id, new.title, new.description FROM tasks_task AS new
+    """,
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS tasks_task_fts_insert",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_update",
+    "DROP TRIGGER IF EXISTS tasks_task_fts_delete",
+    "DROP TABLE IF EXISTS tasks_task_fts",
+]
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE tasks_task ADD COLUMN search_vector tsvector",
+    # The change check is in the function body: a generated column, a WHEN
+    # clause or an UPDATE OF column list would block later column type changes
+    """
+    CREATE FUNCTION tasks_task_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' THEN
+            IF NEW.title IS NOT DISTINCT FROM OLD.title AND NEW.description IS NOT DISTINCT FROM OLD.description THEN
+                RETURN NEW;
+            END IF;
+        END IF;
+        NEW.search_vector := setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER tasks_task_search_vector BEFORE INSERT OR UPDATE ON tasks_task
+    FOR EACH ROW EXECUTE FUNCTION tasks_task_search_vector()
+    """,
+    """
+    UPDATE tasks_task SET search_vector = setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    """,
+    "CREATE INDEX tasks_task_search_idx ON tasks_task USING gin (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP TRIGGER IF EXISTS tasks_task_search_vector ON tasks_task",
+    "DROP FUNCTION IF EXISTS tasks_task_search_vector()",
+    "ALTER TABLE tasks_task DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def forward(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_FORWARD:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        for sql in POSTGRES_FORWARD:
+            schema_editor.execute(sql)
+
+
+def reverse(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_REVERSE:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        for sql in POSTGRES_REVERSE:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_task_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, reverse),
+    ]
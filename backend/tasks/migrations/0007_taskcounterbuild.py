@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-17 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0006_task_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskCounterBuild",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("built_at", models.DateTimeField()),
+            ],
+        ),
+    ]
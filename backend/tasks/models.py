@@ -2,7 +2,8 @@
 Task models for the Smart Todo application.
 """
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -29,6 +30,12 @@ class Task(models.Model):
         ('completed', 'Completed'),
         ('cancelled', 'Cancelled'),
     ]
+    AI_STATUS_CHOICES = [
+        ('none', 'Not enhanced'),
+        ('provisional', 'Provisional'),
+        ('enhanced', 'Enhanced'),
+        ('failed', 'Failed'),
+    ]
     
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -45,6 +52,12 @@ class Task(models.Model):
     ai_suggested = models.BooleanField(default=False)
     ai_insights = models.TextField(blank=True, help_text="AI-generated insights about the task")
     ai_enhanced_description = models.TextField(blank=True, help_text="AI-enhanced task description")
+    ai_status = models.CharField(max_length=20, choices=AI_STATUS_CHOICES, default='none')
+    ai_revision = models.PositiveIntegerField(
+        default=0,
+        help_text="Incremented on every enhancement request; background results for older revisions are dropped"
+    )
+    ai_enhanced_at = models.DateTimeField(null=True, blank=True, help_text="When the last AI enhancement was stored")
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -52,10 +65,41 @@ class Task(models.Model):
     
     class Meta:
         ordering = ['-priority_score', '-created_at']
+        indexes = [
+            # Enhancement change feed, read in (ai_enhanced_at, id) order
+            models.Index(fields=['ai_enhanced_at', 'id'], name='task_ai_enhanced_idx'),
+            # Overdue count for the dashboard: active status, deadline before now
+            models.Index(fields=['status', 'deadline'], name='task_status_deadline_idx'),
+            # Task list pages: keyset seek in (-priority_score, -created_at, -id) order;
+            # also serves the ?priority= ranges
+            models.Index(fields=['priority_score', 'created_at', 'id'], name='task_list_order_idx'),
+            # ?status= lists, counts and stats, in list order
+            models.Index(fields=['status', 'priority_score', 'created_at', 'id'], name='task_status_list_idx'),
+            # ?ai_suggested= lists, counts and stats. The filter is a bare boolean
+            # column (WHERE "ai_suggested" / WHERE NOT "ai_suggested"), which a
+            # composite index cannot seek on but a partial index matches
+            models.Index(
+                fields=['priority_score', 'created_at', 'id'],
+                condition=models.Q(ai_suggested=True),
+                name='task_ai_suggested_list_idx',
+            ),
+            models.Index(
+                fields=['priority_score', 'created_at', 'id'],
+                condition=models.Q(ai_suggested=False),
+                name='task_manual_list_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        if not settings.TASK_STATS_COUNTERS:
+            return super().save(*args, **kwargs)
+        # The counter signals read (and lock) the old row in the save's transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            return super().save(*args, **kwargs)
+    
     @property
     def is_overdue(self):
         """Check if task is overdue."""
@@ -72,4 +116,40 @@ class Task(models.Model):
         elif self.priority_score >= 6:
             return 'Medium'
         else:
-            return 'Low' 
\ No newline at end of file
+            return 'Low' 
+
+
+class TaskCounter(models.Model):
+    """
+    Materialized task counts per (status, high priority, AI suggested) bucket.
+    
+    Kept up to date by the signals in tasks.signals (and by
+    tasks.stats.bulk_update_tasks for bulk writes) when
+    ``settings.TASK_STATS_COUNTERS`` is on, so the unfiltered dashboard
+    statistics read a handful of rows instead of scanning the task table.
+    """
+    status = models.CharField(max_length=20)
+    high_priority = models.BooleanField()
+    ai_suggested = models.BooleanField()
+    count = models.BigIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['status', 'high_priority', 'ai_suggested'], name='task_counter_bucket'),
+        ]
+    
+    def __str__(self):
+        return f"{self.status}/{'high' if self.high_priority else 'normal'}/{'ai' if self.ai_suggested else 'manual'}: {self.count}"
+
+
+class TaskCounterBuild(models.Model):
+    """
+    Marks the TaskCounter table as built; at most one row.
+    
+    Written by tasks.stats.rebuild_counters. Until it exists the counters
+    are not maintained and the first statistics read builds them.
+    """
+    built_at = models.DateTimeField()
+    
+    def __str__(self):
+        return f"Task counters built at {self.built_at}"
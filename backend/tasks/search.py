@@ -0,0 +1,18 @@
+"""
+Full-text index of tasks: title and description, weighted in that order.
+Created by migration 0006_task_search. Category names (a small table) are
+matched by ``?search=`` with icontains alongside the index.
+"""
+
+from smart_todo.search import FullTextIndex
+from .models import Task
+
+task_index = FullTextIndex(
+    Task,
+    migration=('tasks', '0006_task_search'),
+    fallback_fields=['title', 'description', 'category__name'],
+    sqlite_columns={'title': 'new.title', 'description': 'new.description'},
+    sqlite_weights=(10.0, 1.0),
+    postgres_snippet="coalesce(title, '') || ': ' || coalesce(description, '')",
+    related_fields=['category__name'],
+)
@@ -2,6 +2,7 @@
 Django REST Framework serializers for tasks app.
 """
 
+from django.conf import settings
 from rest_framework import serializers
 from .models import Task, Category
 
@@ -28,9 +29,10 @@ class TaskSerializer(serializers.ModelSerializer):
             'id', 'title', 'description', 'category', 'category_name',
             'priority_score', 'priority_level', 'deadline', 'status',
             'ai_suggested', 'ai_insights', 'ai_enhanced_description',
+            'ai_status', 'ai_revision', 'ai_enhanced_at',
             'is_overdue', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['ai_status', 'ai_revision', 'ai_enhanced_at', 'created_at', 'updated_at']
     
     def create(self, validated_data):
         """Create a new task and update category usage frequency."""
@@ -45,17 +47,24 @@ class TaskCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating tasks with AI enhancement."""
     
     category_name = serializers.CharField(write_only=True, required=False)
+    enhance = serializers.BooleanField(
+        write_only=True,
+        required=False,
+        help_text="Enhance the task with AI in the background (default: AI_ENHANCE_ON_CREATE)"
+    )
     
     class Meta:
         model = Task
         fields = [
-            'title', 'description', 'category_name', 'priority_score',
-            'deadline', 'status'
+            'id', 'title', 'description', 'category_name', 'priority_score',
+            'deadline', 'status', 'enhance', 'ai_status', 'ai_revision'
         ]
+        read_only_fields = ['ai_status', 'ai_revision']
     
     def create(self, validated_data):
-        """Create task with category handling."""
+        """Create task with category handling, queueing background AI enhancement if asked."""
         category_name = validated_data.pop('category_name', None)
+        enhance = validated_data.pop('enhance', settings.AI_ENHANCE_ON_CREATE)
         
         if category_name:
             category, created = Category.objects.get_or_create(
@@ -64,4 +73,12 @@ class TaskCreateSerializer(serializers.ModelSerializer):
             )
             validated_data['category'] = category
         
-        return super().create(validated_data) 
\ No newline at end of file
+        if enhance:
+            # Provisional until the background enhancement is stored
+            validated_data.update(ai_status='provisional', ai_revision=1)
+        task = super().create(validated_data)
+        
+        if enhance:
+            from ai_integration.revalidation import enqueue_new_task
+            enqueue_new_task(task)
+        return task 
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Signal handlers keeping the TaskCounter table in step with the task table.
+
+A save reads the task's current bucket from its row, locked, in the save's
+transaction (Task.save opens one), so concurrent saves of the same task
+each move it from the bucket it really was in. Deletes lock and read the
+row the same way in the delete's transaction and skip rows that are
+already gone. The counters are only adjusted once they are built
+(tasks.stats.counters_built), checked after the row write so a concurrent
+rebuild either counts this write or has already recorded its marker.
+Handlers do nothing unless ``settings.TASK_STATS_COUNTERS`` is on.
+"""
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from .models import Task
+from .stats import BUCKET_FIELDS, apply_deltas, bucket, counters_built
+
+
+def _stored_bucket(instance, using):
+    """Bucket of the task's row as stored, locked until the transaction ends; None if there is no row."""
+    if instance.pk is None:
+        return None
+    row = (
+        Task.objects.using(using).select_for_update()
+        .filter(pk=instance.pk).values_list(*BUCKET_FIELDS).first()
+    )
+    return bucket(*row) if row else None
+
+
+@receiver(pre_save, sender=Task)
+def read_saved_bucket(sender, instance, raw=False, using=None, **kwargs):
+    if raw or not settings.TASK_STATS_COUNTERS:
+        return
+    instance._counter_bucket = _stored_bucket(instance, using)
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created, raw=False, using=None, **kwargs):
+    if raw or not settings.TASK_STATS_COUNTERS:
+        return
+    old = instance.__dict__.pop('_counter_bucket', None)
+    if not counters_built(using):
+        return
+    new = bucket(instance.status, instance.priority_score, instance.ai_suggested)
+    if created:
+        apply_deltas({new: 1})
+    elif old is not None and old != new:
+        apply_deltas({old: -1, new: 1})
+
+
+@receiver(pre_delete, sender=Task)
+def read_deleted_bucket(sender, instance, using=None, **kwargs):
+    # Sent inside the delete's transaction
+    if settings.TASK_STATS_COUNTERS:
+        instance._counter_bucket = _stored_bucket(instance, using)
+
+
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, using=None, **kwargs):
+    if not settings.TASK_STATS_COUNTERS:
+        return
+    old = instance.__dict__.pop('_counter_bucket', None)
+    if old is not None and counters_built(using):
+        apply_deltas({old: -1})
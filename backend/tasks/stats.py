@@ -0,0 +1,178 @@
+"""
+Task statistics for the dashboard.
+
+``task_stats`` computes every figure for a (possibly filtered) queryset in
+one conditional-aggregate query, with the overdue test evaluated by the
+database instead of loading every task into Python.
+
+With ``settings.TASK_STATS_COUNTERS`` on, the unfiltered dashboard is served
+from the TaskCounter table instead: task counts per (status, high priority,
+AI suggested) bucket, adjusted by model signals on every save and delete
+and by ``bulk_update_tasks`` for bulk writes. Reading them is a scan of at
+most 16 rows whatever the number of tasks; only ``overdue_tasks``, which
+changes with the clock, is still counted, with the (status, deadline)
+index. The counters are only maintained once ``rebuild_counters`` has built
+them and recorded a TaskCounterBuild row; the first statistics read does
+that. Each writer checks for the row after its own write, in the same
+transaction, and the rebuild keeps writers out while it counts, so a write
+is either in the rebuilt counts or applied on top of them. After writes
+that bypass both paths (raw SQL, ``QuerySet.update`` of the bucket fields,
+or writes made while counters were off) run
+``manage.py rebuild_task_counters``.
+"""
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from .models import Task, TaskCounter, TaskCounterBuild
+
+ACTIVE_STATUSES = ['pending', 'in_progress']
+HIGH_PRIORITY_SCORE = 8
+# Task fields that decide a task's counter bucket
+BUCKET_FIELDS = ['status', 'priority_score', 'ai_suggested']
+
+
+def overdue_q(now) -> Q:
+    """Database-side equivalent of Task.is_overdue."""
+    return Q(deadline__isnull=False, deadline__lt=now, status__in=ACTIVE_STATUSES)
+
+
+def task_stats(queryset) -> Dict[str, int]:
+    """Dashboard statistics for a task queryset in one aggregate query."""
+    stats = queryset.aggregate(
+        total_tasks=Count('id'),
+        completed_tasks=Count('id', filter=Q(status='completed')),
+        pending_tasks=Count('id', filter=Q(status='pending')),
+        in_progress_tasks=Count('id', filter=Q(status='in_progress')),
+        high_priority_tasks=Count(
+            'id', filter=Q(priority_score__gte=HIGH_PRIORITY_SCORE, status__in=ACTIVE_STATUSES)
+        ),
+        ai_suggested_tasks=Count('id', filter=Q(ai_suggested=True)),
+        overdue_tasks=Count('id', filter=overdue_q(timezone.now())),
+    )
+    return stats
+
+
+def counter_stats() -> Dict[str, int]:
+    """Dashboard statistics for all tasks, read from the counter table."""
+    if not counters_built():
+        # Counters were just turned on: build them once
+        try:
+            rebuild_counters()
+        except IntegrityError:
+            # A concurrent first read built them
+            pass
+    buckets = TaskCounter.objects.values_list('status', 'high_priority', 'ai_suggested', 'count')
+
+    stats = dict.fromkeys([
+        'total_tasks', 'completed_tasks', 'pending_tasks', 'in_progress_tasks',
+        'high_priority_tasks', 'ai_suggested_tasks'
+    ], 0)
+    for status, high_priority, ai_suggested, count in buckets:
+        stats['total_tasks'] += count
+        if status in ('completed', 'pending', 'in_progress'):
+            stats[f'{status}_tasks'] += count
+        if high_priority and status in ACTIVE_STATUSES:
+            stats['high_priority_tasks'] += count
+        if ai_suggested:
+            stats['ai_suggested_tasks'] += count
+    stats['overdue_tasks'] = Task.objects.filter(overdue_q(timezone.now())).count()
+    return stats
+
+
+def counters_built(using=None) -> bool:
+    """Whether rebuild_counters has built the counter table, so writes should maintain it."""
+    return TaskCounterBuild.objects.using(using).exists()
+
+
+def bucket(status: str, priority_score: int, ai_suggested: bool) -> Tuple[str, bool, bool]:
+    """The counter bucket of a task with these field values."""
+    return (status, priority_score >= HIGH_PRIORITY_SCORE, bool(ai_suggested))
+
+
+def apply_deltas(deltas: Dict[Tuple[str, bool, bool], int]):
+    """Add per-bucket count changes to the counter table."""
+    for (status, high_priority, ai_suggested), delta in deltas.items():
+        if not delta:
+            continue
+        key = {'status': status, 'high_priority': high_priority, 'ai_suggested': ai_suggested}
+        if TaskCounter.objects.filter(**key).update(count=F('count') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                TaskCounter.objects.create(count=delta, **key)
+        except IntegrityError:
+            # Another writer created the bucket first
+            TaskCounter.objects.filter(**key).update(count=F('count') + delta)
+
+
+def bulk_update_tasks(queryset, tasks: List[Task], fields: Iterable[str]) -> int:
+    """
+    ``queryset.bulk_update(tasks, fields)`` that keeps the counters in step.
+
+    bulk_update sends no signals, so when counters are on and a bucket field
+    is written, the affected rows' current buckets are read (and locked)
+    first and the differences applied in the same transaction, once the
+    counters are built.
+
+    Returns:
+        Number of tasks updated
+    """
+    fields = list(fields)
+    if not settings.TASK_STATS_COUNTERS or not set(fields) & set(BUCKET_FIELDS):
+        return queryset.bulk_update(tasks, fields)
+
+    with transaction.atomic():
+        before = {
+            row[0]: row[1:] for row in queryset.select_for_update()
+            .filter(id__in=[task.id for task in tasks])
+            .values_list('id', *BUCKET_FIELDS)
+        }
+        updated = queryset.bulk_update(tasks, fields)
+        if not counters_built(queryset.db):
+            return updated
+        deltas = Counter()
+        for task in tasks:
+            if task.id not in before:
+                continue
+            old = dict(zip(BUCKET_FIELDS, before[task.id]))
+            new = dict(old, **{field: getattr(task, field) for field in fields if field in BUCKET_FIELDS})
+            deltas[bucket(**old)] -= 1
+            deltas[bucket(**new)] += 1
+        apply_deltas(deltas)
+    return updated
+
+
+def rebuild_counters() -> Dict[str, Any]:
+    """
+    Recompute the counter table from the task table and mark it built.
+
+    Task writes are held off until the rebuild commits (a table lock on
+    PostgreSQL, SQLite's write lock taken by the first DELETE), so each
+    concurrent write either lands before the count, and is included in it,
+    or after the marker, and is applied by its writer. Two concurrent first
+    builds can still collide on the marker or bucket inserts; the loser
+    gets an IntegrityError.
+    """
+    high = Q(priority_score__gte=HIGH_PRIORITY_SCORE)
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {connection.ops.quote_name(Task._meta.db_table)} IN EXCLUSIVE MODE')
+        TaskCounter.objects.all().delete()
+        rows = (
+            Task.objects.values('status', 'ai_suggested')
+            .annotate(high=Count('id', filter=high), normal=Count('id', filter=~high))
+        )
+        TaskCounter.objects.bulk_create([
+            TaskCounter(status=row['status'], high_priority=high_priority,
+                        ai_suggested=row['ai_suggested'], count=row[key])
+            for row in rows
+            for high_priority, key in ((True, 'high'), (False, 'normal'))
+            if row[key]
+        ])
+        TaskCounterBuild.objects.update_or_create(id=1, defaults={'built_at': timezone.now()})
+    return {'buckets': TaskCounter.objects.count(), 'tasks': TaskCounter.objects.aggregate(total=Sum('count'))['total'] or 0}
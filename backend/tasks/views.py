@@ -5,9 +5,13 @@ Django REST Framework views for tasks app.
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
+from smart_todo.pagination import KeysetPagination
+from smart_todo.search import result_data, search_terms
+from django.conf import settings
 from .models import Task, Category
 from .serializers import TaskSerializer, TaskCreateSerializer, CategorySerializer
+from .search import task_index
+from .stats import counter_stats, task_stats
 
 
 class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -33,6 +37,9 @@ class TaskViewSet(viewsets.ModelViewSet):
     
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    pagination_class = KeysetPagination
+    # Query parameters handled by get_queryset
+    FILTER_PARAMS = ('status', 'category', 'priority', 'ai_suggested', 'search')
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -69,33 +76,43 @@ class TaskViewSet(viewsets.ModelViewSet):
         if ai_suggested:
             queryset = queryset.filter(ai_suggested=ai_suggested.lower() == 'true')
         
-        # Search functionality
+        # Search functionality (full-text index over title, description and category)
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | 
-                Q(description__icontains=search) |
-                Q(category__name__icontains=search)
-            )
+            queryset = task_index.filter(queryset, search)
         
         return queryset
     
     @action(detail=False, methods=['get'])
-    def stats(self, request):
-        """Get task statistics."""
-        queryset = self.get_queryset()
+    def search(self, request):
+        """
+        Full-text search: the best matches for ``?q=``, most relevant first.
+        
+        Each word matches as a prefix and all words must match. Results
+        carry a ``rank`` and an HTML ``snippet`` with the matches in <mark>.
+        """
+        query = request.query_params.get('q', '')
+        if not search_terms(query):
+            return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), settings.SEARCH_MAX_RESULTS)
+        except ValueError:
+            return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
         
-        stats = {
-            'total_tasks': queryset.count(),
-            'completed_tasks': queryset.filter(status='completed').count(),
-            'pending_tasks': queryset.filter(status='pending').count(),
-            'in_progress_tasks': queryset.filter(status='in_progress').count(),
-            'high_priority_tasks': queryset.filter(priority_score__gte=8, status__in=['pending', 'in_progress']).count(),
-            'ai_suggested_tasks': queryset.filter(ai_suggested=True).count(),
-            'overdue_tasks': sum(1 for task in queryset if task.is_overdue),
-        }
+        results = task_index.search(Task.objects.select_related('category'), query, limit)
+        return Response({'query': query, 'results': result_data(results, TaskSerializer)})
+    
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Get task statistics.
         
-        return Response(stats)
+        Computed in one aggregate query over the filtered tasks; without
+        filters and with TASK_STATS_COUNTERS on, read from the counter table.
+        """
+        if settings.TASK_STATS_COUNTERS and not any(request.query_params.get(name) for name in self.FILTER_PARAMS):
+            return Response(counter_stats())
+        return Response(task_stats(self.get_queryset()))
     
     @action(detail=True, methods=['post'])
     def toggle_status(self, request, pk=None):